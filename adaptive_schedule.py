@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, time as dt_time, timedelta
+
+from apscheduler.triggers.base import BaseTrigger
+
+
+def parse_time(value):
+    hour, minute = (int(part) for part in value.split(':'))
+    return dt_time(hour, minute)
+
+
+def snapshot_fingerprint(entry):
+    """Hash of the prices in a history entry, ignoring its timestamp"""
+    prices = sorted(
+        (str(record.get('vegetable_id', record['vegetable_name'])), record['average_price'])
+        for record in entry.get('vegetables_price_data', [])
+        if 'vegetable_name' in record
+    )
+    if not prices:
+        return None
+    return hashlib.sha256(json.dumps(prices).encode('utf-8')).hexdigest()
+
+
+class AdaptiveSchedule:
+    """Learns when the site updates its prices and plans the next scrape around it"""
+
+    def __init__(self, schedule_config, state_file):
+        self.min_interval = timedelta(minutes=schedule_config.get('min_interval_minutes', 15))
+        self.max_interval = timedelta(minutes=schedule_config.get('max_interval_minutes', 240))
+        self.offset = timedelta(minutes=schedule_config.get('offset_minutes', 5))
+        self.bin_minutes = schedule_config.get('bin_minutes', 15)
+        if not isinstance(self.bin_minutes, int) or self.bin_minutes <= 0 or (24 * 60) % self.bin_minutes:
+            raise ValueError(f"bin_minutes must be a positive number of minutes dividing a day, got {self.bin_minutes!r}")
+        self.likely_ratio = schedule_config.get('likely_ratio', 2.0)
+        self.min_observations = schedule_config.get('min_observations', 5)
+        self.decay = schedule_config.get('decay', 0.98)
+        self.start_time = parse_time(schedule_config['start_time']) if 'start_time' in schedule_config else None
+        self.end_time = parse_time(schedule_config['end_time']) if 'end_time' in schedule_config else None
+        self.state_file = state_file
+        self.logger = logging.getLogger('AdaptiveSchedule')
+
+        bins = 24 * 60 // self.bin_minutes
+        self.state = {
+            'bin_minutes': self.bin_minutes,
+            'counts': [0.0] * bins,
+            'observations': 0,
+            'last_fingerprint': None,
+            'last_check': None,
+            'quiet_checks': 0,
+        }
+        self.load()
+
+    def load(self):
+        if not self.state_file.exists():
+            return
+        with open(self.state_file, 'r') as f:
+            state = json.load(f)
+        # A different bin size makes the stored histogram meaningless
+        if state.get('bin_minutes') == self.bin_minutes:
+            self.state.update(state)
+
+    def save(self):
+        tmp_file = self.state_file.with_name(f"{self.state_file.name}.tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def bin_index(self, moment):
+        return (moment.hour * 60 + moment.minute) // self.bin_minutes
+
+    def observe(self, entry, now):
+        """Record whether prices changed since the previous scrape"""
+        fingerprint = snapshot_fingerprint(entry)
+        if fingerprint is None:
+            return
+
+        state = self.state
+        last_check = datetime.fromisoformat(state['last_check']) if state['last_check'] else None
+
+        if state['last_fingerprint'] is not None and fingerprint != state['last_fingerprint']:
+            # The update happened somewhere between the previous check and now
+            counts = state['counts']
+            for i in range(len(counts)):
+                counts[i] *= self.decay
+            naive_now = now.replace(tzinfo=None)
+            start = max(last_check or naive_now, naive_now - timedelta(days=1))
+            bins = []
+            moment = start
+            while moment <= naive_now:
+                bins.append(self.bin_index(moment))
+                moment += timedelta(minutes=self.bin_minutes)
+            bins = bins or [self.bin_index(naive_now)]
+            for index in bins:
+                counts[index] += 1.0 / len(bins)
+            state['observations'] += 1
+            state['quiet_checks'] = 0
+            self.logger.info(f"Price update detected; {state['observations']} updates observed so far")
+        else:
+            state['quiet_checks'] += 1
+
+        state['last_fingerprint'] = fingerprint
+        state['last_check'] = now.replace(tzinfo=None).isoformat()
+        self.save()
+
+    def likely_bins(self):
+        """Time-of-day bins with well above their uniform share of observed updates"""
+        counts = self.state['counts']
+        total = sum(counts)
+        if self.state['observations'] < self.min_observations or total <= 0:
+            return set()
+        threshold = self.likely_ratio * total / len(counts)
+        return {i for i, count in enumerate(counts) if count >= threshold}
+
+    def in_window(self, moment):
+        if self.start_time is None or self.end_time is None:
+            return True
+        current = moment.time()
+        if self.start_time <= self.end_time:
+            return self.start_time <= current <= self.end_time
+        return current >= self.start_time or current <= self.end_time
+
+    def clamp_to_window(self, moment):
+        """Move a time outside the allowed window to the start of the next window"""
+        if self.in_window(moment):
+            return moment
+        start = moment.replace(hour=self.start_time.hour, minute=self.start_time.minute, second=0, microsecond=0)
+        if start <= moment:
+            start += timedelta(days=1)
+        return start
+
+    def next_run_after(self, now):
+        """Next scrape time: just after a likely update window, else a backed-off interval"""
+        backoff = self.min_interval * (2 ** min(self.state['quiet_checks'], 16))
+        interval = min(backoff, self.max_interval)
+        earliest = now + self.min_interval
+        latest = now + interval
+
+        likely = self.likely_bins()
+        candidate = latest
+        if likely:
+            bin_step = timedelta(minutes=self.bin_minutes)
+            moment = now.replace(minute=now.minute - now.minute % self.bin_minutes, second=0, microsecond=0)
+            while moment <= latest:
+                # Check just after each likely bin: wide windows get probed densely,
+                # which pins down the update time and narrows the window over time
+                if self.bin_index(moment) in likely:
+                    bin_end = moment + bin_step + self.offset
+                    if bin_end >= earliest:
+                        candidate = min(candidate, bin_end)
+                        break
+                moment += bin_step
+
+        return self.clamp_to_window(candidate)
+
+
+class AdaptiveTrigger(BaseTrigger):
+    """APScheduler trigger that asks an AdaptiveSchedule for each next fire time"""
+
+    def __init__(self, adaptive_schedule, timezone):
+        self.adaptive_schedule = adaptive_schedule
+        self.timezone = timezone
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        next_time = self.adaptive_schedule.next_run_after(now.astimezone(self.timezone))
+        normalize = getattr(self.timezone, 'normalize', None)
+        return normalize(next_time) if normalize else next_time
+
+    def __str__(self):
+        return 'adaptive'
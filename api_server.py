@@ -0,0 +1,263 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import config
+from export import iter_history
+from vegetable_catalog import VegetableCatalog
+
+
+class LRUCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL
+
+    `generation` counts invalidations. A value computed before an invalidation
+    can be put with the generation read beforehand and is then dropped, as the
+    check happens under the same lock as the invalidation.
+    """
+
+    def __init__(self, maxsize=256, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.generation = 0
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, generation=None):
+        """Cache a value; return False without caching it if `generation` is out of date"""
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def invalidate(self):
+        """Drop every entry and any value still being computed from the old data"""
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+
+class PriceStore:
+    """In-memory view of the price history, kept current from save notifications
+
+    Each source keeps its own latest snapshot and per-vegetable series, so two
+    sites pricing the same vegetable never overwrite each other.
+    """
+
+    def __init__(self, catalog=None):
+        self.catalog = catalog or VegetableCatalog()
+        self.lock = threading.Lock()
+        self.latest = {}  # source -> entry
+        self.names = {}
+        self.history = {}  # (source, vegetable_id) -> [(timestamp, min, max, average), ...]
+
+    def load(self, path=None):
+        """Seed the store from the history file once, at startup"""
+        path = path or config.OUTPUT_FILE
+        if not path.exists():
+            return
+        for entry in iter_history(path):
+            self.add_entry(entry)
+
+    def add_entry(self, entry):
+        """Add one history entry as written by save_data()"""
+        timestamp = entry.get('scrape_timestamp')
+        source = entry.get('source') or config.SOURCE
+        records = [
+            record for record in entry.get('vegetables_price_data', [])
+            if 'vegetable_name' in record
+        ]
+        if not records:
+            return
+
+        with self.lock:
+            for record in records:
+                vegetable_id = record.get('vegetable_id')
+                if vegetable_id is None:
+                    # Entries written before the catalog existed only have names
+                    vegetable_id = self.catalog.get_id(record['vegetable_name'])
+                self.names[vegetable_id] = record['vegetable_name']
+                self.history.setdefault((source, vegetable_id), []).append((
+                    timestamp, record['min_price'], record['max_price'], record['average_price']
+                ))
+            self.latest[source] = entry
+
+    def resolve(self, source, vegetable):
+        """Resolve a vegetable ID or name from a request path"""
+        if vegetable.isdigit():
+            vegetable_id = int(vegetable)
+        else:
+            vegetable_id = self.catalog.find_id(vegetable)
+        return vegetable_id if (source, vegetable_id) in self.history else None
+
+    def latest_prices(self, source):
+        with self.lock:
+            latest = self.latest.get(source)
+            if latest is None:
+                return None
+            return {
+                'source': source,
+                'scrape_timestamp': latest.get('scrape_timestamp'),
+                'vegetables_count': latest.get('vegetables_count'),
+                'vegetables_price_data': latest.get('vegetables_price_data'),
+            }
+
+    def vegetable_history(self, source, vegetable_id, limit=None):
+        with self.lock:
+            points = self.history.get((source, vegetable_id), [])
+            if limit:
+                points = points[-limit:]
+            return {
+                'source': source,
+                'vegetable_id': vegetable_id,
+                'vegetable_name': self.names.get(vegetable_id),
+                'history': [
+                    {'timestamp': ts, 'min_price': low, 'max_price': high, 'average_price': avg}
+                    for ts, low, high, avg in points
+                ],
+            }
+
+    def daily_aggregates(self, source, vegetable_id):
+        with self.lock:
+            points = list(self.history.get((source, vegetable_id), []))
+
+        days = {}
+        for ts, low, high, avg in points:
+            day = (ts or '')[:10]
+            stats = days.get(day)
+            if stats is None:
+                days[day] = [low, high, avg, 1]
+            else:
+                stats[0] = min(stats[0], low)
+                stats[1] = max(stats[1], high)
+                stats[2] += avg
+                stats[3] += 1
+        return {
+            'source': source,
+            'vegetable_id': vegetable_id,
+            'vegetable_name': self.names.get(vegetable_id),
+            'days': [
+                {
+                    'date': day,
+                    'min_price': low,
+                    'max_price': high,
+                    'average_price': round(total / count, 2),
+                    'snapshots': count,
+                }
+                for day, (low, high, total, count) in sorted(days.items())
+            ],
+        }
+
+
+class PriceReadAPI:
+    """Local read-only HTTP API over scraped prices, served from memory"""
+
+    def __init__(self, host='127.0.0.1', port=8765, cache_size=256, cache_ttl=60):
+        self.host = host
+        self.port = port
+        self.store = PriceStore()
+        self.cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self.server = None
+        self.thread = None
+        self.logger = logging.getLogger('PriceReadAPI')
+
+    def on_snapshot_saved(self, entry):
+        """Save listener: fold the new snapshot in and invalidate cached responses"""
+        self.store.add_entry(entry)
+        self.cache.invalidate()
+
+    def handle(self, path, query):
+        """Return (status, payload) for a GET request; ?source= picks the site, default config.SOURCE"""
+        parts = [unquote(part) for part in path.strip('/').split('/') if part]
+        source = query.get('source', [config.SOURCE])[0]
+
+        if parts == ['health']:
+            return 200, {'status': 'ok'}
+        if parts == ['prices', 'latest']:
+            latest = self.store.latest_prices(source)
+            return (200, latest) if latest else (404, {'error': f"No price data yet from {source}"})
+        if len(parts) == 3 and parts[:2] in (['prices', 'history'], ['prices', 'daily']):
+            vegetable_id = self.store.resolve(source, parts[2])
+            if vegetable_id is None:
+                return 404, {'error': f"Unknown vegetable on {source}: {parts[2]}"}
+            if parts[1] == 'history':
+                value = query.get('limit', ['0'])[0] or '0'
+                try:
+                    limit = int(value)
+                except ValueError:
+                    limit = -1
+                if limit < 0:
+                    return 400, {'error': f"limit must be a non-negative integer, got {value!r}"}
+                return 200, self.store.vegetable_history(source, vegetable_id, limit)
+            return 200, self.store.daily_aggregates(source, vegetable_id)
+        return 404, {'error': 'Not found'}
+
+    def respond(self, raw_path):
+        """Return (status, body bytes), serving repeated requests from the cache"""
+        cached = self.cache.get(raw_path)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation
+        url = urlparse(raw_path)
+        try:
+            status, payload = self.handle(url.path, parse_qs(url.query))
+        except ValueError as e:
+            status, payload = 400, {'error': str(e)}
+        response = (status, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        # Don't cache a response computed from data a new snapshot has replaced
+        if status == 200:
+            self.cache.put(raw_path, response, generation)
+        return response
+
+    def start(self):
+        """Load history and start serving in a background thread"""
+        self.store.load()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body = api.respond(self.path)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                api.logger.debug(format % args)
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='price-read-api', daemon=True)
+        self.thread.start()
+        self.logger.info(f"Price read API listening on http://{self.host}:{self.port}")
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,340 @@
+import json
+import logging
+import os
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import config
+
+
+def _atomic_write_json(path, data):
+    tmp_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_file, path)
+
+
+def _price_key(source, vegetable_id, vegetable_name):
+    return f"{source}|{vegetable_id if vegetable_id is not None else vegetable_name}"
+
+
+class ChangeFeedPublisher:
+    """Appends per-vegetable price change events to a feed file after each save
+
+    The feed is written before the state file, which records the feed size it
+    covers. After a crash between the two writes, the events past that size are
+    replayed into the state on startup, so sequence numbers are never reused.
+    """
+
+    def __init__(self, feed_dir=None):
+        feed_dir = feed_dir or config.DATA_DIR
+        self.feed_file = feed_dir / "change_feed.jsonl"
+        self.state_file = feed_dir / "change_feed_state.json"
+        self.offsets_file = feed_dir / "change_feed_offsets.json"
+        self.lock = threading.Lock()
+        self.new_events = threading.Condition()
+        self.logger = logging.getLogger('ChangeFeedPublisher')
+
+        self.state = {'seq': 0, 'last_prices': {}, 'feed_offset': 0}
+        if self.state_file.exists():
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        # Prices are keyed "source|vegetable"; older state predates sources
+        self.state['last_prices'] = {
+            key if '|' in key else f"{config.SOURCE}|{key}": price
+            for key, price in self.state['last_prices'].items()
+        }
+        self.feed_size = self.trim_torn_event()
+        self.recover_state()
+
+    def trim_torn_event(self):
+        """Cut off an event left half-written by a crash; return the feed size"""
+        if not self.feed_file.exists():
+            return 0
+        with open(self.feed_file, 'rb+') as f:
+            size = end = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end != size:
+                f.truncate(end)
+                self.logger.warning(f"Removed {size - end} bytes of a torn event from the end of {self.feed_file}")
+        return end
+
+    def recover_state(self):
+        """Apply events the feed has past the state's feed_offset, left there by a crash"""
+        offset = self.state.get('feed_offset', 0)
+        if offset > self.feed_size:
+            self.logger.warning(f"Change feed state is ahead of {self.feed_file}; not replaying it")
+            return
+        replayed = 0
+        while True:
+            results = self.read_with_offsets(offset, 1000)
+            if not results:
+                break
+            for offset, event in results:
+                self.state['seq'] = max(self.state['seq'], event['seq'])
+                key = _price_key(event.get('source') or config.SOURCE, event['vegetable_id'], event['vegetable_name'])
+                self.state['last_prices'][key] = event['new_price']
+                replayed += 1
+        self.state['feed_offset'] = offset
+        if replayed:
+            _atomic_write_json(self.state_file, self.state)
+            self.logger.warning(f"Recovered {replayed} change event(s) missing from the feed state")
+
+    def on_snapshot_saved(self, entry):
+        """Save listener: publish an event for every vegetable whose price changed"""
+        timestamp = entry.get('scrape_timestamp')
+        source = entry.get('source') or config.SOURCE
+        with self.lock:
+            last_prices = self.state['last_prices']
+            events = []
+            for record in entry.get('vegetables_price_data', []):
+                if 'vegetable_name' not in record:
+                    continue
+                key = _price_key(source, record.get('vegetable_id'), record['vegetable_name'])
+                old_price = last_prices.get(key)
+                new_price = record['average_price']
+                if old_price == new_price:
+                    continue
+                self.state['seq'] += 1
+                events.append({
+                    'seq': self.state['seq'],
+                    'source': source,
+                    'vegetable_id': record.get('vegetable_id'),
+                    'vegetable_name': record['vegetable_name'],
+                    'old_price': old_price,
+                    'new_price': new_price,
+                    'timestamp': timestamp,
+                })
+                last_prices[key] = new_price
+
+            if not events:
+                return
+            with open(self.feed_file, 'ab') as f:
+                f.write(''.join(json.dumps(event, ensure_ascii=False) + "\n" for event in events).encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+                feed_size = f.tell()
+            self.state['feed_offset'] = feed_size
+            _atomic_write_json(self.state_file, self.state)
+
+        self.logger.info(f"Published {len(events)} price change event(s)")
+        with self.new_events:
+            self.feed_size = feed_size
+            self.new_events.notify_all()
+
+    def is_event_boundary(self, offset):
+        """Whether a byte offset is the start of an event, or the end of the feed"""
+        if offset == 0:
+            return True
+        if not 0 < offset <= self.feed_size:
+            return False
+        with open(self.feed_file, 'rb') as f:
+            f.seek(offset - 1)
+            return f.read(1) == b"\n"
+
+    def read_with_offsets(self, offset, max_events=100):
+        """Return [(end_offset, event), ...] for complete lines starting at a byte offset"""
+        if not self.feed_file.exists():
+            return []
+        results = []
+        with open(self.feed_file, 'rb') as f:
+            f.seek(offset)
+            while len(results) < max_events:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # Nothing more, or a line still being written
+                offset += len(line)
+                results.append((offset, json.loads(line)))
+        return results
+
+    def read(self, offset, max_events=100):
+        """Return (events, next_offset) starting at a byte offset"""
+        results = self.read_with_offsets(offset, max_events)
+        if not results:
+            return [], offset
+        return [event for _, event in results], results[-1][0]
+
+    def wait_for_events(self, offset, timeout, stop_event=None):
+        """Wait until the feed has grown past `offset`; return False on timeout
+
+        Also returns once `stop_event` is set. The check and the wait happen
+        under the condition, so events published just before are not missed.
+        """
+        with self.new_events:
+            return self.new_events.wait_for(
+                lambda: self.feed_size > offset or (stop_event is not None and stop_event.is_set()),
+                timeout
+            )
+
+
+class FeedConsumer:
+    """A named reader of the change feed with a durable committed offset"""
+
+    offsets_lock = threading.Lock()
+
+    def __init__(self, publisher, name):
+        self.publisher = publisher
+        self.name = name
+        self.offset = self.load_offsets().get(name, 0)
+
+    def load_offsets(self):
+        path = self.publisher.offsets_file
+        if not path.exists():
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def poll(self, max_events=100):
+        """Return (events, next_offset) after the committed offset"""
+        return self.publisher.read(self.offset, max_events)
+
+    def commit(self, offset):
+        """Durably record that everything before `offset` has been processed"""
+        with self.offsets_lock:
+            offsets = self.load_offsets()
+            offsets[self.name] = offset
+            _atomic_write_json(self.publisher.offsets_file, offsets)
+        self.offset = offset
+
+
+class WebhookPusher:
+    """Pushes feed events to a webhook in batches, at the receiver's pace"""
+
+    def __init__(self, publisher, url, batch_size=100, flush_interval=5, max_backoff=300):
+        self.consumer = FeedConsumer(publisher, 'webhook')
+        self.publisher = publisher
+        self.url = url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.logger = logging.getLogger('WebhookPusher')
+
+    def push(self, events):
+        body = json.dumps({'events': events}, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(
+            self.url, data=body, headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return 200 <= response.status < 300
+
+    def _run(self):
+        backoff = 1
+        while not self.stop_event.is_set():
+            events, next_offset = self.consumer.poll(self.batch_size)
+            if not events:
+                self.publisher.wait_for_events(next_offset, self.flush_interval, self.stop_event)
+                continue
+            try:
+                delivered = self.push(events)
+            except Exception as e:
+                self.logger.warning(f"Webhook delivery failed: {e}")
+                delivered = False
+
+            if delivered:
+                # Unacknowledged events stay in the feed, so a slow receiver only lags behind
+                self.consumer.commit(next_offset)
+                backoff = 1
+            else:
+                self.stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='webhook-pusher', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        with self.publisher.new_events:
+            self.publisher.new_events.notify_all()
+        if self.thread:
+            self.thread.join(timeout=35)
+
+
+class ChangeFeedSSEServer:
+    """Server-Sent Events stream of the change feed; clients resume with Last-Event-ID"""
+
+    def __init__(self, publisher, host='127.0.0.1', port=8766, batch_size=100, keepalive=15):
+        self.publisher = publisher
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.keepalive = keepalive
+        self.server = None
+        self.stop_event = threading.Event()
+        self.logger = logging.getLogger('ChangeFeedSSEServer')
+
+    def start(self):
+        feed = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != '/events':
+                    self.send_error(404)
+                    return
+
+                # Event IDs are feed byte offsets, so reconnecting clients resume exactly
+                query = parse_qs(url.query)
+                start = self.headers.get('Last-Event-ID') or query.get('offset', ['0'])[0]
+                try:
+                    offset = int(start)
+                except ValueError:
+                    self.send_error(400, 'Invalid offset')
+                    return
+                if not feed.publisher.is_event_boundary(offset):
+                    self.send_error(400, 'Offset is not an event boundary')
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                feed.stream(self.wfile, offset)
+
+            def log_message(self, format, *args):
+                feed.logger.debug(format % args)
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='change-feed-sse', daemon=True).start()
+        self.logger.info(f"Change feed SSE stream on http://{self.host}:{self.port}/events")
+
+    def stream(self, wfile, offset):
+        """Write events from `offset` onwards; each client reads the feed at its own pace"""
+        try:
+            while not self.stop_event.is_set():
+                results = self.publisher.read_with_offsets(offset, self.batch_size)
+                if results:
+                    chunks = [
+                        f"id: {end_offset}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                        for end_offset, event in results
+                    ]
+                    offset = results[-1][0]
+                    wfile.write(''.join(chunks).encode('utf-8'))
+                    wfile.flush()
+                    continue
+                if not self.publisher.wait_for_events(offset, self.keepalive, self.stop_event):
+                    wfile.write(b": keepalive\n\n")
+                    wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def stop(self):
+        self.stop_event.set()
+        with self.publisher.new_events:
+            self.publisher.new_events.notify_all()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
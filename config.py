@@ -3,14 +3,18 @@ from pathlib import Path
 
 # Base configuration
 BASE_DIR = Path(__file__).parent
-DATA_DIR = BASE_DIR / "data"
-LOGS_DIR = BASE_DIR / "logs"
+# Overridable from the environment so worker subprocesses, which import this
+# module afresh, share a relocated directory (e.g. scripts/soak_test.py)
+DATA_DIR = Path(os.getenv('SCRAPER_DATA_DIR', BASE_DIR / "data"))
+LOGS_DIR = Path(os.getenv('SCRAPER_LOGS_DIR', BASE_DIR / "logs"))
 
 # Scraping configuration
 URL = "https://nepalipatro.com.np/vegetables"
-HEADLESS = False  # Set to True for production
+SOURCE = "nepalipatro"  # Source name recorded with snapshots of URL
+HEADLESS = os.getenv('SCRAPER_HEADLESS') == '1'  # Set to True for production
 WAIT_TIME = 10  # seconds to wait for page load
 IMPLICIT_WAIT = 5  # seconds for element finding
+PAGE_SETTLE_TIME = float(os.getenv('SCRAPER_PAGE_SETTLE_TIME', 5))  # seconds for JavaScript content after load
 
 # Browser configuration (Arc browser compatible)
 CHROME_OPTIONS = [
@@ -21,10 +25,52 @@ CHROME_OPTIONS = [
     "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
 ]
 
+# Driver cold start: pin the resolved chromedriver/browser paths and reuse a
+# persistent profile with a disk cache instead of a fresh temporary one. Each source
+# gets its own profile under CHROME_PROFILE_DIR, as Chrome locks a profile while in use
+DRIVER_COLD_START = False
+DRIVER_PATHS_FILE = DATA_DIR / "driver_paths.json"
+CHROME_PROFILE_DIR = DATA_DIR / "chrome_profile"
+CHROME_DISK_CACHE_SIZE = 100 * 1024 * 1024  # bytes
+
+# Remote browsers: lease sessions from Selenium standalone servers or a Grid instead of
+# launching Chrome locally, e.g. SCRAPER_REMOTE_WEBDRIVER=http://10.0.0.5:4444,http://10.0.0.6:4444
+REMOTE_WEBDRIVER_URLS = [url.strip() for url in os.getenv('SCRAPER_REMOTE_WEBDRIVER', '').split(',') if url.strip()]
+REMOTE_MAX_SESSIONS = 1  # Concurrent sessions per endpoint (capped by the slots it reports)
+REMOTE_HEALTH_CHECK_INTERVAL = 30  # seconds between /status checks of an endpoint
+REMOTE_ACQUIRE_TIMEOUT = 120  # seconds to wait for a free, healthy endpoint
+# Or name a "module:factory" returning any object with acquire(chrome_options, profile)
+# and release(driver), e.g. the stub driver of scripts/soak_test.py
+DRIVER_PROVIDER = os.getenv('SCRAPER_DRIVER_PROVIDER')
+SELENIUM_SERVER_JAR = os.getenv('SELENIUM_SERVER_JAR', str(BASE_DIR / "selenium-server.jar"))  # For scripts/start_local_grid.py
+
 # Data storage
 OUTPUT_FILE = DATA_DIR / "vegetables_data.json"
 LOG_FILE = LOGS_DIR / "scraper.log"
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotate log files at 10 MB...
+LOG_ROTATE_INTERVAL = 24 * 60 * 60  # ...or once a day, whichever comes first
+LOG_BACKUP_COUNT = 14  # Compressed rotated files to keep
+
+# Raw page archive (content-addressed, gzip-compressed) for offline re-parsing
+ARCHIVE_HTML = True
+ARCHIVE_DIR = DATA_DIR / "html_archive"
+
+# Memory-mapped price matrix (snapshots x vegetable IDs) appended on each save
+PRICE_MATRIX = True
+PRICE_MATRIX_DIR = DATA_DIR / "price_matrix"
+
+# Per-vegetable day/week/month price rollups updated on each save
+ROLLUPS = True
+ROLLUPS_DB = DATA_DIR / "price_rollups.db"
+
+# Opt-in cProfile capture of scrape runs; SCRAPER_PROFILE=1 in the environment or
+# scripts/profile_control.py switches it on (the control file wins over the environment)
+PROFILE_DIR = LOGS_DIR / "profiles"
+PROFILE_CONTROL_FILE = DATA_DIR / "profiling_control.json"
+PROFILE_EVERY_N = 10  # Profile every Nth run (0 disables sampling)...
+PROFILE_THRESHOLD = None  # ...and/or keep any run slower than this many seconds
+PROFILE_KEEP = 50  # Saved profiles to keep
 
 # Create directories if they don't exist
-DATA_DIR.mkdir(exist_ok=True)
-LOGS_DIR.mkdir(exist_ok=True)
\ No newline at end of file
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+LOGS_DIR.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,240 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import deque
+
+
+class LeadershipLostError(Exception):
+    """Raised when work started under one leadership term would finish outside it"""
+
+
+def default_node_id():
+    """Identify this scheduler instance by host and process"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseManager:
+    """Named leases stored in a SQLite file on shared storage
+
+    Expiry never compares wall clocks from different hosts. Every acquire or
+    renewal bumps the lease's version, which doubles as a fencing token. A
+    node that does not hold a lease times out the holder on its own monotonic
+    clock: it may take over only after it has watched the same version for a
+    full TTL. The holder counts its own TTL from before the renewal it wrote,
+    so it stops acting as holder no later than any other node could take over,
+    whatever the skew between their wall clocks. Only clock rate matters, and
+    it is far below the margin of one renewal interval.
+    """
+
+    def __init__(self, db_path, node_id=None):
+        self.db_path = str(db_path)
+        self.node_id = node_id or default_node_id()
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('LeaseManager')
+        self.observed = {}  # name -> (owner, version, monotonic time first seen)
+        self.tokens = {}  # name -> version this node last wrote
+        self.conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                acquired_at REAL NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
+                ttl REAL NOT NULL DEFAULT 0
+            )
+        """)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(leases)")]
+        for column, column_type in (('version', 'INTEGER'), ('ttl', 'REAL')):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE leases ADD COLUMN {column} {column_type} NOT NULL DEFAULT 0")
+
+    def acquire(self, name, ttl):
+        """Acquire or renew a lease; return True if this node now holds it"""
+        now = time.time()  # Only stored for people reading the table
+        observed_at = time.monotonic()
+        with self.lock:
+            # BEGIN IMMEDIATE takes the write lock so check-and-set is atomic across nodes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT owner, version, ttl FROM leases WHERE name = ?", (name,)
+                ).fetchone()
+                if row is not None and row[0] not in (self.node_id, ''):
+                    owner, version, held_ttl = row
+                    observed = self.observed.get(name)
+                    if observed is None or observed[:2] != (owner, version):
+                        self.observed[name] = (owner, version, observed_at)
+                        observed = self.observed[name]
+                    if observed_at - observed[2] < max(ttl, held_ttl):
+                        self.conn.execute("COMMIT")
+                        return False
+                    self.logger.warning(
+                        f"Lease {name} of {owner} not renewed for {max(ttl, held_ttl)}s, taking over"
+                    )
+
+                version = (row[1] if row else 0) + 1
+                acquired_at = now if row is None or row[0] != self.node_id else None
+                self.conn.execute("""
+                    INSERT INTO leases (name, owner, expires_at, acquired_at, version, ttl)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        owner = excluded.owner,
+                        expires_at = excluded.expires_at,
+                        acquired_at = COALESCE(?, leases.acquired_at),
+                        version = excluded.version,
+                        ttl = excluded.ttl
+                """, (name, self.node_id, now + ttl, now, version, ttl, acquired_at))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.observed.pop(name, None)
+            self.tokens[name] = version
+            return True
+
+    def release(self, name):
+        """Release a lease held by this node so another node can take over immediately"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE leases SET owner = '', version = version + 1 WHERE name = ? AND owner = ?",
+                (name, self.node_id)
+            )
+            self.tokens.pop(name, None)
+
+    def token(self, name):
+        """Fencing token of this node's latest acquire or renewal of a lease, or None"""
+        return self.tokens.get(name)
+
+    def holder(self, name):
+        """Return (owner, version) of the lease as stored, or None if nobody holds it
+
+        The stored owner may already have crashed; only acquire() decides expiry.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT owner, version FROM leases WHERE name = ? AND owner != ''", (name,)
+            ).fetchone()
+        return row
+
+    def close(self):
+        self.conn.close()
+
+
+class LeaderElector:
+    """Keeps trying to hold a leader lease and renews it in the background"""
+
+    def __init__(self, lease_manager, lease_name='scheduler_leader', ttl=30, renew_interval=None):
+        self.lease_manager = lease_manager
+        self.lease_name = lease_name
+        self.ttl = ttl
+        self.renew_interval = renew_interval or ttl / 3
+        self.leader_until = 0.0
+        self.term_token = None  # Lease version this leadership term began with
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.logger = logging.getLogger('LeaderElector')
+
+    def _try_acquire(self):
+        # Measure validity from before the attempt so local state never outlives the stored lease
+        attempt_started = time.monotonic()
+        was_leader = self.is_leader()
+        try:
+            acquired = self.lease_manager.acquire(self.lease_name, self.ttl)
+        except sqlite3.Error as e:
+            self.logger.warning(f"Lease renewal failed: {e}")
+            acquired = False
+
+        if acquired:
+            if not was_leader:
+                self.term_token = self.lease_manager.token(self.lease_name)
+                self.logger.info(
+                    f"Node {self.lease_manager.node_id} became leader (fencing token {self.term_token})"
+                )
+            self.leader_until = attempt_started + self.ttl
+        elif was_leader:
+            self.leader_until = 0.0
+            self.term_token = None
+            self.logger.warning(f"Node {self.lease_manager.node_id} lost leadership")
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self._try_acquire()
+            self.stop_event.wait(self.renew_interval)
+
+    def start(self):
+        """Start contending for leadership"""
+        self._try_acquire()
+        self.thread = threading.Thread(target=self._run, name='leader-elector', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop renewing and hand the lease over"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.renew_interval + 5)
+        if self.is_leader():
+            self.lease_manager.release(self.lease_name)
+        self.leader_until = 0.0
+        self.term_token = None
+
+    def is_leader(self):
+        """Whether this node currently holds an unexpired leader lease"""
+        return time.monotonic() < self.leader_until
+
+    def fencing_token(self):
+        """Lease version the current leadership term began with, or None when not leader
+
+        Renewals keep the token; a lapse and re-acquire starts a new term with
+        a higher one. Work that records the token when it starts can check it
+        before writing, and stop if leadership changed hands in between.
+        """
+        if not self.is_leader():
+            return None
+        return self.term_token
+
+
+class KeyedRunQueue:
+    """Runs callables one at a time per key, in arrival order, without parking threads
+
+    A caller whose key is free runs its callable at once and then runs whatever
+    was queued on the key meanwhile. A caller whose key is busy only queues its
+    callable and returns, so its thread is free for work on other keys.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queues = {}  # key -> deque of callables waiting behind the running one
+        self.logger = logging.getLogger('KeyedRunQueue')
+
+    def submit(self, key, func):
+        """Run `func` now if `key` is free; otherwise queue it and return False"""
+        with self.lock:
+            queue = self.queues.get(key)
+            if queue is not None:
+                queue.append(func)
+                return False
+            self.queues[key] = deque()
+
+        while func is not None:
+            try:
+                func()
+            except Exception:
+                self.logger.exception(f"Queued run on {key} failed")
+            with self.lock:
+                queue = self.queues[key]
+                if queue:
+                    func = queue.popleft()
+                else:
+                    del self.queues[key]
+                    func = None
+        return True
+
+    def waiting(self, key):
+        """Number of callables running or queued for `key`"""
+        with self.lock:
+            queue = self.queues.get(key)
+            return 0 if queue is None else len(queue) + 1
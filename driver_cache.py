@@ -0,0 +1,66 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def _load_cached_paths():
+    if not config.DRIVER_PATHS_FILE.exists():
+        return None
+    try:
+        with open(config.DRIVER_PATHS_FILE, 'r') as f:
+            paths = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # A browser or driver update can remove the pinned binaries
+    if not Path(paths.get('driver_path') or '').exists():
+        return None
+    if paths.get('browser_path') and not Path(paths['browser_path']).exists():
+        return None
+    return paths
+
+
+def resolve_driver_paths(chrome_options):
+    """Return pinned chromedriver and browser paths, resolving them once via Selenium Manager"""
+    paths = _load_cached_paths()
+    if paths:
+        return paths
+
+    from selenium.webdriver.common.selenium_manager import SeleniumManager
+
+    driver_path = SeleniumManager().driver_location(chrome_options)
+    paths = {
+        'driver_path': driver_path,
+        'browser_path': getattr(chrome_options, 'binary_location', None) or None,
+    }
+    tmp_file = config.DRIVER_PATHS_FILE.with_name(f"{config.DRIVER_PATHS_FILE.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w') as f:
+        json.dump(paths, f, indent=2)
+    os.replace(tmp_file, config.DRIVER_PATHS_FILE)
+    logger.info(f"Pinned chromedriver at {driver_path}")
+    return paths
+
+
+def forget_driver_paths():
+    """Drop pinned paths so the next launch resolves them again"""
+    try:
+        config.DRIVER_PATHS_FILE.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def apply_cold_start_options(chrome_options, profile_name='default'):
+    """Reuse a persistent profile and disk cache so static assets survive between runs
+
+    Chrome refuses to start on a profile another Chrome has open, so browsers
+    that may run at the same time need different `profile_name`s.
+    """
+    profile_dir = config.CHROME_PROFILE_DIR / profile_name
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    chrome_options.add_argument(f"--disk-cache-dir={profile_dir / 'cache'}")
+    chrome_options.add_argument(f"--disk-cache-size={config.CHROME_DISK_CACHE_SIZE}")
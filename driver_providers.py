@@ -0,0 +1,280 @@
+import importlib
+import itertools
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+import config
+import driver_cache
+
+logger = logging.getLogger(__name__)
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+class NoDriverAvailableError(Exception):
+    """Raised when no remote endpoint can take another browser session in time"""
+
+
+class LocalChromeProvider:
+    """Launches a Chrome on this machine for each scrape"""
+
+    name = 'local Chrome'
+
+    def acquire(self, chrome_options, profile=None):
+        if config.DRIVER_COLD_START:
+            return self.launch_pinned_driver(chrome_options, profile or 'default')
+        return webdriver.Chrome(options=chrome_options)
+
+    def launch_pinned_driver(self, chrome_options, profile):
+        """Launch Chrome from pinned paths with the persistent profile"""
+        driver_cache.apply_cold_start_options(chrome_options, profile)
+        paths = driver_cache.resolve_driver_paths(chrome_options)
+        if paths['browser_path']:
+            chrome_options.binary_location = paths['browser_path']
+        try:
+            return webdriver.Chrome(options=chrome_options, service=Service(paths['driver_path']))
+        except Exception as e:
+            # Pinned binaries may no longer match each other after an update
+            logger.warning(f"Launch with pinned driver failed, resolving again: {e}")
+            driver_cache.forget_driver_paths()
+            paths = driver_cache.resolve_driver_paths(chrome_options)
+            return webdriver.Chrome(options=chrome_options, service=Service(paths['driver_path']))
+
+    def release(self, driver):
+        driver.quit()
+
+
+class RemoteEndpoint:
+    """Health and load of one Selenium standalone server or Grid hub"""
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        self.active = 0  # Sessions leased by this process
+        self.external_sessions = 0  # Sessions other clients held at the last health check
+        self.total_slots = None
+        self.healthy = True
+        self.last_checked = 0.0
+
+    def load(self):
+        return self.active + self.external_sessions
+
+    def capacity(self, max_sessions):
+        if self.total_slots:
+            return min(max_sessions, self.total_slots)
+        return max_sessions
+
+
+class RemoteDriverPool:
+    """Leases webdriver.Remote sessions from several endpoints
+
+    Each session goes to the least-loaded healthy endpoint, with ties taken in
+    turn. Endpoints are health-checked through their /status page at most every
+    `health_check_interval` seconds. An endpoint that fails a check, refuses a
+    session or errors when a session is closed is skipped until it passes a
+    check again, and its work fails over to the others.
+    """
+
+    name = 'remote WebDriver pool'
+
+    def __init__(self, urls, max_sessions_per_endpoint=1, health_check_interval=30,
+                 acquire_timeout=120, status_timeout=5, session_listener=None):
+        if not urls:
+            raise ValueError("RemoteDriverPool needs at least one endpoint URL")
+        self.endpoints = [RemoteEndpoint(url) for url in urls]
+        self.max_sessions = max_sessions_per_endpoint
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.status_timeout = status_timeout
+        self.turn = itertools.count()
+        self.sessions = {}  # id(driver) -> endpoint
+        self.condition = threading.Condition()
+        # Called with (endpoint_url, session_id) for each new session, so a parent
+        # process can end sessions of a worker it had to kill
+        self.session_listener = session_listener
+
+    def check_health(self, endpoint):
+        """Ask the endpoint's /status whether it can take new sessions"""
+        try:
+            with urllib.request.urlopen(f"{endpoint.url}/status", timeout=self.status_timeout) as response:
+                status = json.load(response).get('value', {})
+            healthy = bool(status.get('ready'))
+            slots = [slot for node in status.get('nodes', []) for slot in node.get('slots', [])]
+        except Exception as e:
+            logger.warning(f"Health check of {endpoint.url} failed: {e}")
+            healthy, slots = False, []
+
+        with self.condition:
+            if healthy != endpoint.healthy:
+                logger.info(f"WebDriver endpoint {endpoint.url} is {'healthy' if healthy else 'unhealthy'}")
+            endpoint.healthy = healthy
+            endpoint.last_checked = time.monotonic()
+            if slots:
+                endpoint.total_slots = len(slots)
+                busy_slots = sum(1 for slot in slots if slot.get('session'))
+                endpoint.external_sessions = max(0, busy_slots - endpoint.active)
+            if healthy:
+                self.condition.notify_all()
+        return healthy
+
+    def refresh_health(self, refresh_load=False):
+        """Re-check endpoints whose last health check is out of date
+
+        With `refresh_load`, healthy endpoints are checked regardless, so their
+        session counts include what other processes have leased since.
+        """
+        now = time.monotonic()
+        for endpoint in self.endpoints:
+            due = now - endpoint.last_checked >= self.health_check_interval
+            if due or (refresh_load and endpoint.healthy):
+                self.check_health(endpoint)
+
+    def mark_unhealthy(self, endpoint, reason):
+        with self.condition:
+            endpoint.healthy = False
+            endpoint.last_checked = time.monotonic()
+        logger.warning(f"Taking WebDriver endpoint {endpoint.url} out of rotation: {reason}")
+
+    def _reserve(self, exclude):
+        """Pick the least-loaded healthy endpoint with a free slot and count a session on it"""
+        turn = next(self.turn)
+        candidates = [
+            endpoint for endpoint in self.endpoints
+            if endpoint.healthy and endpoint not in exclude
+            and endpoint.load() < endpoint.capacity(self.max_sessions)
+        ]
+        if not candidates:
+            return None
+        # Rotate before sorting so equally loaded endpoints share the work
+        offset = turn % len(candidates)
+        candidates = candidates[offset:] + candidates[:offset]
+        endpoint = min(candidates, key=lambda candidate: candidate.load())
+        endpoint.active += 1
+        return endpoint
+
+    def acquire(self, chrome_options, profile=None):
+        """Start a browser session on the best available endpoint, failing over on errors
+
+        `profile` is accepted for parity with LocalChromeProvider; remote sessions
+        always get a fresh profile on their node. Each worker process has its own
+        pool, so the current load of every endpoint is read from its /status
+        before choosing; sessions leased by other workers count against it.
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        failed = []
+        last_error = None
+        while True:
+            self.refresh_health(refresh_load=True)
+            with self.condition:
+                endpoint = self._reserve(failed)
+                if endpoint is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    # Wait for a session to be released or an endpoint to recover
+                    self.condition.wait(min(remaining, self.health_check_interval))
+                    failed.clear()
+                    continue
+
+            try:
+                driver = webdriver.Remote(command_executor=endpoint.url, options=chrome_options)
+            except Exception as e:
+                last_error = e
+                with self.condition:
+                    endpoint.active -= 1
+                self.mark_unhealthy(endpoint, f"session not created ({type(e).__name__}: {e})")
+                failed.append(endpoint)
+                continue
+
+            with self.condition:
+                self.sessions[id(driver)] = endpoint
+            logger.info(f"Leased browser session from {endpoint.url} ({endpoint.active} active there)")
+            if self.session_listener:
+                try:
+                    self.session_listener(endpoint.url, driver.session_id)
+                except Exception as e:
+                    logger.warning(f"Session listener failed: {e}")
+            return driver
+
+        message = f"No WebDriver endpoint could start a session within {self.acquire_timeout}s"
+        if last_error:
+            message += f" (last error: {last_error})"
+        raise NoDriverAvailableError(message)
+
+    def release(self, driver):
+        """End a session and return its slot to the pool"""
+        with self.condition:
+            endpoint = self.sessions.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            if endpoint:
+                self.mark_unhealthy(endpoint, f"session did not close cleanly ({e})")
+            raise
+        finally:
+            if endpoint:
+                with self.condition:
+                    endpoint.active -= 1
+                    self.condition.notify_all()
+
+    def status(self):
+        """Snapshot of every endpoint's health and load"""
+        with self.condition:
+            return [
+                {
+                    'url': endpoint.url,
+                    'healthy': endpoint.healthy,
+                    'active': endpoint.active,
+                    'external_sessions': endpoint.external_sessions,
+                    'total_slots': endpoint.total_slots,
+                }
+                for endpoint in self.endpoints
+            ]
+
+
+def delete_remote_session(url, session_id, timeout=10):
+    """End a remote browser session directly through the W3C endpoint
+
+    For sessions whose client was killed before it could quit them. A session
+    that has already ended is not an error.
+    """
+    request = urllib.request.Request(f"{url.rstrip('/')}/session/{session_id}", method='DELETE')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout):
+            pass
+    except urllib.error.HTTPError as e:
+        if e.code != 404:
+            logger.warning(f"Could not end session {session_id} on {url}: HTTP {e.code}")
+            return False
+    except Exception as e:
+        logger.warning(f"Could not end session {session_id} on {url}: {e}")
+        return False
+    logger.info(f"Ended orphaned browser session {session_id} on {url}")
+    return True
+
+
+def get_driver_provider():
+    """The process-wide driver provider chosen by config"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            if config.DRIVER_PROVIDER:
+                module_name, _, factory = config.DRIVER_PROVIDER.partition(':')
+                _provider = getattr(importlib.import_module(module_name), factory)()
+            elif config.REMOTE_WEBDRIVER_URLS:
+                _provider = RemoteDriverPool(
+                    config.REMOTE_WEBDRIVER_URLS,
+                    max_sessions_per_endpoint=config.REMOTE_MAX_SESSIONS,
+                    health_check_interval=config.REMOTE_HEALTH_CHECK_INTERVAL,
+                    acquire_timeout=config.REMOTE_ACQUIRE_TIMEOUT
+                )
+            else:
+                _provider = LocalChromeProvider()
+        return _provider
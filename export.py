@@ -0,0 +1,180 @@
+import csv
+import json
+import logging
+import os
+from datetime import datetime
+
+import config
+
+EXPORT_FORMATS = ('csv', 'parquet', 'xlsx')
+
+EXPORT_COLUMNS = [
+    'scrape_timestamp', 'source', 'vegetable_id', 'vegetable_name',
+    'min_price', 'max_price', 'average_price', 'price_count',
+]
+
+logger = logging.getLogger(__name__)
+
+
+def iter_history(path=None, chunk_size=64 * 1024):
+    """Yield history entries one at a time from the JSON array file
+
+    Only the current entry and one read chunk are held in memory, however long
+    the history is.
+    """
+    path = path or config.OUTPUT_FILE
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer:
+            return
+        if not buffer.startswith('['):
+            raise ValueError(f"{path} does not contain a JSON array")
+        position = 1
+        eof = False
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer):
+                if buffer[position] == ']':
+                    return
+                try:
+                    entry, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield entry
+                    continue
+            elif eof:
+                raise ValueError(f"Unterminated JSON array in {path}")
+
+            # The next entry is incomplete: drop what was consumed and read more
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def naive_local(moment):
+    """A datetime as naive local time, the form scrape timestamps are recorded in"""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+
+def iter_rows(entries, start=None, end=None, vegetables=None):
+    """Flatten entries into export rows, keeping start <= timestamp < end and the given vegetables
+
+    `vegetables` is a set of vegetable IDs and/or lower-cased names. Timezone-aware
+    bounds are converted to local time before comparing.
+    """
+    start, end = naive_local(start), naive_local(end)
+    for entry in entries:
+        timestamp = entry.get('scrape_timestamp')
+        if timestamp is None:
+            continue
+        if start or end:
+            moment = naive_local(datetime.fromisoformat(timestamp))
+            if (start and moment < start) or (end and moment >= end):
+                continue
+        for record in entry.get('vegetables_price_data', []):
+            if 'vegetable_name' not in record:
+                continue
+            if vegetables and (record.get('vegetable_id') not in vegetables
+                               and record['vegetable_name'].lower() not in vegetables):
+                continue
+            yield {
+                'scrape_timestamp': timestamp,
+                'source': entry.get('source'),
+                'vegetable_id': record.get('vegetable_id'),
+                'vegetable_name': record['vegetable_name'],
+                'min_price': record['min_price'],
+                'max_price': record['max_price'],
+                'average_price': record['average_price'],
+                'price_count': record.get('price_count'),
+            }
+
+
+def write_csv(rows, path):
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_parquet(rows, path, batch_size):
+    """Write rows as Parquet, one row group per `batch_size` rows"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow: pip install pyarrow")
+
+    schema = pa.schema([
+        ('scrape_timestamp', pa.string()),
+        ('source', pa.string()),
+        ('vegetable_id', pa.int64()),
+        ('vegetable_name', pa.string()),
+        ('min_price', pa.float64()),
+        ('max_price', pa.float64()),
+        ('average_price', pa.float64()),
+        ('price_count', pa.int64()),
+    ])
+    count = 0
+    with pq.ParquetWriter(path, schema, compression='snappy') as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch or count == 0:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def write_xlsx(rows, path):
+    """Write rows with openpyxl's write-only workbook, which streams them to disk"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Prices")
+    sheet.append(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        sheet.append([row[column] for column in EXPORT_COLUMNS])
+        count += 1
+    workbook.save(path)
+    return count
+
+
+def export_history(output, fmt=None, start=None, end=None, vegetables=None,
+                   history_file=None, batch_size=10000):
+    """Stream the price history into a CSV, Parquet or XLSX file; return the row count"""
+    fmt = fmt or output.suffix.lstrip('.').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+
+    rows = iter_rows(iter_history(history_file), start, end, vegetables)
+    tmp_path = output.with_name(f"{output.stem}.{os.getpid()}.tmp{output.suffix}")
+    try:
+        if fmt == 'csv':
+            count = write_csv(rows, tmp_path)
+        elif fmt == 'parquet':
+            count = write_parquet(rows, tmp_path, batch_size)
+        else:
+            count = write_xlsx(rows, tmp_path)
+        os.replace(tmp_path, output)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    logger.info(f"Exported {count} rows to {output}")
+    return count
@@ -0,0 +1,158 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import config
+
+
+class HtmlArchive:
+    """Content-addressed, gzip-compressed store of raw scraped pages"""
+
+    def __init__(self, archive_dir=None):
+        self.archive_dir = archive_dir or config.ARCHIVE_DIR
+        self.objects_dir = self.archive_dir / "objects"
+        self.index_file = self.archive_dir / "index.jsonl"
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('HtmlArchive')
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+    def object_path(self, content_hash):
+        return self.objects_dir / content_hash[:2] / f"{content_hash}.html.gz"
+
+    def store(self, html, url, timestamp=None, source=None):
+        """Archive a page and record the run and its source in the index; return its content hash"""
+        data = html.encode('utf-8')
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self.object_path(content_hash)
+
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.logger.info(f"Archived page HTML ({len(data)} bytes) as {content_hash[:12]}")
+        else:
+            self.logger.info(f"Page HTML unchanged since a previous run ({content_hash[:12]})")
+
+        record = {
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'sha256': content_hash,
+            'url': url,
+            'source': source or config.SOURCE,
+            'size': len(data),
+        }
+        with self.lock, open(self.index_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+        return content_hash
+
+    def load(self, content_hash):
+        """Return the archived HTML for a content hash"""
+        with gzip.open(self.object_path(content_hash), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def iter_index(self):
+        """Yield archived run records in the order they were scraped"""
+        if not self.index_file.exists():
+            return
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def extract_raw_rows(html):
+    """Offline equivalent of the row extraction in scrape_vegetables_data()"""
+    from bs4 import BeautifulSoup
+    from scraper import NepaliPatroVegetableScraper
+
+    soup = BeautifulSoup(html, 'lxml')
+    raw_data = []
+    for selector in NepaliPatroVegetableScraper.PRICE_SELECTORS:
+        elements = soup.select(selector)
+        if len(elements) > 1:
+            for i, element in enumerate(elements):
+                text_content = element.get_text(' ', strip=True)
+                if not (text_content and len(text_content.split()) > 1):
+                    continue
+
+                cells = element.find_all('td') or element.find_all('th')
+                raw_info = {
+                    'row_index': i,
+                    'full_text': text_content,
+                    'selector_used': selector
+                }
+                if cells:
+                    raw_info['cells'] = [cell.get_text(' ', strip=True) for cell in cells]
+                raw_data.append(raw_info)
+            break
+    return raw_data
+
+
+_reparse_scraper = None
+
+
+def _init_reparse_worker(log_queue):
+    """Process pool initializer: log through the parent and build the one scraper this process uses"""
+    global _reparse_scraper
+    from logging_setup import configure_worker_logging
+    from scraper import NepaliPatroVegetableScraper
+
+    configure_worker_logging(log_queue)
+    _reparse_scraper = NepaliPatroVegetableScraper()
+
+
+def _reparse_page(task):
+    """Process pool worker: re-run extraction and processing over one archived page"""
+    content_hash, archive_dir = task
+    html = HtmlArchive(archive_dir).load(content_hash)
+    raw_data = extract_raw_rows(html)
+    if not raw_data:
+        return content_hash, []
+    return content_hash, _reparse_scraper.process_price_data(raw_data).to_storage()
+
+
+def reparse_archive(output_file, archive_dir=None, max_workers=None):
+    """Rebuild the price history from archived pages without touching the network"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from logging_setup import get_log_queue, setup_logging
+
+    # Workers log through this process's listener rather than each opening the log file
+    setup_logging()
+    archive = HtmlArchive(archive_dir)
+    runs = list(archive.iter_index())
+    unique_hashes = list(dict.fromkeys(run['sha256'] for run in runs))
+
+    # Each distinct page is parsed once, however many runs it was seen in
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_reparse_worker,
+        initargs=(get_log_queue(),)
+    ) as executor:
+        tasks = [(content_hash, archive.archive_dir) for content_hash in unique_hashes]
+        parsed = dict(executor.map(_reparse_page, tasks, chunksize=8))
+
+    history = []
+    for run in runs:
+        vegetables_price_data = parsed[run['sha256']]
+        history.append({
+            'scrape_timestamp': run['timestamp'],
+            'vegetables_count': len(vegetables_price_data),
+            'vegetables_price_data': vegetables_price_data,
+            # Index records from before sources were all scraped from config.URL
+            'source': run.get('source') or config.SOURCE,
+            'source_html': run['sha256'],
+        })
+
+    tmp_file = output_file.with_name(f"{output_file.name}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, output_file)
+    return len(runs), len(unique_hashes)
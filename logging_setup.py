@@ -0,0 +1,261 @@
+import atexit
+import contextvars
+import copy
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import config
+
+_run_id = contextvars.ContextVar('run_id', default=None)
+_setup_lock = threading.Lock()
+_handlers = None
+_listener = None
+_worker_queue = None
+_worker_listener = None
+_configured = False
+
+
+def new_run_id():
+    """Generate a run ID and make it current for this thread or task"""
+    run_id = uuid.uuid4().hex[:12]
+    _run_id.set(run_id)
+    return run_id
+
+
+def set_run_id(run_id):
+    _run_id.set(run_id)
+
+
+def get_run_id():
+    return _run_id.get()
+
+
+class RunIdFilter(logging.Filter):
+    """Stamp records with the current run ID before they leave the logging thread"""
+
+    def filter(self, record):
+        if not hasattr(record, 'run_id'):
+            record.run_id = _run_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'process': record.process,
+            'thread': record.threadName,
+            'run_id': getattr(record, 'run_id', None),
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Formatted by StructuredQueueHandler before the record was queued
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class StructuredQueueHandler(QueueHandler):
+    """QueueHandler that keeps a record's traceback in exc_text instead of its message
+
+    The stock handler folds the traceback into the message and drops exc_info,
+    which would leave JsonFormatter's `exception` field empty. Formatters
+    append exc_text on their own, so console output is unchanged.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+_traceback_formatter = logging.Formatter()
+
+
+class _PipeSender:
+    """Lets a QueueHandler send records down a multiprocessing Pipe"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+
+    def put_nowait(self, record):
+        with self.lock:
+            self.conn.send(record)
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """Rotates when the file exceeds max_bytes or is older than rotate_interval, gzipping old files"""
+
+    def __init__(self, filename, max_bytes, backup_count, rotate_interval):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.rotate_interval = rotate_interval
+        self.next_rollover = time.time() + rotate_interval
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = self.compress
+
+    @staticmethod
+    def compress(source, dest):
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+    def shouldRollover(self, record):
+        if time.time() >= self.next_rollover:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.next_rollover = time.time() + self.rotate_interval
+
+
+def setup_logging(log_file=None, level=logging.INFO):
+    """Route all logging through a queue to a background writer; safe to call repeatedly"""
+    global _handlers, _listener, _configured
+
+    with _setup_lock:
+        if _configured:
+            return
+        log_file = log_file or config.LOG_FILE
+
+        file_handler = CompressingRotatingFileHandler(
+            log_file,
+            max_bytes=config.LOG_MAX_BYTES,
+            backup_count=config.LOG_BACKUP_COUNT,
+            rotate_interval=config.LOG_ROTATE_INTERVAL
+        )
+        file_handler.setFormatter(JsonFormatter())
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+        # A plain in-process queue: a multiprocessing one would start a
+        # resource tracker process even when no worker ever uses it
+        _handlers = (file_handler, stream_handler)
+        log_queue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        _install_queue_handler(log_queue, level)
+        _configured = True
+
+
+def configure_worker_logging(log_queue, level=logging.INFO):
+    """Send a subprocess worker's logging to the parent's listener
+
+    For workers that exit normally, such as process pool initializers. A
+    worker that may be killed should log through open_worker_log_channel().
+    """
+    global _configured
+
+    with _setup_lock:
+        if _configured or log_queue is None:
+            return
+        _install_queue_handler(log_queue, level)
+        _configured = True
+
+
+def open_worker_log_channel(context):
+    """Give one subprocess worker a private log pipe; return its end and the replay thread
+
+    A worker killed mid-send can corrupt the channel it was writing to. With a
+    pipe per worker that only ends this channel: the replay thread sees EOF and
+    exits, and the shared queue and its listener are never touched. The caller
+    must close its copy of the returned connection once the worker has started.
+    """
+    receive_conn, send_conn = context.Pipe(duplex=False)
+    thread = threading.Thread(
+        target=_replay_worker_records, args=(receive_conn,), name='worker-log-replay', daemon=True
+    )
+    thread.start()
+    return send_conn, thread
+
+
+def _replay_worker_records(conn):
+    """Hand records from a worker's pipe to this process's logging until the pipe closes"""
+    try:
+        while True:
+            try:
+                record = conn.recv()
+            except (EOFError, OSError):
+                break
+            except Exception:
+                # A truncated record from a killed worker; nothing after it can be trusted
+                break
+            logger = logging.getLogger(record.name)
+            if logger.isEnabledFor(record.levelno):
+                logger.handle(record)
+    finally:
+        conn.close()
+
+
+def configure_worker_pipe_logging(conn, level=logging.INFO):
+    """Send a subprocess worker's logging down the pipe from open_worker_log_channel()"""
+    global _configured
+
+    with _setup_lock:
+        if _configured or conn is None:
+            return
+        _install_queue_handler(_PipeSender(conn), level)
+        _configured = True
+
+
+def _install_queue_handler(log_queue, level):
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(RunIdFilter())
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+
+def get_log_queue():
+    """Queue to hand to subprocess workers, or None if logging is not set up here
+
+    Created on first use, with its own listener writing to the same handlers.
+    """
+    global _worker_queue, _worker_listener
+
+    with _setup_lock:
+        if _handlers is None:
+            return None
+        if _worker_queue is None:
+            _worker_queue = multiprocessing.get_context('spawn').Queue(-1)
+            _worker_listener = QueueListener(_worker_queue, *_handlers, respect_handler_level=True)
+            _worker_listener.start()
+        return _worker_queue
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer"""
+    global _listener, _worker_listener
+
+    with _setup_lock:
+        if _worker_listener is not None:
+            _worker_listener.stop()
+            _worker_listener = None
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+import config
+
+ROW_CHUNK = 1024  # Rows added each time the matrix files grow
+INITIAL_COLUMNS = 64
+
+
+def _atomic_write_json(path, data):
+    tmp_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_file, path)
+
+
+def to_datetime64(value):
+    """Second-resolution numpy timestamp from an ISO string or datetime"""
+    return np.datetime64(value).astype('datetime64[s]')
+
+
+class PriceMatrixView:
+    """Read-only view of the price matrix; slicing it never copies the data"""
+
+    def __init__(self, timestamps, vegetable_ids, vegetable_names, prices):
+        self.timestamps = timestamps  # datetime64[s], one per row
+        self.vegetable_ids = vegetable_ids
+        self.vegetable_names = vegetable_names
+        self.prices = prices  # rows x vegetables, NaN where a vegetable was not listed
+        self.columns = {vegetable_id: i for i, vegetable_id in enumerate(vegetable_ids)}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def column(self, vegetable_id):
+        """Price series of one vegetable"""
+        return self.prices[:, self.columns[vegetable_id]]
+
+    def between(self, start=None, end=None):
+        """Rows with start <= timestamp < end"""
+        first = 0 if start is None else np.searchsorted(self.timestamps, to_datetime64(start))
+        last = len(self.timestamps) if end is None else np.searchsorted(self.timestamps, to_datetime64(end))
+        return PriceMatrixView(
+            self.timestamps[first:last], self.vegetable_ids, self.vegetable_names, self.prices[first:last]
+        )
+
+
+class PriceMatrix:
+    """Append-only memory-mapped price matrix: one row per snapshot, one column per vegetable ID
+
+    Each source has its own matrix under PRICE_MATRIX_DIR, so a column only ever
+    holds one site's prices for a vegetable.
+
+    Prices and timestamps live in raw float64/datetime64 files sized in chunks of
+    ROW_CHUNK rows; index.json records how many rows are committed, the column
+    order and the vegetable names. A row only becomes visible to readers once the
+    index is replaced, so a crash mid-append leaves the previous rows intact.
+    Only one process should append at a time.
+    """
+
+    def __init__(self, source=None, matrix_dir=None, field='average_price'):
+        self.source = source or config.SOURCE
+        self.matrix_dir = matrix_dir or config.PRICE_MATRIX_DIR / self.source
+        self.index_file = self.matrix_dir / "index.json"
+        self.timestamps_file = self.matrix_dir / "timestamps.datetime64"
+        self.field = field
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('PriceMatrix')
+
+    def load_index(self):
+        if not self.index_file.exists():
+            return {
+                'rows': 0,
+                'row_capacity': 0,
+                'column_capacity': INITIAL_COLUMNS,
+                'prices_file': f"prices_{INITIAL_COLUMNS}.f64",
+                'vegetable_ids': [],
+                'vegetable_names': [],
+            }
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def read(self):
+        """Map the committed rows read-only"""
+        for _ in range(2):
+            index = self.load_index()
+            rows = index['rows']
+            width = len(index['vegetable_ids'])
+            if rows == 0:
+                return PriceMatrixView(
+                    np.empty(0, dtype='datetime64[s]'), [], [], np.empty((0, width))
+                )
+            try:
+                prices = np.memmap(
+                    self.matrix_dir / index['prices_file'], dtype=np.float64, mode='r',
+                    shape=(rows, index['column_capacity'])
+                )
+            except FileNotFoundError:
+                continue  # Widened by the writer since the index was read
+            timestamps = np.memmap(self.timestamps_file, dtype='datetime64[s]', mode='r', shape=(rows,))
+            return PriceMatrixView(
+                timestamps, index['vegetable_ids'], index['vegetable_names'], prices[:, :width]
+            )
+        raise RuntimeError("Price matrix changed while it was being opened")
+
+    def append_entry(self, entry):
+        """Append one history entry as a row of `field` values"""
+        values = {}
+        names = {}
+        for record in entry.get('vegetables_price_data', []):
+            if record.get('vegetable_id') is None or self.field not in record:
+                continue
+            values[record['vegetable_id']] = record[self.field]
+            names[record['vegetable_id']] = record['vegetable_name']
+        self.append_row(entry['scrape_timestamp'], values, names)
+
+    def append_row(self, timestamp, values, names):
+        """Append one snapshot given {vegetable_id: price} and {vegetable_id: name}"""
+        with self.lock:
+            self.matrix_dir.mkdir(parents=True, exist_ok=True)
+            index = self.load_index()
+            columns = {vegetable_id: i for i, vegetable_id in enumerate(index['vegetable_ids'])}
+            for vegetable_id in values:
+                if vegetable_id not in columns:
+                    columns[vegetable_id] = len(index['vegetable_ids'])
+                    index['vegetable_ids'].append(vegetable_id)
+                    index['vegetable_names'].append(names.get(vegetable_id, str(vegetable_id)))
+
+            old_prices_file = None
+            if len(columns) > index['column_capacity']:
+                old_prices_file = index['prices_file']
+                self._widen(index, max(index['column_capacity'] * 2, len(columns)))
+            if index['rows'] >= index['row_capacity']:
+                self._grow(index)
+
+            row = np.full(index['column_capacity'], np.nan)
+            for vegetable_id, value in values.items():
+                row[columns[vegetable_id]] = value
+
+            prices = np.memmap(
+                self.matrix_dir / index['prices_file'], dtype=np.float64, mode='r+',
+                shape=(index['row_capacity'], index['column_capacity'])
+            )
+            prices[index['rows']] = row
+            prices.flush()
+            timestamps = np.memmap(
+                self.timestamps_file, dtype='datetime64[s]', mode='r+', shape=(index['row_capacity'],)
+            )
+            timestamps[index['rows']] = to_datetime64(timestamp)
+            timestamps.flush()
+            del prices, timestamps
+
+            index['rows'] += 1
+            _atomic_write_json(self.index_file, index)
+            if old_prices_file:
+                (self.matrix_dir / old_prices_file).unlink(missing_ok=True)
+
+    def _grow(self, index):
+        """Extend both files by ROW_CHUNK rows of NaN/NaT"""
+        for path, chunk, row_bytes in (
+            (self.matrix_dir / index['prices_file'],
+             np.full((ROW_CHUNK, index['column_capacity']), np.nan),
+             index['column_capacity'] * 8),
+            (self.timestamps_file, np.full(ROW_CHUNK, np.datetime64('NaT'), dtype='datetime64[s]'), 8),
+        ):
+            with open(path, 'r+b' if path.exists() else 'wb') as f:
+                # Truncate to the committed capacity first, in case an earlier grow was interrupted
+                f.seek(index['row_capacity'] * row_bytes)
+                f.truncate()
+                chunk.tofile(f)
+        index['row_capacity'] += ROW_CHUNK
+
+    def _widen(self, index, column_capacity):
+        """Copy the matrix into a new file with more columns"""
+        prices_file = f"prices_{column_capacity}.f64"
+        if index['row_capacity']:
+            widened = np.memmap(
+                self.matrix_dir / prices_file, dtype=np.float64, mode='w+',
+                shape=(index['row_capacity'], column_capacity)
+            )
+            widened[:] = np.nan
+            old = np.memmap(
+                self.matrix_dir / index['prices_file'], dtype=np.float64, mode='r',
+                shape=(index['row_capacity'], index['column_capacity'])
+            )
+            widened[:, :index['column_capacity']] = old
+            widened.flush()
+            del widened, old
+            self.logger.info(f"Widened price matrix to {column_capacity} columns")
+        index['prices_file'] = prices_file
+        index['column_capacity'] = column_capacity
+
+    def clear(self):
+        """Delete every row and column"""
+        with self.lock:
+            if self.matrix_dir.exists():
+                for path in self.matrix_dir.iterdir():
+                    if path.name == 'index.json' or path.suffix in ('.f64', '.datetime64'):
+                        path.unlink()
+
+    def rebuild(self, entries):
+        """Replace the matrix with rows built from this source's history entries"""
+        self.clear()
+        count = 0
+        for entry in entries:
+            if (entry.get('source') or config.SOURCE) == self.source:
+                self.append_entry(entry)
+                count += 1
+        return count
+
+
+def matrix_sources():
+    """Sources that have a price matrix"""
+    if not config.PRICE_MATRIX_DIR.exists():
+        return []
+    return sorted(path.name for path in config.PRICE_MATRIX_DIR.iterdir() if (path / "index.json").exists())
+
+
+def rebuild_matrices(entries):
+    """Rebuild the matrix of every source in one pass over the history; return {source: rows}"""
+    matrices = {}
+    counts = {}
+    for entry in entries:
+        source = entry.get('source') or config.SOURCE
+        matrix = matrices.get(source)
+        if matrix is None:
+            matrix = matrices[source] = PriceMatrix(source)
+            matrix.clear()
+            counts[source] = 0
+        matrix.append_entry(entry)
+        counts[source] += 1
+    return counts
@@ -0,0 +1,55 @@
+import sys
+from array import array
+from datetime import datetime
+
+
+class PriceRecord:
+    """Prices collected for one vegetable in a snapshot"""
+    __slots__ = ('vegetable_id', 'vegetable_name', 'prices')
+
+    def __init__(self, vegetable_id, vegetable_name):
+        self.vegetable_id = vegetable_id
+        self.vegetable_name = sys.intern(vegetable_name)
+        self.prices = array('d')
+
+    def to_dict(self):
+        """Serialize to the storage record format"""
+        prices = self.prices
+        return {
+            'vegetable_id': self.vegetable_id,
+            'vegetable_name': self.vegetable_name,
+            'min_price': min(prices),
+            'max_price': max(prices),
+            'average_price': round(sum(prices) / len(prices), 2),
+            'price_count': len(prices),
+            'all_prices': prices.tolist(),
+        }
+
+
+class PriceSnapshot:
+    """Vegetable prices from one scrape, sharing a single timestamp"""
+    __slots__ = ('timestamp', 'records')
+
+    def __init__(self, timestamp=None):
+        self.timestamp = timestamp or datetime.now().isoformat()
+        self.records = {}
+
+    def add_prices(self, vegetable_id, vegetable_name, prices):
+        """Append prices for a vegetable, keyed by its catalog ID"""
+        record = self.records.get(vegetable_id)
+        if record is None:
+            record = self.records[vegetable_id] = PriceRecord(vegetable_id, vegetable_name)
+        record.prices.extend(prices)
+
+    def __len__(self):
+        return sum(1 for record in self.records.values() if record.prices)
+
+    def iter_records(self):
+        """Yield storage records for vegetables that have prices"""
+        for record in self.records.values():
+            if record.prices:
+                yield record.to_dict()
+
+    def to_storage(self):
+        """Serialize to the list of records stored in each history entry"""
+        return list(self.iter_records())
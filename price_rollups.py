@@ -0,0 +1,173 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+import config
+
+PERIODS = ('day', 'week', 'month')
+
+
+def bucket_key(period, moment):
+    """Bucket label for a timestamp: 2026-10-19, 2026-W43 or 2026-10"""
+    if isinstance(moment, str):
+        moment = datetime.fromisoformat(moment)
+    if period == 'day':
+        return moment.strftime('%Y-%m-%d')
+    if period == 'week':
+        year, week, _ = moment.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == 'month':
+        return moment.strftime('%Y-%m')
+    raise ValueError(f"Unknown rollup period: {period}")
+
+
+def _bucket_bound(period, value):
+    """Accept a date, datetime, ISO timestamp or a bucket label as a query bound"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value  # Already a label such as 2026-W43
+    return bucket_key(period, value)
+
+
+class PriceRollups:
+    """Per-source, per-vegetable day/week/month aggregates, updated one snapshot at a time
+
+    Each row keeps min (of min_price), max (of max_price), the sum and count of
+    average_price for the mean, and the first and last average_price in the bucket
+    with their timestamps. Adding a snapshot is one upsert per vegetable and
+    period, so queries never touch the raw history.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.ROLLUPS_DB
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.migrate()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS rollups (
+                period TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                source TEXT NOT NULL,
+                vegetable_id INTEGER NOT NULL,
+                min REAL NOT NULL,
+                max REAL NOT NULL,
+                sum REAL NOT NULL,
+                count INTEGER NOT NULL,
+                first REAL NOT NULL,
+                first_at TEXT NOT NULL,
+                last REAL NOT NULL,
+                last_at TEXT NOT NULL,
+                PRIMARY KEY (period, source, vegetable_id, bucket)
+            ) WITHOUT ROWID;
+        """)
+
+    def migrate(self):
+        """Move rollups from before sources were tracked under the default source"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(rollups)")]
+        if not columns or 'source' in columns:
+            return
+        with self.conn:
+            self.conn.execute("ALTER TABLE rollups RENAME TO rollups_without_source")
+            self.conn.execute("""
+                CREATE TABLE rollups (
+                    period TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    vegetable_id INTEGER NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    sum REAL NOT NULL,
+                    count INTEGER NOT NULL,
+                    first REAL NOT NULL,
+                    first_at TEXT NOT NULL,
+                    last REAL NOT NULL,
+                    last_at TEXT NOT NULL,
+                    PRIMARY KEY (period, source, vegetable_id, bucket)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("""
+                INSERT INTO rollups
+                SELECT period, bucket, ?, vegetable_id, min, max, sum, count, first, first_at, last, last_at
+                FROM rollups_without_source
+            """, (config.SOURCE,))
+            self.conn.execute("DROP TABLE rollups_without_source")
+
+    def add_entry(self, entry):
+        """Fold one history entry into every rollup; return the number of vegetables added"""
+        timestamp = entry['scrape_timestamp']
+        source = entry.get('source') or config.SOURCE
+        moment = datetime.fromisoformat(timestamp)
+        buckets = [(period, bucket_key(period, moment)) for period in PERIODS]
+
+        rows = []
+        for record in entry.get('vegetables_price_data', []):
+            if record.get('vegetable_id') is None or 'average_price' not in record:
+                continue
+            for period, bucket in buckets:
+                rows.append((
+                    period, bucket, source, record['vegetable_id'],
+                    record['min_price'], record['max_price'], record['average_price'],
+                    record['average_price'], timestamp, record['average_price'], timestamp,
+                ))
+
+        # SET expressions see the row as it was before the update. A snapshot whose
+        # timestamp a bucket already starts or ends with has been folded in before
+        # (saved again), so it is not counted twice
+        with self.lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO rollups (period, bucket, source, vegetable_id, min, max, sum, count,
+                                     first, first_at, last, last_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT (period, source, vegetable_id, bucket) DO UPDATE SET
+                    min = MIN(min, excluded.min),
+                    max = MAX(max, excluded.max),
+                    sum = sum + excluded.sum,
+                    count = count + 1,
+                    first = CASE WHEN excluded.first_at < first_at THEN excluded.first ELSE first END,
+                    first_at = MIN(first_at, excluded.first_at),
+                    last = CASE WHEN excluded.last_at >= last_at THEN excluded.last ELSE last END,
+                    last_at = MAX(last_at, excluded.last_at)
+                WHERE excluded.last_at NOT IN (first_at, last_at)
+            """, rows)
+        return len(rows) // len(PERIODS)
+
+    def query(self, period, vegetable_id=None, start=None, end=None, source=None):
+        """Rollup rows for a period, optionally for one source, one vegetable and buckets from start to end inclusive"""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown rollup period: {period}")
+        sql = ("SELECT bucket, source, vegetable_id, min, max, sum / count, count, first, first_at, last, last_at "
+               "FROM rollups WHERE period = ?")
+        params = [period]
+        if source is not None:
+            sql += " AND source = ?"
+            params.append(source)
+        if vegetable_id is not None:
+            sql += " AND vegetable_id = ?"
+            params.append(vegetable_id)
+        if start is not None:
+            sql += " AND bucket >= ?"
+            params.append(_bucket_bound(period, start))
+        if end is not None:
+            sql += " AND bucket <= ?"
+            params.append(_bucket_bound(period, end))
+        sql += " ORDER BY source, vegetable_id, bucket"
+
+        columns = ('bucket', 'source', 'vegetable_id', 'min', 'max', 'mean', 'count',
+                   'first', 'first_at', 'last', 'last_at')
+        with self.lock:
+            return [dict(zip(columns, row)) for row in self.conn.execute(sql, params)]
+
+    def rebuild(self, entries):
+        """Replace every rollup with aggregates of the given history entries"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM rollups")
+        count = 0
+        for entry in entries:
+            self.add_entry(entry)
+            count += 1
+        return count
+
+    def close(self):
+        self.conn.close()
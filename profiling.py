@@ -0,0 +1,194 @@
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+_profiling = contextvars.ContextVar('profiling', default=False)
+logger = logging.getLogger(__name__)
+
+
+def _parse_env(name, parse, default):
+    value = os.getenv(name)
+    if value in (None, ''):
+        return default
+    try:
+        return parse(value)
+    except ValueError:
+        logger.warning(f"Ignoring malformed {name}={value!r}; using {default}")
+        return default
+
+
+@functools.lru_cache(maxsize=None)
+def env_settings():
+    """Profiling settings from the environment, parsed once per process"""
+    return {
+        'enabled': os.getenv('SCRAPER_PROFILE', '').lower() in ('1', 'true', 'yes', 'on'),
+        'every_n': _parse_env('SCRAPER_PROFILE_EVERY', int, config.PROFILE_EVERY_N),
+        'threshold': _parse_env('SCRAPER_PROFILE_THRESHOLD', float, config.PROFILE_THRESHOLD),
+    }
+
+
+def _valid_setting(key, value):
+    if key == 'enabled':
+        return isinstance(value, bool)
+    if key == 'every_n':
+        return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+    if key == 'threshold':
+        return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0)
+    return False
+
+
+def load_settings():
+    """Current profiling settings: the control file if present, else the environment
+
+    Malformed values in the control file are ignored with a warning, keeping
+    the environment's value for that setting.
+    """
+    settings = dict(env_settings())
+    try:
+        with open(config.PROFILE_CONTROL_FILE, 'r') as f:
+            overrides = json.load(f)
+    except FileNotFoundError:
+        return settings
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable profiling control file: {e}")
+        return settings
+
+    if not isinstance(overrides, dict):
+        logger.warning("Ignoring profiling control file: expected a JSON object")
+        return settings
+    for key, value in overrides.items():
+        if _valid_setting(key, value):
+            settings[key] = value
+        else:
+            logger.warning(f"Ignoring invalid profiling setting {key}={value!r} in {config.PROFILE_CONTROL_FILE}")
+    return settings
+
+
+def save_settings(settings):
+    """Write the control file read by every scheduler and worker process"""
+    path = config.PROFILE_CONTROL_FILE
+    tmp_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w') as f:
+        json.dump(settings, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+def clear_settings():
+    """Remove the control file so the environment decides again"""
+    try:
+        config.PROFILE_CONTROL_FILE.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def save_profile(profiler, run_id, name, elapsed, reason):
+    """Write <run_id>_<name>.prof plus a readable .txt summary; return the .prof path"""
+    config.PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    base = config.PROFILE_DIR / f"{run_id or time.strftime('%Y%m%d_%H%M%S')}_{name}"
+    profiler.dump_stats(f"{base}.prof")
+
+    summary = io.StringIO()
+    summary.write(f"{name} run {run_id}: {elapsed:.2f}s ({reason})\n\n")
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats('cumulative').print_stats(40)
+    stats.sort_stats('tottime').print_stats(20)
+    with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+        f.write(summary.getvalue())
+
+    prune_profiles(config.PROFILE_KEEP)
+    return f"{base}.prof"
+
+
+def prune_profiles(keep):
+    """Delete all but the newest `keep` profiles"""
+    profiles = sorted(config.PROFILE_DIR.glob('*.prof'), key=lambda path: path.stat().st_mtime)
+    for path in profiles[:-keep] if keep > 0 else profiles:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.txt').unlink(missing_ok=True)
+
+
+class RunProfiler:
+    """Profiles sampled or slow runs of one kind of job with cProfile
+
+    Every Nth run is profiled and kept. With a latency threshold set, every run is
+    profiled but only kept if it turns out slower than the threshold, since a slow
+    run cannot be recognised before it starts. Runs nested inside a run that is
+    already being profiled in the same thread are not profiled again.
+
+    decide() and profile_as() split the choice from the profiling, so a process
+    that outlives its workers can count runs and tell each worker what to do.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.runs = 0
+        self.lock = threading.Lock()
+
+    def decide(self):
+        """Count a run and return how to profile it, or None to leave it unprofiled
+
+        The decision is a plain dict, so it can be sent to a worker process.
+        """
+        if _profiling.get():
+            return None
+        settings = load_settings()
+        if not settings.get('enabled'):
+            return None
+
+        every_n = settings.get('every_n') or 0
+        threshold = settings.get('threshold')
+        with self.lock:
+            self.runs += 1
+            sampled = every_n > 0 and self.runs % every_n == 0
+        if not sampled and threshold is None:
+            return None
+        return {'sampled': sampled, 'every_n': every_n, 'threshold': threshold}
+
+    def profile(self, run_id):
+        """Profile the run if this profiler's own count and settings call for it"""
+        return self.profile_as(run_id, self.decide())
+
+    @contextmanager
+    def profile_as(self, run_id, decision):
+        """Profile the run as `decision` from decide() says; None runs it unprofiled
+
+        Runs nested inside follow the outer decision, even one not to profile,
+        rather than sampling on their own count.
+        """
+        profiler = None
+        if decision and not _profiling.get():
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Only one cProfile can be active at a time on some Python versions
+                logger.debug(f"Skipping profile of {self.name}: another profiler is active")
+                profiler = None
+
+        token = _profiling.set(True)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            _profiling.reset(token)
+            if profiler is not None:
+                profiler.disable()
+                elapsed = time.perf_counter() - started
+                sampled, every_n, threshold = decision['sampled'], decision['every_n'], decision['threshold']
+                if sampled or (threshold is not None and elapsed >= threshold):
+                    reason = f"every {every_n} runs" if sampled else f"slower than {threshold}s"
+                    try:
+                        path = save_profile(profiler, run_id, self.name, elapsed, reason)
+                        logger.info(f"Saved {self.name} profile ({reason}) to {path}")
+                    except Exception as e:
+                        logger.warning(f"Failed to save {self.name} profile: {e}")
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import config
+
+
+def week_key(timestamp):
+    """ISO week label such as 2026-W42 for an ISO timestamp"""
+    year, week, _ = datetime.fromisoformat(timestamp).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def content_hash(rows):
+    return hashlib.sha256(json.dumps(rows, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def change_points(rows):
+    """The rows of one vegetable where its prices changed, starting with the first
+
+    Snapshots that repeat the previous prices add nothing, so a series whose
+    prices did not move hashes and renders exactly as before.
+    """
+    points = []
+    for row in rows:
+        prices = (row['min_price'], row['max_price'], row['average_price'])
+        if points and prices == (points[-1]['min_price'], points[-1]['max_price'], points[-1]['average_price']):
+            continue
+        points.append(row)
+    return points
+
+
+class ReportGenerator:
+    """Builds weekly price workbooks and trend charts in a background thread
+
+    Snapshots that queue up while a batch renders are handled as one batch.
+    Charts are step plots of each vegetable's price changes, so only
+    vegetables whose prices changed are re-rendered. A week's workbook lists
+    every snapshot and would change on every save, so it is rewritten at most
+    every `workbook_interval` seconds, when a newer week starts, and on stop.
+    """
+
+    def __init__(self, reports_dir=None, charts=True, workbook_interval=900):
+        self.reports_dir = reports_dir or config.DATA_DIR / "reports"
+        self.data_dir = self.reports_dir / "data"
+        self.charts_dir = self.reports_dir / "charts"
+        self.manifest_file = self.reports_dir / "manifest.json"
+        self.charts = charts
+        self.workbook_interval = workbook_interval
+        self.pending_workbooks = {}  # week -> monotonic time its workbook went stale
+        self.queue = queue.Queue()
+        self.thread = None
+        self.logger = logging.getLogger('ReportGenerator')
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self):
+        if self.manifest_file.exists():
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def save_manifest(self):
+        tmp_file = self.manifest_file.with_name(f"{self.manifest_file.name}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_file, self.manifest_file)
+
+    def on_snapshot_saved(self, entry):
+        """Save listener: queue the snapshot so the scrape path never waits on rendering"""
+        self.queue.put(entry)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='report-generator', daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=30):
+        """Finish queued work, write pending workbooks and stop the worker"""
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join(timeout=timeout)
+            self.thread = None
+
+    def flush_delay(self):
+        """Seconds until the next debounced workbook is due, or None if none is pending"""
+        if not self.pending_workbooks:
+            return None
+        stale_since = min(self.pending_workbooks.values())
+        return max(0.0, stale_since + self.workbook_interval - time.monotonic())
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                entry = self.queue.get(timeout=self.flush_delay())
+            except queue.Empty:
+                entry = False  # Only a debounced workbook is due
+            stopping = entry is None
+            entries = [entry] if entry else []
+            while not stopping:
+                try:
+                    entry = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                else:
+                    entries.append(entry)
+            try:
+                self.process(entries, flush=stopping)
+            except Exception as e:
+                self.logger.error(f"Report generation failed: {e}")
+
+    def append_rows(self, entry):
+        """Append the snapshot to its week's data file; return the week key"""
+        timestamp = entry['scrape_timestamp']
+        source = entry.get('source') or config.SOURCE
+        rows = [
+            {
+                'timestamp': timestamp,
+                'source': source,
+                'vegetable_id': record.get('vegetable_id'),
+                'vegetable_name': record['vegetable_name'],
+                'min_price': record['min_price'],
+                'max_price': record['max_price'],
+                'average_price': record['average_price'],
+            }
+            for record in entry.get('vegetables_price_data', [])
+            if 'vegetable_name' in record
+        ]
+        week = week_key(timestamp)
+        if rows:
+            with open(self.data_dir / f"{week}.jsonl", 'a', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        return week, bool(rows)
+
+    def load_week(self, week):
+        with open(self.data_dir / f"{week}.jsonl", 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def process(self, entries, flush=False):
+        """Add a batch of snapshots; re-render changed charts and any workbooks that are due"""
+        weeks = set()
+        for entry in entries:
+            week, has_rows = self.append_rows(entry)
+            if has_rows:
+                weeks.add(week)
+
+        rebuilt = 0
+        for week in sorted(weeks):
+            if self.charts:
+                rebuilt += self.render_charts(week, self.load_week(week))
+            self.pending_workbooks.setdefault(week, time.monotonic())
+        rebuilt += self.write_due_workbooks(flush)
+
+        if rebuilt:
+            self.save_manifest()
+            self.logger.info(f"Reports for {', '.join(sorted(weeks)) or 'pending weeks'}: rebuilt {rebuilt} artifact(s)")
+
+    def render_charts(self, week, rows):
+        """Render the charts of vegetables whose prices changed; return how many were rendered"""
+        series = {}
+        for row in rows:
+            vegetable = row['vegetable_id'] if row['vegetable_id'] is not None else row['vegetable_name']
+            series.setdefault((row.get('source') or config.SOURCE, vegetable), []).append(row)
+
+        rendered = 0
+        for (source, vegetable), vegetable_rows in series.items():
+            points = change_points(vegetable_rows)
+            chart_path = self.charts_dir / week / source / f"{vegetable}.png"
+            chart_key = f"charts/{week}/{source}/{chart_path.name}"
+            series_hash = content_hash([
+                (point['timestamp'], point['min_price'], point['max_price'], point['average_price'])
+                for point in points
+            ])
+            if self.manifest.get(chart_key) == series_hash and chart_path.exists():
+                continue
+            self.write_chart(chart_path, points)
+            self.manifest[chart_key] = series_hash
+            rendered += 1
+        return rendered
+
+    def write_due_workbooks(self, flush=False):
+        """Write workbooks that have been stale for workbook_interval, or every pending one on flush"""
+        now = time.monotonic()
+        latest_week = max(self.pending_workbooks, default=None)
+        written = 0
+        for week, stale_since in list(self.pending_workbooks.items()):
+            # A week that a newer one has followed will not change again
+            if not (flush or week != latest_week or now - stale_since >= self.workbook_interval):
+                continue
+            del self.pending_workbooks[week]
+            rows = self.load_week(week)
+            workbook_path = self.reports_dir / f"prices_{week}.xlsx"
+            rows_hash = content_hash(rows)
+            if self.manifest.get(workbook_path.name) == rows_hash and workbook_path.exists():
+                continue
+            self.write_workbook(workbook_path, week, rows)
+            self.manifest[workbook_path.name] = rows_hash
+            written += 1
+        return written
+
+    def write_workbook(self, path, week, rows):
+        """Write the week's summary and snapshot sheets"""
+        from openpyxl import Workbook
+
+        summary = {}
+        for row in rows:
+            stats = summary.setdefault(row['vegetable_name'], [row['min_price'], row['max_price'], 0.0, 0])
+            stats[0] = min(stats[0], row['min_price'])
+            stats[1] = max(stats[1], row['max_price'])
+            stats[2] += row['average_price']
+            stats[3] += 1
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(f"Summary {week}")
+        sheet.append(['Vegetable', 'Min Price', 'Max Price', 'Average Price', 'Snapshots'])
+        for name, (low, high, total, count) in sorted(summary.items()):
+            sheet.append([name, low, high, round(total / count, 2), count])
+
+        sheet = workbook.create_sheet("Snapshots")
+        sheet.append(['Timestamp', 'Source', 'Vegetable ID', 'Vegetable', 'Min Price', 'Max Price', 'Average Price'])
+        for row in rows:
+            sheet.append([
+                row['timestamp'], row.get('source'), row['vegetable_id'], row['vegetable_name'],
+                row['min_price'], row['max_price'], row['average_price']
+            ])
+
+        tmp_path = path.with_name(f"{path.stem}.tmp.xlsx")
+        workbook.save(tmp_path)
+        os.replace(tmp_path, path)
+
+    def write_chart(self, path, rows):
+        """Render one vegetable's price changes for the week as a step plot"""
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        times = [datetime.fromisoformat(row['timestamp']) for row in rows]
+        fig, ax = plt.subplots(figsize=(8, 4))
+        try:
+            ax.fill_between(times, [row['min_price'] for row in rows],
+                            [row['max_price'] for row in rows], step='post', alpha=0.2, label='Min-Max')
+            ax.step(times, [row['average_price'] for row in rows], where='post', marker='o', label='Average')
+            ax.set_title(rows[-1]['vegetable_name'])
+            ax.set_ylabel('Price (Rs.)')
+            ax.legend()
+            fig.autofmt_xdate()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fig.savefig(path, dpi=100)
+        finally:
+            plt.close(fig)
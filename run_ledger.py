@@ -0,0 +1,83 @@
+import json
+import math
+import os
+import threading
+
+import config
+
+
+class RunLedger:
+    """Append-only JSON-lines record of every scrape attempt"""
+
+    def __init__(self, path=None):
+        self.path = path or config.DATA_DIR / "run_ledger.jsonl"
+        self.lock = threading.Lock()
+
+    def append(self, record):
+        line = json.dumps(record, separators=(',', ':'), ensure_ascii=False)
+        with self.lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+    def tail(self, count, block_size=64 * 1024):
+        """Return the last `count` records, reading backwards from the end of the file"""
+        if count <= 0 or not self.path.exists():
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            # One extra line so a partially read first line can be dropped
+            while position > 0 and data.count(b'\n') <= count:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+
+        lines = data.splitlines()
+        if position > 0:
+            lines = lines[1:]
+        records = []
+        for line in lines[-count:]:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # Torn write from a crashed process
+        return records
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(records, top_stages=3):
+    """Duration percentiles, success rate and slowest stages for a window of records"""
+    durations = [record['duration'] for record in records if record.get('duration') is not None]
+    successes = sum(1 for record in records if record.get('outcome') == 'success')
+
+    stage_durations = {}
+    for record in records:
+        for stage, seconds in (record.get('stages') or {}).items():
+            stage_durations.setdefault(stage, []).append(seconds)
+    slowest = sorted(
+        (
+            (stage, sum(values) / len(values), percentile(values, 95))
+            for stage, values in stage_durations.items()
+        ),
+        key=lambda item: item[1],
+        reverse=True
+    )[:top_stages]
+
+    return {
+        'runs': len(records),
+        'success_rate': successes / len(records) if records else None,
+        'p50': percentile(durations, 50),
+        'p95': percentile(durations, 95),
+        'p99': percentile(durations, 99),
+        'slowest_stages': slowest,
+    }
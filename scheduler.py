@@ -3,133 +3,387 @@ import time
 import json
 import logging
 import threading
+import functools
 from datetime import datetime, timedelta
 from pathlib import Path
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 import pytz
 
-from scraper import NepaliPatroVegetableScraper
+from scraper import NepaliPatroVegetableScraper, add_save_listener, remove_save_listener
 from scheduler_config import get_config
 from notification import NotificationManager
+from worker_pool import ScrapeWorkerPool
+from coordination import KeyedRunQueue, LeaseManager, LeaderElector, LeadershipLostError
+from api_server import PriceReadAPI
+from reports import ReportGenerator
+from adaptive_schedule import AdaptiveSchedule, AdaptiveTrigger
+from window_trigger import WindowedIntervalTrigger
+from run_ledger import RunLedger
+from change_feed import ChangeFeedPublisher, ChangeFeedSSEServer, WebhookPusher
 import config as main_config
+from logging_setup import setup_logging, new_run_id, set_run_id
+from profiling import RunProfiler
+
+DEFAULT_JOB_NAME = 'scrape_vegetables'
 
 class VegetablePriceScheduler:
-    def __init__(self, schedule_type='daily_morning'):
+    def __init__(self, schedule_type='daily_morning', jobs=None):
         self.config = get_config()
+        settings = self.config.SCHEDULER_SETTINGS
+        
+        # Without a job list, run a single job on the first source
+        if jobs is None:
+            jobs = [{
+                'name': DEFAULT_JOB_NAME,
+                'source': next(iter(self.config.SOURCES)),
+                'schedule': schedule_type,
+            }]
+        else:
+            schedule_type = 'jobs'
         self.schedule_type = schedule_type
+        self.jobs = jobs
+        
+        # Jobs share one executor; per-source run queues keep conflicting jobs apart
         self.scheduler = BackgroundScheduler(
-            timezone=pytz.timezone(self.config.SCHEDULER_SETTINGS['timezone'])
+            executors={'default': ThreadPoolExecutor(settings['max_workers'])},
+            timezone=pytz.timezone(settings['timezone'])
         )
+        self.validate_jobs()
+        self.profilers = {job['name']: RunProfiler(job['name']) for job in self.jobs}
+        self.source_queue = KeyedRunQueue()
+        self.run_lock = threading.Lock()
+        self.active_runs = set()
         self.notification_manager = NotificationManager()
         self.setup_logging()
         self.status_file = main_config.DATA_DIR / "scheduler_status.json"
+        self.status_lock = threading.Lock()
+        self.run_ledger = RunLedger()
         self.is_running = False
         
+        # One worker process per source lock key, started on first use
+        self.worker_pools = None
+        self.pool_lock = threading.Lock()
+        if settings['execution_mode'] == 'process_pool':
+            self.worker_pools = {}
+        
+        self.leader_elector = None
+        coordination = self.config.COORDINATION
+        if coordination['enabled']:
+            lease_file = coordination['lease_file'] or main_config.DATA_DIR / "scheduler_leases.db"
+            self.leader_elector = LeaderElector(
+                LeaseManager(lease_file, node_id=coordination['node_id']),
+                ttl=coordination['lease_ttl']
+            )
+        
+        self.read_api = None
+        read_api = self.config.READ_API
+        if read_api['enabled']:
+            self.read_api = PriceReadAPI(
+                host=read_api['host'],
+                port=read_api['port'],
+                cache_size=read_api['cache_size'],
+                cache_ttl=read_api['cache_ttl']
+            )
+        
+        self.adaptive_triggers = {}
+        
+        self.change_feed = None
+        self.change_feed_services = []
+        change_feed = self.config.CHANGE_FEED
+        if change_feed['enabled']:
+            self.change_feed = ChangeFeedPublisher()
+            if change_feed['sse']['enabled']:
+                self.change_feed_services.append(ChangeFeedSSEServer(
+                    self.change_feed,
+                    host=change_feed['sse']['host'],
+                    port=change_feed['sse']['port']
+                ))
+            if change_feed['webhook']['enabled']:
+                self.change_feed_services.append(WebhookPusher(
+                    self.change_feed,
+                    change_feed['webhook']['url'],
+                    batch_size=change_feed['webhook']['batch_size'],
+                    flush_interval=change_feed['webhook']['flush_interval']
+                ))
+        
+        self.report_generator = None
+        reports = self.config.REPORTS
+        if reports['enabled']:
+            self.report_generator = ReportGenerator(
+                reports_dir=reports['reports_dir'],
+                charts=reports['charts'],
+                workbook_interval=reports['workbook_interval']
+            )
+        
     def setup_logging(self):
         """Setup logging for scheduler"""
         log_file = main_config.LOGS_DIR / "scheduler.log"
         
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler()
-            ]
-        )
+        setup_logging(log_file)
         self.logger = logging.getLogger('VegetableScheduler')
         
+    def validate_jobs(self):
+        """Check job names are unique and refer to known sources and schedules"""
+        names = set()
+        for job in self.jobs:
+            if job['name'] in names:
+                raise ValueError(f"Duplicate job name: {job['name']}")
+            names.add(job['name'])
+            if job['source'] not in self.config.SOURCES:
+                raise ValueError(f"Unknown source for job {job['name']}: {job['source']}")
+            if job['schedule'] not in self.config.SCHEDULES:
+                raise ValueError(f"Unknown schedule type: {job['schedule']}")
+            if self.config.SCHEDULES[job['schedule']]['type'] == 'interval':
+                self.interval_trigger(self.config.SCHEDULES[job['schedule']])
+    
+    def get_worker_pool(self, lock_key):
+        """Worker pool for a source lock key"""
+        with self.pool_lock:
+            if lock_key not in self.worker_pools:
+                settings = self.config.SCHEDULER_SETTINGS
+                self.worker_pools[lock_key] = ScrapeWorkerPool(
+                    job_timeout=settings['job_timeout'],
+                    max_jobs_per_worker=settings['max_jobs_per_worker']
+                )
+            return self.worker_pools[lock_key]
+        
     def save_status(self, status_info):
         """Save scheduler status to file"""
         try:
             status_data = {
                 'last_updated': datetime.now().isoformat(),
                 'schedule_type': self.schedule_type,
+                'jobs': [job['name'] for job in self.jobs],
                 'is_running': self.is_running,
                 **status_info
             }
             
-            with open(self.status_file, 'w') as f:
+            with self.status_lock, open(self.status_file, 'w') as f:
                 json.dump(status_data, f, indent=2)
                 
         except Exception as e:
             self.logger.error(f"Error saving status: {e}")
     
-    def scrape_job(self):
-        """Main scraping job with error handling and retries"""
-        job_start_time = datetime.now()
-        self.logger.info(f"Starting scheduled scraping job at {job_start_time}")
+    def scrape_job(self, job=None):
+        """Start a job run, unless its previous run is still queued, running or retrying"""
+        job = job or self.jobs[0]
+        run_id = new_run_id()
         
-        for attempt in range(self.config.RETRY_SETTINGS['max_retries']):
-            try:
-                scraper = NepaliPatroVegetableScraper()
-                scraper.run()
-                
-                # Job successful
-                job_end_time = datetime.now()
-                duration = (job_end_time - job_start_time).total_seconds()
-                
-                success_info = {
-                    'last_successful_run': job_end_time.isoformat(),
-                    'last_run_duration': duration,
-                    'last_attempt': attempt + 1,
-                    'status': 'success'
-                }
-                
-                self.save_status(success_info)
-                self.notification_manager.send_success_notification(success_info)
-                self.logger.info(f"Scheduled scraping completed successfully in {duration:.2f} seconds")
+        fencing_token = None
+        if self.leader_elector:
+            fencing_token = self.leader_elector.fencing_token()
+            if fencing_token is None:
+                self.logger.info(f"Skipping job '{job['name']}': another node holds the leader lease")
                 return
-                
-            except Exception as e:
-                self.logger.error(f"Scraping attempt {attempt + 1} failed: {e}")
-                
-                if attempt < self.config.RETRY_SETTINGS['max_retries'] - 1:
-                    # Calculate retry delay with optional exponential backoff
-                    if self.config.RETRY_SETTINGS['exponential_backoff']:
-                        delay = self.config.RETRY_SETTINGS['retry_delay'] * (2 ** attempt)
-                    else:
-                        delay = self.config.RETRY_SETTINGS['retry_delay']
-                    
-                    self.logger.info(f"Retrying in {delay} seconds...")
-                    time.sleep(delay)
+        
+        with self.run_lock:
+            if job['name'] in self.active_runs:
+                self.logger.info(f"Skipping job '{job['name']}': its previous run has not finished")
+                return
+            self.active_runs.add(job['name'])
+        
+        job_start_time = datetime.now()
+        self.logger.info(f"Starting job '{job['name']}' run {run_id} at {job_start_time}")
+        self.queue_attempt(job, run_id, 0, job_start_time, fencing_token)
+    
+    def check_leadership(self, job, fencing_token):
+        """Raise LeadershipLostError if the leadership term a run started in has ended"""
+        if self.leader_elector and self.leader_elector.fencing_token() != fencing_token:
+            raise LeadershipLostError(
+                f"Job '{job['name']}' started under fencing token {fencing_token}, "
+                f"but this node is no longer leader in that term"
+            )
+    
+    def queue_attempt(self, job, run_id, attempt, job_start_time, fencing_token=None):
+        """Run an attempt after those already queued on its source
+        
+        Jobs on the same source run one at a time in arrival order; others run
+        in parallel. A job whose source is busy returns its executor thread
+        straight away instead of waiting for the source. A retry whose run
+        started in a leadership term that has since ended is dropped.
+        """
+        try:
+            self.check_leadership(job, fencing_token)
+        except LeadershipLostError as e:
+            self.logger.warning(f"Dropping attempt {attempt + 1} of job '{job['name']}': {e}")
+            self.finish_run(job)
+            return
+        source = self.config.SOURCES[job['source']]
+        lock_key = source.get('lock_key') or job['source']
+        queued_at = time.perf_counter()
+        ran_now = self.source_queue.submit(
+            lock_key,
+            functools.partial(self.run_attempt, job, run_id, attempt, job_start_time, queued_at, fencing_token)
+        )
+        if not ran_now:
+            self.logger.info(f"Job '{job['name']}' queued behind the running job on {lock_key}")
+    
+    def run_attempt(self, job, run_id, attempt, job_start_time, queued_at, fencing_token=None):
+        """Scrape and save once for a job run, scheduling a retry if it fails
+        
+        Leadership is checked again when the attempt leaves the source queue and
+        just before saving, as a scrape can outlive the leader lease.
+        """
+        set_run_id(run_id)
+        source = self.config.SOURCES[job['source']]
+        lock_key = source.get('lock_key') or job['source']
+        retry_settings = {**self.config.RETRY_SETTINGS, **job.get('retry', {})}
+        attempt_started = time.perf_counter()
+        scraper = None
+        try:
+            self.check_leadership(job, fencing_token)
+        except LeadershipLostError as e:
+            self.logger.warning(f"Dropping attempt {attempt + 1} of job '{job['name']}': {e}")
+            self.finish_run(job)
+            return
+        try:
+            profiler = self.profilers[job['name']]
+            # Decided here so every Nth run counts across worker recycles
+            profile_decision = profiler.decide()
+            with profiler.profile_as(run_id, profile_decision):
+                scraper = NepaliPatroVegetableScraper(url=source.get('url'), source=job['source'])
+                scraper.stage_timings['source_wait'] = round(attempt_started - queued_at, 3)
+                if self.worker_pools is not None:
+                    # Scrape in an isolated worker, save in this process
+                    vegetables_data, worker_timings = self.get_worker_pool(lock_key).run_scrape(
+                        url=source.get('url'), source=job['source'], profile=profile_decision
+                    )
+                    scraper.stage_timings.update(worker_timings)
                 else:
-                    # All attempts failed
-                    job_end_time = datetime.now()
-                    failure_info = {
-                        'last_failed_run': job_end_time.isoformat(),
-                        'last_error': str(e),
-                        'total_attempts': attempt + 1,
-                        'status': 'failed'
-                    }
-                    
-                    self.save_status(failure_info)
-                    self.notification_manager.send_error_notification(failure_info)
-                    self.logger.error(f"All {attempt + 1} scraping attempts failed")
+                    vegetables_data = scraper.scrape()
+                # A node that lost the lease mid-scrape must not save alongside the new leader
+                self.check_leadership(job, fencing_token)
+                with scraper.timed_stage('save'):
+                    scraper.save_data(vegetables_data)
+            
+            # Job successful
+            job_end_time = datetime.now()
+            duration = (job_end_time - job_start_time).total_seconds()
+            self.record_attempt(job, run_id, attempt, attempt_started, 'success', scraper.stage_timings)
+            self.finish_run(job)
+            
+            success_info = {
+                'job': job['name'],
+                'last_successful_run': job_end_time.isoformat(),
+                'last_run_duration': duration,
+                'last_attempt': attempt + 1,
+                'status': 'success'
+            }
+            
+            self.save_status(success_info)
+            self.notification_manager.send_success_notification(success_info)
+            self.logger.info(f"Job '{job['name']}' completed successfully in {duration:.2f} seconds")
+            
+        except LeadershipLostError as e:
+            self.logger.warning(f"Discarding attempt {attempt + 1} of job '{job['name']}' unsaved: {e}")
+            self.record_attempt(job, run_id, attempt, attempt_started, 'fenced',
+                                scraper.stage_timings if scraper else {}, error=e)
+            self.finish_run(job)
+            
+        except Exception as e:
+            self.logger.error(f"Job '{job['name']}' attempt {attempt + 1} failed: {e}")
+            stage_timings = dict(getattr(e, 'stage_timings', {}))
+            if scraper:
+                stage_timings.update(scraper.stage_timings)
+            self.record_attempt(job, run_id, attempt, attempt_started, 'failed', stage_timings, error=e)
+            
+            if attempt < retry_settings['max_retries'] - 1:
+                if self.schedule_retry(job, run_id, attempt, job_start_time, retry_settings, fencing_token):
+                    return
+            
+            # All attempts failed
+            self.finish_run(job)
+            job_end_time = datetime.now()
+            failure_info = {
+                'job': job['name'],
+                'last_failed_run': job_end_time.isoformat(),
+                'last_error': str(e),
+                'total_attempts': attempt + 1,
+                'status': 'failed'
+            }
+            
+            self.save_status(failure_info)
+            self.notification_manager.send_error_notification(failure_info)
+            self.logger.error(f"All {attempt + 1} attempts of job '{job['name']}' failed")
+    
+    def schedule_retry(self, job, run_id, attempt, job_start_time, retry_settings, fencing_token=None):
+        """Queue the next attempt after the retry delay; the source is free meanwhile"""
+        # Calculate retry delay with optional exponential backoff
+        if retry_settings['exponential_backoff']:
+            delay = retry_settings['retry_delay'] * (2 ** attempt)
+        else:
+            delay = retry_settings['retry_delay']
+        
+        try:
+            self.scheduler.add_job(
+                self.queue_attempt,
+                trigger='date',
+                run_date=datetime.now(self.scheduler.timezone) + timedelta(seconds=delay),
+                args=[job, run_id, attempt + 1, job_start_time, fencing_token],
+                name=f"{job['name']} retry",
+                id=f"{job['name']}_retry",
+                replace_existing=True,
+                misfire_grace_time=None
+            )
+        except Exception as e:
+            self.logger.error(f"Could not schedule a retry of job '{job['name']}': {e}")
+            return False
+        self.logger.info(f"Retrying in {delay} seconds...")
+        return True
+    
+    def finish_run(self, job):
+        with self.run_lock:
+            self.active_runs.discard(job['name'])
+    
+    def record_attempt(self, job, run_id, attempt, attempt_started, outcome, stage_timings, error=None):
+        """Append one scrape attempt to the run ledger"""
+        record = {
+            'run_id': run_id,
+            'job': job['name'],
+            'attempt': attempt + 1,
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'schedule_type': job['schedule'],
+            'duration': round(time.perf_counter() - attempt_started, 3),
+            'outcome': outcome,
+            'stages': stage_timings,
+        }
+        if error is not None:
+            record['error'] = f"{type(error).__name__}: {error}"[:300]
+        try:
+            self.run_ledger.append(record)
+        except Exception as e:
+            self.logger.error(f"Error writing run ledger: {e}")
     
     def setup_schedule(self):
-        """Setup the chosen schedule"""
-        schedule_config = self.config.SCHEDULES.get(self.schedule_type)
+        """Setup every configured job"""
+        for job in self.jobs:
+            self.add_job_schedule(job)
+        if self.adaptive_triggers:
+            add_save_listener(self.observe_adaptive_update)
+    
+    def add_job_schedule(self, job):
+        """Add one named job with its chosen schedule"""
+        schedule_type = job['schedule']
+        schedule_config = self.config.SCHEDULES.get(schedule_type)
         
         if not schedule_config:
-            raise ValueError(f"Unknown schedule type: {self.schedule_type}")
+            raise ValueError(f"Unknown schedule type: {schedule_type}")
         
-        self.logger.info(f"Setting up schedule: {self.schedule_type}")
+        self.logger.info(f"Setting up job '{job['name']}' on {job['source']} with schedule: {schedule_type}")
         
         if schedule_config['type'] == 'interval':
-            # Interval-based scheduling
-            trigger_kwargs = {}
-            if 'hours' in schedule_config:
-                trigger_kwargs['hours'] = schedule_config['hours']
-            if 'minutes' in schedule_config:
-                trigger_kwargs['minutes'] = schedule_config['minutes']
+            # Interval-based scheduling, optionally limited to a daily window
+            trigger = self.interval_trigger(schedule_config)
             
             self.scheduler.add_job(
                 self.scrape_job,
-                trigger=IntervalTrigger(**trigger_kwargs),
-                id='scrape_vegetables',
+                args=[job],
+                name=job['name'],
+                trigger=trigger,
+                id=job['name'],
                 max_instances=1,
                 coalesce=True
             )
@@ -141,8 +395,10 @@ class VegetablePriceScheduler:
             
             self.scheduler.add_job(
                 self.scrape_job,
+                args=[job],
+                name=job['name'],
                 trigger=CronTrigger(hour=hour, minute=minute),
-                id='scrape_vegetables',
+                id=job['name'],
                 max_instances=1,
                 coalesce=True
             )
@@ -155,8 +411,10 @@ class VegetablePriceScheduler:
                 
                 self.scheduler.add_job(
                     self.scrape_job,
+                    args=[job],
+                    name=job['name'],
                     trigger=CronTrigger(hour=hour, minute=minute),
-                    id=f'scrape_vegetables_{i}',
+                    id=f"{job['name']}_{i}",
                     max_instances=1,
                     coalesce=True
                 )
@@ -168,8 +426,10 @@ class VegetablePriceScheduler:
             
             self.scheduler.add_job(
                 self.scrape_job,
+                args=[job],
+                name=job['name'],
                 trigger=CronTrigger(day_of_week='mon-fri', hour=hour, minute=minute),
-                id='scrape_vegetables',
+                id=job['name'],
                 max_instances=1,
                 coalesce=True
             )
@@ -181,16 +441,85 @@ class VegetablePriceScheduler:
             
             self.scheduler.add_job(
                 self.scrape_job,
+                args=[job],
+                name=job['name'],
                 trigger=CronTrigger(day_of_week='sat,sun', hour=hour, minute=minute),
-                id='scrape_vegetables',
+                id=job['name'],
+                max_instances=1,
+                coalesce=True
+            )
+    
+        elif schedule_config['type'] == 'adaptive':
+            # Learned from observed price updates of this job's source
+            state_name = "adaptive_schedule_state.json"
+            if job['name'] != DEFAULT_JOB_NAME:
+                state_name = f"adaptive_schedule_state_{job['name']}.json"
+            adaptive_trigger = AdaptiveTrigger(
+                AdaptiveSchedule(schedule_config, main_config.DATA_DIR / state_name),
+                self.scheduler.timezone
+            )
+            self.adaptive_triggers[job['name']] = adaptive_trigger
+            
+            self.scheduler.add_job(
+                self.scrape_job,
+                args=[job],
+                name=job['name'],
+                trigger=adaptive_trigger,
+                id=job['name'],
                 max_instances=1,
                 coalesce=True
             )
     
+    def interval_trigger(self, schedule_config):
+        """Interval trigger, gated to start_time-end_time when the schedule has a window"""
+        interval = timedelta(
+            hours=schedule_config.get('hours', 0),
+            minutes=schedule_config.get('minutes', 0),
+            seconds=schedule_config.get('seconds', 0)
+        )
+        if interval <= timedelta(0):
+            raise ValueError(f"Interval schedule needs a positive 'hours', 'minutes' or 'seconds': {schedule_config}")
+        
+        if 'start_time' in schedule_config or 'end_time' in schedule_config:
+            if 'start_time' not in schedule_config or 'end_time' not in schedule_config:
+                raise ValueError(f"Interval window needs both 'start_time' and 'end_time': {schedule_config}")
+            return WindowedIntervalTrigger(
+                interval,
+                schedule_config['start_time'],
+                schedule_config['end_time'],
+                self.scheduler.timezone
+            )
+        return IntervalTrigger(seconds=interval.total_seconds())
+    
+    def observe_adaptive_update(self, entry):
+        """Save listener: learn from the new snapshot and replan adaptive jobs on its source"""
+        now = datetime.now(self.scheduler.timezone)
+        for job in self.jobs:
+            adaptive_trigger = self.adaptive_triggers.get(job['name'])
+            if not adaptive_trigger or entry.get('source', job['source']) != job['source']:
+                continue
+            adaptive_trigger.adaptive_schedule.observe(entry, now)
+            scheduled = self.scheduler.get_job(job['name'])
+            if scheduled:
+                scheduled = self.scheduler.reschedule_job(job['name'], trigger=adaptive_trigger)
+                self.logger.info(f"Next adaptive scrape of '{job['name']}' at {scheduled.next_run_time}")
+    
     def start(self):
         """Start the scheduler"""
         try:
             self.setup_schedule()
+            if self.leader_elector:
+                self.leader_elector.start()
+            if self.read_api:
+                self.read_api.start()
+                add_save_listener(self.read_api.on_snapshot_saved)
+            if self.report_generator:
+                self.report_generator.start()
+                add_save_listener(self.report_generator.on_snapshot_saved)
+            if self.change_feed:
+                add_save_listener(self.change_feed.on_snapshot_saved)
+                for service in self.change_feed_services:
+                    service.start()
             self.scheduler.start()
             self.is_running = True
             
@@ -201,7 +530,8 @@ class VegetablePriceScheduler:
             }
             self.save_status(start_info)
             
-            self.logger.info(f"Scheduler started with schedule: {self.schedule_type}")
+            self.logger.info(f"Scheduler started with schedule: {self.schedule_type} "
+                             f"({len(self.jobs)} job(s): {', '.join(job['name'] for job in self.jobs)})")
             self.notification_manager.send_scheduler_notification("Scheduler started", start_info)
             
             # Keep the scheduler running
@@ -221,6 +551,22 @@ class VegetablePriceScheduler:
         try:
             self.scheduler.shutdown()
             self.is_running = False
+            for worker_pool in (self.worker_pools or {}).values():
+                worker_pool.shutdown()
+            if self.leader_elector:
+                self.leader_elector.stop()
+            if self.read_api:
+                remove_save_listener(self.read_api.on_snapshot_saved)
+                self.read_api.stop()
+            if self.adaptive_triggers:
+                remove_save_listener(self.observe_adaptive_update)
+            if self.report_generator:
+                remove_save_listener(self.report_generator.on_snapshot_saved)
+                self.report_generator.stop()
+            if self.change_feed:
+                remove_save_listener(self.change_feed.on_snapshot_saved)
+                for service in self.change_feed_services:
+                    service.stop()
             
             stop_info = {
                 'scheduler_stopped': datetime.now().isoformat(),
@@ -251,6 +597,9 @@ def main():
                        choices=list(get_config().SCHEDULES.keys()),
                        default='daily_morning',
                        help='Schedule type to use')
+    parser.add_argument('--jobs', '-j',
+                       action='store_true',
+                       help='Run every named job from SchedulerConfig.JOBS instead of one schedule')
     parser.add_argument('--list-schedules', '-l', 
                        action='store_true',
                        help='List available schedule types')
@@ -264,7 +613,10 @@ def main():
             print(f"  {name}: {schedule}")
         return
     
-    scheduler = VegetablePriceScheduler(args.schedule)
+    if args.jobs:
+        scheduler = VegetablePriceScheduler(jobs=get_config().JOBS)
+    else:
+        scheduler = VegetablePriceScheduler(args.schedule)
     
     try:
         scheduler.start()
@@ -24,6 +24,16 @@ class SchedulerConfig:
         # Custom intervals
         'every_30_minutes': {'type': 'interval', 'minutes': 30},
         'every_15_minutes': {'type': 'interval', 'minutes': 15},  # For testing
+        
+        # Learns when prices change and scrapes just after likely update windows
+        'adaptive': {
+            'type': 'adaptive',
+            'min_interval_minutes': 15,
+            'max_interval_minutes': 240,  # Back off up to this during quiet periods
+            'offset_minutes': 5,  # Scrape this long after a likely update window
+            'start_time': '06:00',
+            'end_time': '20:00',
+        },
     }
     
     # Notification Settings
@@ -48,11 +58,67 @@ class SchedulerConfig:
     
     # Scheduler Settings
     SCHEDULER_SETTINGS = {
-        'max_workers': 1,  # Only one scraping job at a time
+        'max_workers': 4,  # Executor threads shared by all jobs; jobs on one source still run one at a time
         'coalesce': True,  # If a job is delayed, skip missed executions
         'max_instances': 1,  # Only one instance of each job
         'timezone': 'Asia/Kathmandu',
         'misfire_grace_time': 300,  # 5 minutes grace time
+        'execution_mode': 'in_process',  # 'in_process' or 'process_pool'
+        'job_timeout': 300,  # Hard wall-clock limit per scrape in process_pool mode (seconds)
+        'max_jobs_per_worker': 10,  # Recycle the worker process after this many scrapes
+    }
+    
+    # Pages that can be scraped; jobs sharing a lock_key never run at the same time
+    SOURCES = {
+        'nepalipatro': {
+            'url': None,  # Defaults to config.URL
+            'lock_key': 'nepalipatro',
+        },
+    }
+    
+    # Named jobs run together by `scheduler.py --jobs`, each with its own source,
+    # schedule (a SCHEDULES key) and optional RETRY_SETTINGS overrides
+    JOBS = [
+        {'name': 'nepalipatro_market_hours', 'source': 'nepalipatro', 'schedule': 'market_hours'},
+        # {'name': 'nepalipatro_hourly', 'source': 'nepalipatro', 'schedule': 'every_hour',
+        #  'retry': {'max_retries': 1}},
+    ]
+    
+    # Multi-node coordination: only the node holding the leader lease runs jobs
+    COORDINATION = {
+        'enabled': False,
+        'lease_file': None,  # Shared SQLite file; defaults to DATA_DIR/scheduler_leases.db
+        'lease_ttl': 30,  # seconds; a crashed leader is replaced within this plus a third of it
+        'node_id': None,  # Defaults to hostname:pid
+    }
+    
+    # Local read API for dashboards, served from memory
+    READ_API = {
+        'enabled': False,
+        'host': '127.0.0.1',
+        'port': 8765,
+        'cache_size': 256,  # Cached responses
+        'cache_ttl': 60,  # seconds
+    }
+    
+    # Weekly Excel workbooks and trend charts, built in the background after each save
+    REPORTS = {
+        'enabled': False,
+        'reports_dir': None,  # Defaults to DATA_DIR/reports
+        'charts': True,
+        'workbook_interval': 900,  # seconds; a week's workbook is rewritten at most this often
+    }
+    
+    # Per-vegetable price change events appended to DATA_DIR/change_feed.jsonl after each save
+    CHANGE_FEED = {
+        'enabled': False,
+        'sse': {'enabled': False, 'host': '127.0.0.1', 'port': 8766},
+        'webhook': {
+            'enabled': False,
+            'url': '',
+            'batch_size': 100,  # Events per POST
+            'flush_interval': 5,  # seconds
+        },
     }
     
     # Auto-retry settings
@@ -81,4 +147,10 @@ def get_config():
         config.NOTIFICATIONS['email']['recipient_email'] = os.getenv('SCRAPER_RECIPIENT_EMAIL')
         config.NOTIFICATIONS['email']['enabled'] = True
     
+    if os.getenv('SCRAPER_LEASE_FILE'):
+        config.COORDINATION['lease_file'] = os.getenv('SCRAPER_LEASE_FILE')
+        config.COORDINATION['enabled'] = True
+    if os.getenv('SCRAPER_NODE_ID'):
+        config.COORDINATION['node_id'] = os.getenv('SCRAPER_NODE_ID')
+    
     return config
\ No newline at end of file
@@ -1,30 +1,121 @@
 import json
 import logging
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import config
+from logging_setup import get_run_id, new_run_id, setup_logging
+from profiling import RunProfiler
+from driver_providers import get_driver_provider
+from price_records import PriceSnapshot
+from vegetable_catalog import VegetableCatalog
+from html_archive import HtmlArchive
+from price_matrix import PriceMatrix
+from price_rollups import PriceRollups
+
+# Callbacks run with each new history entry after save_data() commits it
+_save_listeners = []
+
+# Concurrent jobs in one process share the history file
+_save_lock = threading.Lock()
+
+_run_profiler = RunProfiler('scraper_run')
+
+# One catalog connection per process, however many scraper instances it creates
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_catalog():
+    """The process-wide vegetable catalog, opened on first use"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = VegetableCatalog()
+        return _catalog
+
+def add_save_listener(callback):
+    """Register `callback(entry)` to run after each successful save_data()"""
+    _save_listeners.append(callback)
+
+def remove_save_listener(callback):
+    """Unregister a callback added with add_save_listener()"""
+    if callback in _save_listeners:
+        _save_listeners.remove(callback)
+
+def append_history_entry(path, entry, tail_size=4096):
+    """Append an entry to the JSON array history file without reading the file in
+
+    Only the end of the file is read: the closing bracket is overwritten with
+    the new entry, laid out as json.dump(..., indent=2) would lay it out.
+    """
+    body = '  ' + json.dumps(entry, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+    if not path.exists() or path.stat().st_size == 0:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"[\n{body}\n]")
+        return
+
+    with open(path, 'r+b') as f:
+        size = f.seek(0, 2)
+        start = max(0, size - tail_size)
+        f.seek(start)
+        tail = f.read()
+        stripped = tail.rstrip()
+        if not stripped.endswith(b']'):
+            raise ValueError(f"{path} does not end with a JSON array")
+        before = stripped[:-1].rstrip()
+        if not before and start > 0:
+            raise ValueError(f"Cannot find the last entry in {path}")
+
+        separator = b'\n' if before.endswith(b'[') else b',\n'
+        write_at = start + len(before)
+        f.seek(write_at)
+        try:
+            f.write(separator + body.encode('utf-8') + b'\n]')
+            f.truncate()
+            f.flush()
+        except BaseException:
+            # Put the original end back rather than leave a broken array
+            f.seek(write_at)
+            f.write(tail[len(before):])
+            f.truncate()
+            raise
 
 class NepaliPatroVegetableScraper:
-    def __init__(self):
+    # Specific selectors for vegetable price data
+    PRICE_SELECTORS = [
+        "table tr",  # Table rows (most likely format)
+        ".price-table tr",
+        ".vegetable-price-row",
+        ".market-price tr",
+        "[class*='price'] tr",
+        "[class*='vegetable'] tr",
+        ".table-responsive tr",
+        "tbody tr",
+        ".price-item",
+        ".vegetable-item",
+        "[data-vegetable]",
+        "[data-price]"
+    ]
+    
+    def __init__(self, url=None, source=None):
+        self.url = url or config.URL
+        self.source = source or config.SOURCE
         self.driver = None
+        self.driver_provider = None
+        self.catalog = None
+        self.archived_html_hash = None
+        self.stage_timings = {}
         self.setup_logging()
         
     def setup_logging(self):
-        """Setup logging configuration"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(config.LOG_FILE),
-                logging.StreamHandler()
-            ]
-        )
+        """Setup logging configuration (only the first call in a process takes effect)"""
+        setup_logging(config.LOG_FILE)
         self.logger = logging.getLogger(__name__)
         
     def setup_driver(self):
@@ -38,10 +129,15 @@ class NepaliPatroVegetableScraper:
         if config.HEADLESS:
             chrome_options.add_argument("--headless")
             
+        started = time.perf_counter()
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver_provider = get_driver_provider()
+            self.driver = self.driver_provider.acquire(chrome_options, profile=self.source)
             self.driver.implicitly_wait(config.IMPLICIT_WAIT)
-            self.logger.info("Chrome driver initialized successfully")
+            launch_time = time.perf_counter() - started
+            self.stage_timings['browser_launch'] = round(launch_time, 3)
+            self.logger.info(f"Chrome driver initialized from {self.driver_provider.name} in {launch_time:.2f}s "
+                             f"(cold start mode {'on' if config.DRIVER_COLD_START else 'off'})")
         except Exception as e:
             self.logger.error(f"Failed to initialize Chrome driver: {e}")
             raise
@@ -49,8 +145,12 @@ class NepaliPatroVegetableScraper:
     def load_page(self):
         """Load the vegetables page"""
         try:
-            self.logger.info(f"Loading page: {config.URL}")
-            self.driver.get(config.URL)
+            self.logger.info(f"Loading page: {self.url}")
+            started = time.perf_counter()
+            self.driver.get(self.url)
+            navigation_time = time.perf_counter() - started
+            self.stage_timings['first_navigation'] = round(navigation_time, 3)
+            self.logger.info(f"First navigation took {navigation_time:.2f}s")
             
             # Wait for page to load completely
             WebDriverWait(self.driver, config.WAIT_TIME).until(
@@ -58,7 +158,7 @@ class NepaliPatroVegetableScraper:
             )
             
             # Additional wait for JavaScript content to load
-            time.sleep(5)
+            time.sleep(config.PAGE_SETTLE_TIME)
             self.logger.info("Page loaded successfully")
             
         except TimeoutException:
@@ -68,6 +168,15 @@ class NepaliPatroVegetableScraper:
             self.logger.error(f"Error loading page: {e}")
             raise
             
+    def archive_page(self):
+        """Keep the raw page HTML so it can be re-parsed offline later"""
+        if not config.ARCHIVE_HTML:
+            return
+        try:
+            self.archived_html_hash = HtmlArchive().store(self.driver.page_source, self.url, source=self.source)
+        except Exception as e:
+            self.logger.warning(f"Failed to archive page HTML: {e}")
+            
     def extract_price_from_text(self, text):
         """Extract numeric price values from text"""
         import re
@@ -95,26 +204,10 @@ class NepaliPatroVegetableScraper:
             # Wait for content to be present
             self.logger.info("Waiting for vegetable price content to load...")
             
-            # Specific selectors for vegetable price data
-            price_selectors = [
-                "table tr",  # Table rows (most likely format)
-                ".price-table tr",
-                ".vegetable-price-row",
-                ".market-price tr",
-                "[class*='price'] tr",
-                "[class*='vegetable'] tr",
-                ".table-responsive tr",
-                "tbody tr",
-                ".price-item",
-                ".vegetable-item",
-                "[data-vegetable]",
-                "[data-price]"
-            ]
-            
             elements_found = False
             raw_data = []
             
-            for selector in price_selectors:
+            for selector in self.PRICE_SELECTORS:
                 try:
                     elements = WebDriverWait(self.driver, 5).until(
                         EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector))
@@ -140,16 +233,14 @@ class NepaliPatroVegetableScraper:
                                             'row_index': i,
                                             'full_text': text_content,
                                             'cells': cell_texts,
-                                            'selector_used': selector,
-                                            'timestamp': datetime.now().isoformat()
+                                            'selector_used': selector
                                         }
                                     else:
                                         # Not a table, just extract text
                                         raw_info = {
                                             'row_index': i,
                                             'full_text': text_content,
-                                            'selector_used': selector,
-                                            'timestamp': datetime.now().isoformat()
+                                            'selector_used': selector
                                         }
                                     
                                     raw_data.append(raw_info)
@@ -184,6 +275,7 @@ class NepaliPatroVegetableScraper:
                                 'table_index': i,
                                 'table_html_preview': table_html,
                                 'table_text_preview': table.text[:200],
+                                'archived_html': self.archived_html_hash,
                                 'timestamp': datetime.now().isoformat()
                             }
                             vegetables_data.append(debug_info)
@@ -196,6 +288,7 @@ class NepaliPatroVegetableScraper:
                             'page_title': page_title,
                             'body_text_preview': body_text,
                             'current_url': self.driver.current_url,
+                            'archived_html': self.archived_html_hash,
                             'timestamp': datetime.now().isoformat(),
                             'message': 'No table structure found for vegetable prices'
                         }
@@ -209,7 +302,7 @@ class NepaliPatroVegetableScraper:
             error_info = {
                 'error': str(e),
                 'timestamp': datetime.now().isoformat(),
-                'url': config.URL
+                'url': self.url
             }
             vegetables_data.append(error_info)
             
@@ -217,7 +310,9 @@ class NepaliPatroVegetableScraper:
     
     def process_price_data(self, raw_data):
         """Process raw scraped data to extract vegetable names and prices"""
-        processed_vegetables = {}
+        snapshot = PriceSnapshot()
+        if self.catalog is None:
+            self.catalog = get_catalog()
         
         self.logger.info(f"Processing {len(raw_data)} raw data entries for price extraction")
         
@@ -244,9 +339,7 @@ class NepaliPatroVegetableScraper:
                             all_prices.extend(prices)
                         
                         if vegetable_name and all_prices:
-                            if vegetable_name not in processed_vegetables:
-                                processed_vegetables[vegetable_name] = []
-                            processed_vegetables[vegetable_name].extend(all_prices)
+                            self.add_snapshot_prices(snapshot, vegetable_name, all_prices)
                     
                     elif len(cells) >= 2:  # Minimum: [vegetable, price]
                         vegetable_name = cells[0]
@@ -254,9 +347,7 @@ class NepaliPatroVegetableScraper:
                         prices = self.extract_price_from_text(price_text)
                         
                         if vegetable_name and prices:
-                            if vegetable_name not in processed_vegetables:
-                                processed_vegetables[vegetable_name] = []
-                            processed_vegetables[vegetable_name].extend(prices)
+                            self.add_snapshot_prices(snapshot, vegetable_name, prices)
                 
                 else:
                     # Non-table format - try to extract from full text
@@ -268,44 +359,40 @@ class NepaliPatroVegetableScraper:
                 self.logger.warning(f"Error processing entry {entry.get('row_index', 'unknown')}: {e}")
                 continue
         
-        # Calculate min, max, average for each vegetable
-        final_vegetables_data = []
-        for vegetable_name, prices in processed_vegetables.items():
-            if prices:  # Only if we have price data
-                price_stats = {
-                    'vegetable_name': vegetable_name,
-                    'min_price': min(prices),
-                    'max_price': max(prices),
-                    'average_price': round(sum(prices) / len(prices), 2),
-                    'price_count': len(prices),
-                    'all_prices': prices,
-                    'timestamp': datetime.now().isoformat()
-                }
-                final_vegetables_data.append(price_stats)
+        # Min, max and average are calculated when the snapshot is serialized
+        self.logger.info(f"Processed price data for {len(snapshot)} vegetables")
+        return snapshot
         
-        self.logger.info(f"Processed price data for {len(final_vegetables_data)} vegetables")
-        return final_vegetables_data
+    def add_snapshot_prices(self, snapshot, raw_name, prices):
+        """Add prices to the snapshot under the vegetable's canonical catalog ID"""
+        vegetable_id = self.catalog.get_id(raw_name)
+        snapshot.add_prices(vegetable_id, self.catalog.get_name(vegetable_id), prices)
         
     def save_data(self, data):
         """Save scraped vegetable price data to JSON file"""
         try:
-            # Load existing data if file exists
-            existing_data = []
-            if config.OUTPUT_FILE.exists():
-                with open(config.OUTPUT_FILE, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-                    
+            # Snapshots carry one timestamp for all of their records
+            if isinstance(data, PriceSnapshot):
+                scrape_timestamp = data.timestamp
+                data = data.to_storage()
+            else:
+                scrape_timestamp = datetime.now().isoformat()
+                
             # Add new data with timestamp
             new_entry = {
-                'scrape_timestamp': datetime.now().isoformat(),
+                'scrape_timestamp': scrape_timestamp,
                 'vegetables_count': len(data),
-                'vegetables_price_data': data
+                'vegetables_price_data': data,
+                'source': self.source
             }
-            existing_data.append(new_entry)
             
-            # Save updated data
-            with open(config.OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, indent=2, ensure_ascii=False)
+            with _save_lock:
+                append_history_entry(config.OUTPUT_FILE, new_entry)
+                
+                if config.PRICE_MATRIX:
+                    self.append_price_matrix(new_entry)
+                if config.ROLLUPS:
+                    self.update_rollups(new_entry)
                 
             self.logger.info(f"Vegetable price data saved to {config.OUTPUT_FILE}")
             self.logger.info(f"Scraped price data for {len(data)} vegetables")
@@ -328,27 +415,88 @@ class NepaliPatroVegetableScraper:
         except Exception as e:
             self.logger.error(f"Error saving data: {e}")
             raise
+        
+        self.notify_save_listeners(new_entry)
+        return new_entry
+        
+    def append_price_matrix(self, entry):
+        """Add the saved snapshot as a row of the memory-mapped price matrix"""
+        try:
+            PriceMatrix(entry['source']).append_entry(entry)
+        except Exception as e:
+            # The matrix can be rebuilt from the history file with scripts/build_price_matrix.py
+            self.logger.warning(f"Failed to append to price matrix: {e}")
+        
+    def update_rollups(self, entry):
+        """Fold the saved snapshot into the day/week/month price rollups"""
+        try:
+            rollups = PriceRollups()
+            try:
+                rollups.add_entry(entry)
+            finally:
+                rollups.close()
+        except Exception as e:
+            # Rollups can be rebuilt from the history file with scripts/query_rollups.py --rebuild
+            self.logger.warning(f"Failed to update price rollups: {e}")
+        
+    def notify_save_listeners(self, entry):
+        """Hand a committed history entry to registered save listeners"""
+        for callback in list(_save_listeners):
+            try:
+                callback(entry)
+            except Exception as e:
+                self.logger.error(f"Save listener {getattr(callback, '__qualname__', callback)} failed: {e}")
+            
+    def scrape(self):
+        """Load the page and return the scraped price data without saving it"""
+        try:
+            with self.timed_stage('setup_driver'):
+                self.setup_driver()
+            with self.timed_stage('load_page'):
+                self.load_page()
+            with self.timed_stage('archive_page'):
+                self.archive_page()
+            with self.timed_stage('extract'):
+                return self.scrape_vegetables_data()
+        finally:
+            with self.timed_stage('close_driver'):
+                self.close_driver()
+            
+    @contextmanager
+    def timed_stage(self, stage):
+        """Record how long a stage of the run takes in stage_timings"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[stage] = round(time.perf_counter() - started, 3)
+            
+    def close_driver(self):
+        """Quit the browser if it is open"""
+        if self.driver:
+            driver, self.driver = self.driver, None
+            if self.driver_provider:
+                self.driver_provider.release(driver)
+            else:
+                driver.quit()
+            self.logger.info("Browser closed")
             
     def run(self):
         """Run the complete scraping process"""
         try:
             self.logger.info("Starting Nepali Patro vegetable scraper...")
             
-            # Setup and run scraper
-            self.setup_driver()
-            self.load_page()
-            vegetables_data = self.scrape_vegetables_data()
-            self.save_data(vegetables_data)
+            # Setup and run scraper (profiled only when not already inside a profiled job)
+            with _run_profiler.profile(get_run_id() or new_run_id()):
+                vegetables_data = self.scrape()
+                with self.timed_stage('save'):
+                    self.save_data(vegetables_data)
             
             self.logger.info("Scraping completed successfully!")
             
         except Exception as e:
             self.logger.error(f"Scraping failed: {e}")
             raise
-        finally:
-            if self.driver:
-                self.driver.quit()
-                self.logger.info("Browser closed")
 
 def main():
     scraper = NepaliPatroVegetableScraper()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Rebuild the memory-mapped price matrices from the price history file
+Usage: python scripts/build_price_matrix.py [--info]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+from export import iter_history
+from price_matrix import PriceMatrix, matrix_sources, rebuild_matrices
+from vegetable_catalog import VegetableCatalog, with_vegetable_ids
+
+def print_info(source):
+    matrix = PriceMatrix(source)
+    view = matrix.read()
+    print(f"Price matrix for {source}: {matrix.matrix_dir}")
+    print(f"Snapshots: {len(view)}")
+    print(f"Vegetables: {len(view.vegetable_ids)}")
+    if len(view):
+        print(f"From {view.timestamps[0]} to {view.timestamps[-1]}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the price matrices from history')
+    parser.add_argument('--info', '-i',
+                       action='store_true',
+                       help='Only show the size of the current matrices')
+
+    args = parser.parse_args()
+
+    if args.info:
+        sources = matrix_sources()
+        if not sources:
+            print(f"No price matrices in {config.PRICE_MATRIX_DIR}")
+        for source in sources:
+            print_info(source)
+        return 0
+
+    if not config.OUTPUT_FILE.exists():
+        print(f"No price history at {config.OUTPUT_FILE}")
+        return 1
+
+    catalog = VegetableCatalog()
+    try:
+        counts = rebuild_matrices(with_vegetable_ids(iter_history(), catalog))
+    finally:
+        catalog.close()
+    for source, rows in sorted(counts.items()):
+        print(f"Rebuilt price matrix for {source} with {rows} snapshots")
+        print_info(source)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Export the price history to CSV, Parquet or XLSX without loading it into memory
+Usage: python scripts/export_prices.py OUTPUT [--format csv|parquet|xlsx]
+                                       [--from DATE] [--to DATE] [--vegetable NAME_OR_ID ...]
+"""
+
+import sys
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+from export import EXPORT_FORMATS, export_history
+from vegetable_catalog import VegetableCatalog
+
+def parse_bound(value, inclusive_day=False):
+    """ISO date or timestamp; a bare end date covers that whole day"""
+    if value is None:
+        return None
+    moment = datetime.fromisoformat(value)
+    if inclusive_day and len(value) == 10:
+        moment += timedelta(days=1)
+    return moment
+
+def resolve_vegetables(values):
+    """Catalog IDs plus lower-cased names, so records from before the catalog still match"""
+    if not values:
+        return None
+    wanted = set()
+    catalog = VegetableCatalog()
+    try:
+        for value in values:
+            if value.isdigit():
+                wanted.add(int(value))
+                continue
+            wanted.add(value.lower())
+            vegetable_id = catalog.find_id(value)
+            if vegetable_id is not None:
+                wanted.add(vegetable_id)
+    finally:
+        catalog.close()
+    return wanted
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream the price history into an export file')
+    parser.add_argument('output', type=Path,
+                       help='File to write; the format defaults to its extension')
+    parser.add_argument('--format', '-f', choices=EXPORT_FORMATS,
+                       help='Export format')
+    parser.add_argument('--from', dest='start',
+                       help='Earliest scrape date or timestamp to include')
+    parser.add_argument('--to', dest='end',
+                       help='Latest scrape date (inclusive) or timestamp (exclusive)')
+    parser.add_argument('--vegetable', '-v', action='append',
+                       help='Vegetable name or catalog ID to include (repeatable)')
+    parser.add_argument('--batch-size', type=int, default=10000,
+                       help='Rows per Parquet row group')
+
+    args = parser.parse_args()
+
+    if not config.OUTPUT_FILE.exists():
+        print(f"No price history at {config.OUTPUT_FILE}")
+        return 1
+
+    try:
+        count = export_history(
+            args.output,
+            fmt=args.format,
+            start=parse_bound(args.start),
+            end=parse_bound(args.end, inclusive_day=True),
+            vegetables=resolve_vegetables(args.vegetable),
+            batch_size=args.batch_size
+        )
+    except (ValueError, RuntimeError) as e:
+        print(f"Export failed: {e}")
+        return 1
+
+    print(f"Exported {count} rows to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Run local processes contending for the scheduler leader lease
+Usage: python scripts/lease_demo.py [--processes N] [--ttl SECONDS] [--hold SECONDS]
+
+Each process ticks while it believes it is leader and crashes after holding
+the lease for --hold seconds, so takeovers can be watched in the log.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import multiprocessing
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+from coordination import LeaseManager, LeaderElector
+
+def contend(lease_file, ttl, hold=None, node_id=None, ticks_file=None, clock_skew=0.0, renew_interval=None):
+    """Contend for leadership, ticking while leader; crash after holding it for `hold` seconds
+
+    `clock_skew` shifts this process's wall clock, standing in for a host whose
+    clock is off. Ticks ("node_id time") are appended to `ticks_file` every
+    tenth of a second while this node believes it is leader.
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(message)s')
+    if clock_skew:
+        wall_clock = time.time
+        time.time = lambda: wall_clock() + clock_skew
+    elector = LeaderElector(LeaseManager(lease_file, node_id=node_id), ttl=ttl, renew_interval=renew_interval)
+    elector.start()
+    leader_since = None
+    while True:
+        if elector.is_leader():
+            leader_since = leader_since or time.monotonic()
+            if ticks_file:
+                with open(ticks_file, 'a') as f:
+                    f.write(f"{elector.lease_manager.node_id} {time.monotonic()}\n")
+            if hold is not None and time.monotonic() - leader_since >= hold:
+                logging.info("Simulating a crash while holding the lease")
+                os._exit(1)
+        else:
+            leader_since = None
+        time.sleep(0.1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run local processes contending for the scheduler leader lease')
+    parser.add_argument('--processes', '-n', type=int, default=3, help='Number of contending processes')
+    parser.add_argument('--lease-file', default=str(config.DATA_DIR / "scheduler_leases_demo.db"))
+    parser.add_argument('--ttl', type=float, default=3, help='Lease TTL in seconds')
+    parser.add_argument('--hold', type=float, default=5, help='Seconds a leader runs before crashing')
+
+    args = parser.parse_args()
+
+    processes = [
+        multiprocessing.Process(target=contend, args=(args.lease_file, args.ttl, args.hold))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Switch scrape profiling on or off for running schedulers and workers
+Usage: python scripts/profile_control.py on [--every N] [--threshold SECONDS]
+       python scripts/profile_control.py off|status|clear|list
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+from profiling import clear_settings, load_settings, save_settings
+
+def print_status():
+    settings = load_settings()
+    source = "control file" if config.PROFILE_CONTROL_FILE.exists() else "environment"
+    print(f"Profiling: {'on' if settings['enabled'] else 'off'} (from {source})")
+    print(f"Every Nth run: {settings['every_n'] or 'never'}")
+    print(f"Latency threshold: {settings['threshold'] if settings['threshold'] is not None else 'none'}")
+    print(f"Profiles: {config.PROFILE_DIR}")
+
+def list_profiles():
+    profiles = sorted(config.PROFILE_DIR.glob('*.prof'), key=lambda path: path.stat().st_mtime)
+    if not profiles:
+        print("No saved profiles")
+        return
+    for path in profiles:
+        summary = path.with_suffix('.txt')
+        headline = summary.read_text(encoding='utf-8').splitlines()[0] if summary.exists() else ''
+        print(f"{path.name:<45} {headline}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Control scrape profiling')
+    parser.add_argument('command', choices=['on', 'off', 'status', 'clear', 'list'],
+                       help="'clear' removes the control file so SCRAPER_PROFILE* variables apply again")
+    parser.add_argument('--every', '-n', type=int, default=None,
+                       help='Profile every Nth run (0 to only use the threshold)')
+    parser.add_argument('--threshold', '-t', type=float, default=None,
+                       help='Keep profiles of runs slower than this many seconds')
+
+    args = parser.parse_args()
+
+    if args.command in ('on', 'off'):
+        settings = load_settings()
+        settings['enabled'] = args.command == 'on'
+        if args.every is not None:
+            settings['every_n'] = args.every
+        if args.threshold is not None:
+            settings['threshold'] = args.threshold
+        save_settings(settings)
+        print_status()
+    elif args.command == 'clear':
+        clear_settings()
+        print_status()
+    elif args.command == 'list':
+        list_profiles()
+    else:
+        print_status()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Query per-vegetable day/week/month price rollups
+Usage: python scripts/query_rollups.py [--period week] [--source NAME] [--vegetable NAME_OR_ID]
+                                       [--from DATE] [--to DATE]
+       python scripts/query_rollups.py --rebuild
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+from export import iter_history
+from price_rollups import PERIODS, PriceRollups
+from vegetable_catalog import VegetableCatalog, with_vegetable_ids
+
+def rebuild(rollups):
+    if not config.OUTPUT_FILE.exists():
+        print(f"No price history at {config.OUTPUT_FILE}")
+        return 1
+    catalog = VegetableCatalog()
+    try:
+        count = rollups.rebuild(with_vegetable_ids(iter_history(), catalog))
+    finally:
+        catalog.close()
+    print(f"Rebuilt rollups from {count} snapshots into {rollups.path}")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Query price rollups')
+    parser.add_argument('--period', '-p', choices=PERIODS, default='week',
+                       help='Rollup period')
+    parser.add_argument('--source', '-s',
+                       help='Only rollups of this source (default: all)')
+    parser.add_argument('--vegetable', '-v',
+                       help='Vegetable name or catalog ID (default: all)')
+    parser.add_argument('--from', dest='start',
+                       help='First date or bucket label, e.g. 2026-01-01 or 2026-W01')
+    parser.add_argument('--to', dest='end',
+                       help='Last date or bucket label')
+    parser.add_argument('--json', action='store_true',
+                       help='Print rows as JSON')
+    parser.add_argument('--rebuild', action='store_true',
+                       help='Recompute every rollup from the price history file')
+
+    args = parser.parse_args()
+    rollups = PriceRollups()
+    catalog = VegetableCatalog()
+
+    try:
+        if args.rebuild:
+            return rebuild(rollups)
+
+        vegetable_id = None
+        if args.vegetable:
+            vegetable_id = int(args.vegetable) if args.vegetable.isdigit() else catalog.find_id(args.vegetable)
+            if vegetable_id is None:
+                print(f"Unknown vegetable: {args.vegetable}")
+                return 1
+
+        rows = rollups.query(args.period, vegetable_id, args.start, args.end, source=args.source)
+        if args.json:
+            print(json.dumps(rows, indent=2, ensure_ascii=False))
+            return 0
+        if not rows:
+            print("No rollups found")
+            return 0
+
+        names = {}
+        print(f"{'Source':<14}{'Vegetable':<28}{'Bucket':<12}{'Min':>9}{'Max':>9}{'Mean':>9}{'First':>9}{'Last':>9}{'Count':>7}")
+        for row in rows:
+            if row['vegetable_id'] not in names:
+                vegetable = catalog.get_vegetable(row['vegetable_id'])
+                names[row['vegetable_id']] = vegetable['name'] if vegetable else str(row['vegetable_id'])
+            print(f"{row['source'][:13]:<14}{names[row['vegetable_id']][:27]:<28}{row['bucket']:<12}"
+                  f"{row['min']:>9.2f}{row['max']:>9.2f}{row['mean']:>9.2f}"
+                  f"{row['first']:>9.2f}{row['last']:>9.2f}{row['count']:>7}")
+        return 0
+    finally:
+        rollups.close()
+        catalog.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
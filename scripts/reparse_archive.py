@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Rebuild vegetable price history from the archived raw page HTML
+Usage: python scripts/reparse_archive.py [--output FILE] [--workers N]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+from html_archive import reparse_archive
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-parse archived pages offline')
+    parser.add_argument('--output', '-o',
+                       type=Path,
+                       default=config.DATA_DIR / "vegetables_data_reparsed.json",
+                       help='File to write the rebuilt history to')
+    parser.add_argument('--workers', '-w',
+                       type=int,
+                       default=None,
+                       help='Number of worker processes (default: all cores)')
+    
+    args = parser.parse_args()
+    
+    if args.output.resolve() == config.OUTPUT_FILE.resolve():
+        print(f"Refusing to overwrite {config.OUTPUT_FILE}; write elsewhere and swap it in manually.")
+        return 1
+    
+    print(f"Re-parsing archived pages from {config.ARCHIVE_DIR}...")
+    runs, pages = reparse_archive(args.output, max_workers=args.workers)
+    print(f"Rebuilt {runs} runs from {pages} distinct pages into {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
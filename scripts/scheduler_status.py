@@ -5,6 +5,7 @@ Check the status of the vegetable price scheduler
 
 import sys
 import json
+import argparse
 import psutil
 from pathlib import Path
 from datetime import datetime
@@ -13,8 +14,54 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).parent.parent))
 
 import config
+from run_ledger import RunLedger, summarize
+
+def format_seconds(value):
+    return f"{value:.2f}s" if value is not None else "-"
+
+def window_list(value):
+    """argparse type: comma-separated positive run counts, sorted"""
+    windows = []
+    for part in value.split(','):
+        try:
+            window = int(part)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"not a whole number of runs: {part.strip()!r}")
+        if window <= 0:
+            raise argparse.ArgumentTypeError(f"windows must be positive, got {window}")
+        windows.append(window)
+    return sorted(windows)
+
+def print_run_history(windows):
+    """Print duration percentiles, success rate and slowest stages per window"""
+    print("=== Run History ===")
+    records = RunLedger().tail(max(windows))
+    if not records:
+        print("No runs recorded yet.")
+        return
+    
+    for window in windows:
+        summary = summarize(records[-window:])
+        print(f"Last {summary['runs']} attempts (window {window}):")
+        print(f"  Success Rate: {summary['success_rate'] * 100:.1f}%")
+        print(f"  Duration p50/p95/p99: {format_seconds(summary['p50'])} / "
+              f"{format_seconds(summary['p95'])} / {format_seconds(summary['p99'])}")
+        if summary['slowest_stages']:
+            print("  Slowest Stages (mean / p95):")
+            for stage, mean, p95 in summary['slowest_stages']:
+                print(f"    {stage}: {format_seconds(mean)} / {format_seconds(p95)}")
+        if summary['runs'] < window:
+            break
 
 def main():
+    parser = argparse.ArgumentParser(description='Vegetable Price Scheduler Status')
+    parser.add_argument('--windows', '-w',
+                       type=window_list,
+                       default='20,100,500',
+                       help='Comma-separated run counts to summarize from the run ledger')
+    
+    args = parser.parse_args()
+    
     print("=== Vegetable Price Scheduler Status ===\n")
     
     # Check status file
@@ -27,6 +74,10 @@ def main():
             print(f"Status File: {status_file}")
             print(f"Last Updated: {status.get('last_updated', 'Unknown')}")
             print(f"Schedule Type: {status.get('schedule_type', 'Unknown')}")
+            if status.get('jobs'):
+                print(f"Jobs: {', '.join(status['jobs'])}")
+            if status.get('job'):
+                print(f"Last Job: {status['job']}")
             print(f"Status: {status.get('status', 'Unknown')}")
             
             if status.get('last_successful_run'):
@@ -67,6 +118,10 @@ def main():
     
     print()
     
+    print_run_history(args.windows)
+    
+    print()
+    
     # Check recent data
     print("=== Recent Data ===")
     data_file = config.OUTPUT_FILE
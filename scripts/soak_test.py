@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Soak test the vegetable price scheduler with a fast interval schedule
+Usage: python scripts/soak_test.py [--cycles N] [--interval SECONDS]
+                                   [--mode in_process|process_pool|both] [--driver stub|real]
+
+Starts the real BackgroundScheduler with a short interval job scraping a local
+fixture server, once per execution mode, and lets it fire until N runs have
+saved. RSS, open file descriptors, threads and child processes are sampled
+along the way. Exits non-zero if the scheduler fired too few runs, any run
+failed, or any of the resources keeps growing.
+"""
+
+import sys
+import os
+import gc
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+import collections
+import urllib.request
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psutil
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+VEGETABLES = [
+    "Tomato Big(Nepali)", "Tomato Small(Local)", "Potato Red", "Potato White",
+    "Onion Dry (Indian)", "Carrot(Local)", "Cabbage(Local)", "Cauli Local",
+    "Raddish White(Local)", "Brinjal Long", "Cowpea(Long)", "Bitter Gourd",
+    "Bottle Gourd", "Pumpkin", "Okara", "Cucumber(Local)", "Ginger",
+    "Garlic Dry Chinese", "Chilli Green", "Mustard Leaf", "Spinach Leaf",
+    "Mushroom(Kanya)", "Cauli Terai", "Capsicum",
+]
+
+
+def fixture_html(request_number):
+    rng = random.Random(request_number // 4)  # Prices change every few requests
+    rows = "\n".join(
+        f"<tr><td>{name}</td><td>KG</td><td>Rs {low}</td><td>Rs {low + 10}</td><td>Rs {low + 5}</td></tr>"
+        for name, low in ((name, rng.randint(20, 300)) for name in VEGETABLES)
+    )
+    return f"""<html><head><title>Vegetables</title></head><body>
+<table class="table-responsive"><tbody>
+<tr><th>Vegetable</th><th>Unit</th><th>Min Price</th><th>Max Price</th><th>Average Price</th></tr>
+{rows}
+</tbody></table></body></html>"""
+
+
+def start_fixture_server():
+    """Serve changing vegetable price tables on a local port"""
+    counter = {'requests': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            counter['requests'] += 1
+            body = fixture_html(counter['requests']).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fixture-server', daemon=True).start()
+    return server
+
+
+class StubElement:
+    """Enough of a Selenium WebElement for the scraper, backed by BeautifulSoup"""
+
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def text(self):
+        return self.node.get_text(' ', strip=True)
+
+    def find_elements(self, by, value):
+        return _find(self.node, by, value)
+
+    def get_attribute(self, name):
+        if name == 'outerHTML':
+            return str(self.node)
+        return self.node.get(name)
+
+
+class StubDriver:
+    """Enough of a Selenium WebDriver for the scraper, fetching pages with urllib"""
+
+    def __init__(self):
+        self.soup = None
+        self.page_source = ''
+        self.current_url = None
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def get(self, url):
+        from bs4 import BeautifulSoup
+        with urllib.request.urlopen(url, timeout=10) as response:
+            self.page_source = response.read().decode('utf-8')
+        self.soup = BeautifulSoup(self.page_source, 'lxml')
+        self.current_url = url
+
+    @property
+    def title(self):
+        return self.soup.title.get_text() if self.soup and self.soup.title else ''
+
+    def execute_script(self, script, *args):
+        return "complete"
+
+    def find_elements(self, by, value):
+        return _find(self.soup, by, value)
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(value)
+        return elements[0]
+
+    def quit(self):
+        self.soup = None
+
+
+class StubDriverProvider:
+    """Driver provider handing out StubDrivers, loaded through SCRAPER_DRIVER_PROVIDER
+
+    Selected by environment so scrape workers spawned in process_pool mode use
+    it too.
+    """
+
+    name = 'stub driver'
+
+    def acquire(self, chrome_options, profile=None):
+        return StubDriver()
+
+    def release(self, driver):
+        driver.quit()
+
+
+def _find(node, by, value):
+    from selenium.webdriver.common.by import By
+    if by == By.CSS_SELECTOR:
+        return [StubElement(found) for found in node.select(value)]
+    if by == By.TAG_NAME:
+        return [StubElement(found) for found in node.find_all(value)]
+    raise NotImplementedError(f"Stub driver does not support locating by {by}")
+
+
+def sample(process):
+    gc.collect()
+    return {
+        'rss_mb': process.memory_info().rss / (1024 * 1024),
+        'fds': process.num_fds() if hasattr(process, 'num_fds') else process.num_handles(),
+        'threads': process.num_threads(),
+        'children': len(process.children(recursive=True)),
+    }
+
+
+def check_growth(samples, tolerances, output=sys.stdout):
+    """Compare the early steady state with the end of the run for each metric"""
+    decile = max(1, len(samples) // 10)
+    baseline_samples = samples[decile:2 * decile] or samples[:decile]
+    final_samples = samples[-decile:]
+
+    failures = []
+    print(f"\n{'Metric':<10}{'Baseline':>12}{'Final':>12}{'Max':>12}{'Allowed':>12}", file=output)
+    for metric, (absolute, relative) in tolerances.items():
+        baseline = statistics.median(s[metric] for s in baseline_samples)
+        final = statistics.median(s[metric] for s in final_samples)
+        peak = max(s[metric] for s in samples)
+        allowed = baseline + max(absolute, baseline * relative)
+        print(f"{metric:<10}{baseline:>12.1f}{final:>12.1f}{peak:>12.1f}{allowed:>12.1f}", file=output)
+        if final > allowed:
+            failures.append(f"{metric} grew from {baseline:.1f} to {final:.1f} (allowed {allowed:.1f})")
+    return failures
+
+
+def run_soak(mode, args, url, output):
+    """Run the scheduler in one execution mode until args.cycles runs have saved
+
+    Returns a list of failure messages, empty if the soak passed.
+    """
+    import config
+    import scraper
+    from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+    from run_ledger import RunLedger
+    from scheduler import VegetablePriceScheduler
+    from scheduler_config import get_config
+
+    # Class-level settings, so the scheduler's own get_config() sees them
+    scheduler_config = get_config()
+    scheduler_config.SCHEDULER_SETTINGS['execution_mode'] = mode
+    scheduler_config.SCHEDULES['soak'] = {'type': 'interval', 'seconds': args.interval}
+    source = next(iter(scheduler_config.SOURCES))
+    scheduler_config.SOURCES[source]['url'] = url
+    scheduler_config.NOTIFICATIONS['desktop']['enabled'] = False
+    scheduler_config.NOTIFICATIONS['email']['enabled'] = False
+
+    job_name = f"soak_{mode}"
+    soak = VegetablePriceScheduler(jobs=[{'name': job_name, 'source': source, 'schedule': 'soak'}])
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+        # Firings skipped while a slow run is still going are counted below instead
+        logging.getLogger('apscheduler').setLevel(logging.ERROR)
+
+    fired = collections.Counter()
+    events = {EVENT_JOB_EXECUTED: 'executed', EVENT_JOB_ERROR: 'error',
+              EVENT_JOB_MISSED: 'missed', EVENT_JOB_MAX_INSTANCES: 'skipped'}
+    soak.scheduler.add_listener(lambda event: fired.update([events[event.code]]),
+                                EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+    saved = collections.Counter()
+    on_saved = lambda entry: saved.update(['runs'])
+    scraper.add_save_listener(on_saved)
+
+    process = psutil.Process()
+    samples = []
+    next_sample = args.sample_every
+    next_reset = args.reset_data_every
+    # Generous: worker pools respawn a process every few runs
+    deadline = time.monotonic() + 120 + args.cycles * max(args.interval, 0.5) * 4
+    started = time.monotonic()
+    print(f"\n[{mode}] Soak testing {args.cycles} runs every {args.interval}s "
+          f"with the {args.driver} driver", file=output)
+
+    thread = threading.Thread(target=soak.start, name='soak-scheduler', daemon=True)
+    thread.start()
+    try:
+        while saved['runs'] < args.cycles and time.monotonic() < deadline and thread.is_alive():
+            time.sleep(0.05)
+            runs = saved['runs']
+            if runs >= next_reset:
+                next_reset += args.reset_data_every
+                # Truncate the history so its legitimate growth is not mistaken for a leak
+                with scraper._save_lock:
+                    if config.OUTPUT_FILE.exists():
+                        config.OUTPUT_FILE.unlink()
+            if runs >= next_sample:
+                next_sample += args.sample_every
+                samples.append(sample(process))
+                latest = samples[-1]
+                print(f"[{mode}] runs {runs:>6}  fired {fired['executed']:>6}  "
+                      f"rss {latest['rss_mb']:.1f} MB  fds {latest['fds']}  "
+                      f"threads {latest['threads']}  children {latest['children']}", file=output)
+    finally:
+        soak.stop()
+        thread.join(timeout=30)
+        scraper.remove_save_listener(on_saved)
+
+    elapsed = time.monotonic() - started
+    attempts = [record for record in RunLedger().tail(10 * args.cycles + 100) if record['job'] == job_name]
+    failed = [record for record in attempts if record['outcome'] != 'success']
+    print(f"[{mode}] {saved['runs']} runs saved, {fired['executed']} firings executed, "
+          f"{fired['skipped']} skipped while busy, {fired['missed']} missed, {fired['error']} errored, {len(failed)} failed attempts "
+          f"in {elapsed:.1f}s", file=output)
+
+    failures = []
+    if saved['runs'] < args.cycles:
+        failures.append(f"only {saved['runs']} of {args.cycles} runs saved before the deadline")
+    if fired['executed'] < saved['runs']:
+        failures.append(f"{saved['runs']} runs saved but the scheduler executed only {fired['executed']} firings")
+    if fired['error']:
+        failures.append(f"{fired['error']} firings raised")
+    if failed:
+        failures.append(f"{len(failed)} attempts failed, e.g. {failed[0].get('error')}")
+
+    if len(samples) < 10:
+        failures.append("too few samples to judge growth; increase --cycles or lower --sample-every")
+    else:
+        failures += check_growth(samples, {
+            'rss_mb': (args.rss_tolerance_mb, 0.25),
+            'fds': (5, 0.0),
+            'threads': (2, 0.0),
+            'children': (1, 0.0),
+        }, output)
+    return [f"[{mode}] {failure}" for failure in failures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Soak test the scheduler with a fast interval schedule')
+    parser.add_argument('--cycles', '-n', type=int, default=500, help='Runs to complete in each mode')
+    parser.add_argument('--interval', '-i', type=float, default=0.2, help='Seconds between scheduled firings')
+    parser.add_argument('--mode', '-m', choices=['in_process', 'process_pool', 'both'], default='both',
+                       help='Scheduler execution mode to soak')
+    parser.add_argument('--driver', choices=['stub', 'real'], default='stub',
+                       help='Stub driver (fast) or real headless Chrome')
+    parser.add_argument('--sample-every', type=int, default=20, help='Runs between resource samples')
+    parser.add_argument('--reset-data-every', type=int, default=100,
+                       help='Runs between truncating the history file, so its legitimate growth is not mistaken for a leak')
+    parser.add_argument('--rss-tolerance-mb', type=float, default=30)
+    parser.add_argument('--verbose', '-v', action='store_true', help='Keep INFO logging on the console')
+
+    args = parser.parse_args()
+
+    # Keep everything the run writes out of the real data and log directories.
+    # Set through the environment before config is imported, so spawned scrape
+    # workers pick up the same directories and driver
+    work_dir = Path(tempfile.mkdtemp(prefix='scraper_soak_'))
+    os.environ['SCRAPER_DATA_DIR'] = str(work_dir / "data")
+    os.environ['SCRAPER_LOGS_DIR'] = str(work_dir / "logs")
+    os.environ['SCRAPER_HEADLESS'] = '1'
+    if args.driver == 'stub':
+        os.environ['SCRAPER_DRIVER_PROVIDER'] = f"{Path(__file__).stem}:StubDriverProvider"
+        os.environ['SCRAPER_PAGE_SETTLE_TIME'] = '0'
+
+    server = start_fixture_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/vegetables"
+    modes = ['in_process', 'process_pool'] if args.mode == 'both' else [args.mode]
+    print(f"Soak testing in {work_dir}")
+
+    failures = []
+    output = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull  # save_data() prints a summary every run
+        try:
+            for mode in modes:
+                failures += run_soak(mode, args, url, output)
+        finally:
+            sys.stdout = output
+    server.shutdown()
+
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nPASSED: every mode fired its runs without unbounded growth")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Start local Selenium standalone servers to stand in for a remote browser pool
+Usage: python scripts/start_local_grid.py [--count N] [--base-port 4444] [--jar PATH]
+
+Each server listens on its own consecutive port. Point the scraper at them with
+the SCRAPER_REMOTE_WEBDRIVER line printed once they are ready. Needs Java and
+the Selenium server jar (https://www.selenium.dev/downloads/).
+"""
+
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import urllib.request
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+
+def is_ready(url):
+    try:
+        with urllib.request.urlopen(f"{url}/status", timeout=2) as response:
+            return bool(json.load(response).get('value', {}).get('ready'))
+    except Exception:
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Start local Selenium standalone servers')
+    parser.add_argument('--count', '-n', type=int, default=2, help='Number of servers')
+    parser.add_argument('--base-port', '-p', type=int, default=4444, help='Port of the first server')
+    parser.add_argument('--max-sessions', type=int, default=config.REMOTE_MAX_SESSIONS,
+                       help='Browser sessions per server')
+    parser.add_argument('--jar', default=config.SELENIUM_SERVER_JAR,
+                       help='Selenium server jar (default: $SELENIUM_SERVER_JAR)')
+    parser.add_argument('--startup-timeout', type=int, default=60,
+                       help='Seconds to wait for the servers to become ready')
+
+    args = parser.parse_args()
+
+    if not shutil.which('java'):
+        print("Java is required to run the Selenium server")
+        return 1
+    if not Path(args.jar).exists():
+        print(f"Selenium server jar not found at {args.jar}; set SELENIUM_SERVER_JAR or pass --jar")
+        return 1
+
+    servers = []
+    log_dir = config.LOGS_DIR / "selenium"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        for port in range(args.base_port, args.base_port + args.count):
+            log_file = open(log_dir / f"standalone_{port}.log", 'a')
+            process = subprocess.Popen(
+                ['java', '-jar', args.jar, 'standalone',
+                 '--port', str(port), '--max-sessions', str(args.max_sessions)],
+                stdout=log_file, stderr=subprocess.STDOUT
+            )
+            servers.append((f"http://127.0.0.1:{port}", process, log_file))
+            print(f"Started Selenium standalone on port {port} (PID: {process.pid})")
+
+        deadline = time.monotonic() + args.startup_timeout
+        pending = [url for url, _, _ in servers]
+        while pending and time.monotonic() < deadline:
+            for url, process, _ in servers:
+                if url in pending and process.poll() is not None:
+                    print(f"Server {url} exited with code {process.returncode}; see {log_dir}")
+                    return 1
+            pending = [url for url in pending if not is_ready(url)]
+            if pending:
+                time.sleep(1)
+        if pending:
+            print(f"Not ready after {args.startup_timeout}s: {', '.join(pending)}")
+            return 1
+
+        print("\nAll servers ready. Run the scraper or scheduler with:")
+        print(f"  SCRAPER_REMOTE_WEBDRIVER={','.join(url for url, _, _ in servers)}")
+        print("Press Ctrl+C to stop the servers")
+        while all(process.poll() is None for _, process, _ in servers):
+            time.sleep(1)
+        print("A server exited; stopping the rest")
+        return 1
+    except KeyboardInterrupt:
+        print("\nStopping servers...")
+        return 0
+    finally:
+        for _, process, log_file in servers:
+            if process.poll() is None:
+                process.terminate()
+        for _, process, log_file in servers:
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            log_file.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Start the vegetable price scheduler
-Usage: python scripts/start_scheduler.py [--schedule SCHEDULE_TYPE]
+Usage: python scripts/start_scheduler.py [--schedule SCHEDULE_TYPE | --jobs]
 """
 
 import sys
@@ -21,15 +21,22 @@ def main():
                        choices=list(get_config().SCHEDULES.keys()),
                        default='daily_morning',
                        help='Schedule type to use')
+    parser.add_argument('--jobs', '-j',
+                       action='store_true',
+                       help='Run every named job from SchedulerConfig.JOBS')
     parser.add_argument('--background', '-b',
                        action='store_true',
                        help='Run in background (daemon mode)')
     
     args = parser.parse_args()
     
-    print(f"Starting vegetable price scheduler with schedule: {args.schedule}")
-    
-    scheduler = VegetablePriceScheduler(args.schedule)
+    if args.jobs:
+        jobs = get_config().JOBS
+        print(f"Starting vegetable price scheduler with jobs: {', '.join(job['name'] for job in jobs)}")
+        scheduler = VegetablePriceScheduler(jobs=jobs)
+    else:
+        print(f"Starting vegetable price scheduler with schedule: {args.schedule}")
+        scheduler = VegetablePriceScheduler(args.schedule)
     
     if args.background:
         # TODO: Implement daemon mode for background running
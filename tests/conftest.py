@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Make the top-level modules importable, as the scripts do
+sys.path.insert(0, str(Path(__file__).parent.parent))
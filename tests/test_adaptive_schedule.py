@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from adaptive_schedule import AdaptiveSchedule, AdaptiveTrigger
+
+CONFIG = {'min_interval_minutes': 15, 'max_interval_minutes': 240, 'offset_minutes': 5}
+
+
+def snapshot(price):
+    return {'vegetables_price_data': [
+        {'vegetable_id': 1, 'vegetable_name': 'Tomato Big', 'average_price': price},
+    ]}
+
+
+def make_schedule(tmp_path, **overrides):
+    return AdaptiveSchedule({**CONFIG, **overrides}, tmp_path / "adaptive_state.json")
+
+
+def test_bin_minutes_must_divide_a_day(tmp_path):
+    for bin_minutes in (7, 0, -15, 12.5):
+        with pytest.raises(ValueError):
+            make_schedule(tmp_path, bin_minutes=bin_minutes)
+    assert len(make_schedule(tmp_path, bin_minutes=90).state['counts']) == 16
+
+
+def test_price_change_spreads_over_the_bins_since_the_last_check(tmp_path):
+    schedule = make_schedule(tmp_path)
+    start = datetime(2026, 10, 19, 9, 0)
+    schedule.observe(snapshot(100), start)
+    schedule.observe(snapshot(100), start + timedelta(minutes=15))
+    assert schedule.state['observations'] == 0
+    assert schedule.state['quiet_checks'] == 2
+
+    schedule.observe(snapshot(120), start + timedelta(minutes=45))
+    counts = schedule.state['counts']
+    # 09:15, 09:30 and 09:45 each get a third of the update
+    assert [round(counts[index], 3) for index in (37, 38, 39)] == [0.333, 0.333, 0.333]
+    assert round(sum(counts), 6) == 1.0
+    assert schedule.state['observations'] == 1
+    assert schedule.state['quiet_checks'] == 0
+
+    # The state survives a restart
+    assert make_schedule(tmp_path).state['counts'] == counts
+
+
+def test_last_bin_of_the_day_is_in_range(tmp_path):
+    schedule = make_schedule(tmp_path, bin_minutes=90)
+    schedule.observe(snapshot(100), datetime(2026, 10, 19, 23, 0))
+    schedule.observe(snapshot(110), datetime(2026, 10, 19, 23, 59))
+    assert schedule.state['counts'][-1] == 1.0
+
+
+def test_quiet_checks_back_off_up_to_max_interval(tmp_path):
+    schedule = make_schedule(tmp_path)
+    now = datetime(2026, 10, 19, 12, 0)
+    expected = [15, 30, 60, 120, 240, 240, 240]
+    for quiet_checks, minutes in enumerate(expected):
+        schedule.state['quiet_checks'] = quiet_checks
+        assert schedule.next_run_after(now) == now + timedelta(minutes=minutes)
+    schedule.state['quiet_checks'] = 1000
+    assert schedule.next_run_after(now) == now + timedelta(minutes=240)
+
+
+def test_likely_update_bin_is_checked_just_after_it(tmp_path):
+    schedule = make_schedule(tmp_path, min_observations=1)
+    schedule.state['counts'][13 * 4] = 5.0  # 13:00-13:15
+    schedule.state['observations'] = 5
+    schedule.state['quiet_checks'] = 10
+    now = datetime(2026, 10, 19, 12, 0)
+    assert schedule.next_run_after(now) == datetime(2026, 10, 19, 13, 20)
+
+
+def test_clamp_to_window(tmp_path):
+    schedule = make_schedule(tmp_path, start_time='06:00', end_time='20:00')
+    day = datetime(2026, 10, 19)
+    assert schedule.clamp_to_window(day.replace(hour=12)) == day.replace(hour=12)
+    assert schedule.clamp_to_window(day.replace(hour=20)) == day.replace(hour=20)
+    assert schedule.clamp_to_window(day.replace(hour=5)) == day.replace(hour=6)
+    assert schedule.clamp_to_window(day.replace(hour=21)) == day.replace(hour=6) + timedelta(days=1)
+
+    overnight = make_schedule(tmp_path, start_time='22:00', end_time='04:00')
+    assert overnight.clamp_to_window(day.replace(hour=2)) == day.replace(hour=2)
+    assert overnight.clamp_to_window(day.replace(hour=12)) == day.replace(hour=22)
+
+
+def test_trigger_fires_in_its_timezone(tmp_path):
+    timezone = pytz.timezone('Asia/Kathmandu')
+    trigger = AdaptiveTrigger(make_schedule(tmp_path, start_time='06:00', end_time='20:00'), timezone)
+    now = timezone.localize(datetime(2026, 10, 19, 19, 50))
+    fire_time = trigger.get_next_fire_time(None, now)
+    assert fire_time == timezone.localize(datetime(2026, 10, 20, 6, 0))
+    assert fire_time.utcoffset() == timedelta(hours=5, minutes=45)
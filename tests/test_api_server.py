@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+import config
+from api_server import LRUCache, PriceReadAPI
+
+
+def test_put_with_a_stale_generation_is_dropped():
+    cache = LRUCache()
+    generation = cache.generation
+    cache.put('/prices/latest', 'old')
+    # A snapshot lands while a response is being computed from the old data
+    cache.invalidate()
+    assert cache.get('/prices/latest') is None
+    assert cache.put('/prices/latest', 'stale', generation) is False
+    assert cache.get('/prices/latest') is None
+    assert cache.put('/prices/latest', 'fresh', cache.generation) is True
+    assert cache.get('/prices/latest') == 'fresh'
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'DATA_DIR', tmp_path)
+    api = PriceReadAPI()
+    for hour, price in enumerate((10, 20, 30)):
+        api.on_snapshot_saved({
+            'scrape_timestamp': f"2026-10-19T{hour + 9:02d}:00:00",
+            'source': config.SOURCE,
+            'vegetables_price_data': [{
+                'vegetable_id': 1, 'vegetable_name': 'Tomato Big',
+                'min_price': price, 'max_price': price, 'average_price': price,
+            }],
+        })
+    return api
+
+
+def test_history_limit_returns_the_last_points(api):
+    status, body = api.respond('/prices/history/1?limit=2')
+    assert status == 200
+    assert [point['average_price'] for point in json.loads(body)['history']] == [20, 30]
+    status, body = api.respond('/prices/history/1?limit=0')
+    assert len(json.loads(body)['history']) == 3
+
+
+@pytest.mark.parametrize('limit', ['-1', 'ten', '1.5'])
+def test_invalid_history_limit_is_a_bad_request(api, limit):
+    status, body = api.respond(f'/prices/history/1?limit={limit}')
+    assert status == 400
+    assert 'limit' in json.loads(body)['error']
@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from change_feed import ChangeFeedPublisher, ChangeFeedSSEServer
+
+
+def snapshot(price):
+    return {
+        'scrape_timestamp': '2026-10-19T09:00:00',
+        'source': 'nepalipatro',
+        'vegetables_price_data': [
+            {'vegetable_id': 1, 'vegetable_name': 'Tomato Big', 'average_price': price},
+            {'vegetable_id': 2, 'vegetable_name': 'Potato Red', 'average_price': price + 1},
+        ],
+    }
+
+
+def feed_seqs(publisher):
+    with open(publisher.feed_file, encoding='utf-8') as f:
+        return [json.loads(line)['seq'] for line in f]
+
+
+def test_torn_trailing_event_is_truncated(tmp_path):
+    publisher = ChangeFeedPublisher(tmp_path)
+    publisher.on_snapshot_saved(snapshot(10))
+    intact = publisher.feed_file.read_bytes()
+    with open(publisher.feed_file, 'ab') as f:
+        f.write(b'{"seq": 3, "source": "nepal')
+
+    publisher = ChangeFeedPublisher(tmp_path)
+    assert publisher.feed_file.read_bytes() == intact
+    assert publisher.feed_size == len(intact)
+    publisher.on_snapshot_saved(snapshot(20))
+    assert feed_seqs(publisher) == [1, 2, 3, 4]
+
+
+def test_state_behind_the_feed_is_replayed_without_reusing_seq(tmp_path):
+    publisher = ChangeFeedPublisher(tmp_path)
+    publisher.on_snapshot_saved(snapshot(10))
+    stale_state = publisher.state_file.read_text()
+    # Crash after appending the feed but before writing the state
+    publisher.on_snapshot_saved(snapshot(20))
+    publisher.state_file.write_text(stale_state)
+
+    publisher = ChangeFeedPublisher(tmp_path)
+    assert publisher.state['seq'] == 4
+    assert publisher.state['last_prices'] == {'nepalipatro|1': 20, 'nepalipatro|2': 21}
+    assert publisher.state['feed_offset'] == publisher.feed_size
+    publisher.on_snapshot_saved(snapshot(20))  # Unchanged since the replayed events
+    publisher.on_snapshot_saved(snapshot(30))
+    assert feed_seqs(publisher) == [1, 2, 3, 4, 5, 6]
+
+
+def test_wait_for_events_sees_events_published_before_it_waits(tmp_path):
+    publisher = ChangeFeedPublisher(tmp_path)
+    offset = publisher.feed_size
+    publisher.on_snapshot_saved(snapshot(10))
+    started = time.monotonic()
+    assert publisher.wait_for_events(offset, 5)
+    assert time.monotonic() - started < 1
+
+    assert not publisher.wait_for_events(publisher.feed_size, 0.2)
+
+
+def test_wait_for_events_returns_when_stopped(tmp_path):
+    publisher = ChangeFeedPublisher(tmp_path)
+    stop_event = threading.Event()
+
+    def stop():
+        stop_event.set()
+        with publisher.new_events:
+            publisher.new_events.notify_all()
+
+    threading.Timer(0.1, stop).start()
+    started = time.monotonic()
+    assert publisher.wait_for_events(publisher.feed_size, 5, stop_event)
+    assert time.monotonic() - started < 2
+
+
+@pytest.fixture
+def sse_url(tmp_path):
+    publisher = ChangeFeedPublisher(tmp_path)
+    publisher.on_snapshot_saved(snapshot(10))
+    server = ChangeFeedSSEServer(publisher, port=0)
+    server.start()
+    yield f"http://127.0.0.1:{server.server.server_address[1]}/events", publisher
+    server.stop()
+
+
+@pytest.mark.parametrize('last_event_id', ['7', '-1', '100000', 'abc'])
+def test_resume_from_a_non_boundary_is_a_bad_request(sse_url, last_event_id):
+    url, _ = sse_url
+    request = urllib.request.Request(url, headers={'Last-Event-ID': last_event_id})
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(request, timeout=5)
+    assert error.value.code == 400
+
+
+def test_resume_from_an_event_boundary_streams_the_next_event(sse_url):
+    url, publisher = sse_url
+    with open(publisher.feed_file, 'rb') as f:
+        first_event_end = len(f.readline())
+    request = urllib.request.Request(url, headers={'Last-Event-ID': str(first_event_end)})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        assert response.status == 200
+        assert response.readline() == f"id: {publisher.feed_size}\n".encode()
+        event = json.loads(response.readline().decode().removeprefix('data: '))
+    assert event['seq'] == 2
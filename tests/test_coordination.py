@@ -0,0 +1,125 @@
+import multiprocessing
+import time
+
+from coordination import LeaderElector, LeaseManager
+from scripts.lease_demo import contend
+
+TTL = 1.0
+RENEW_INTERVAL = 0.2
+
+
+def read_ticks(path):
+    if not path.exists():
+        return []
+    ticks = []
+    for line in path.read_text().splitlines():
+        node_id, moment = line.split()
+        ticks.append((float(moment), node_id))
+    return sorted(ticks)
+
+
+def wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(0.05)
+    return None
+
+
+def test_follower_times_out_the_holder_on_its_own_clock(tmp_path):
+    lease_file = tmp_path / "leases.db"
+    leader = LeaseManager(lease_file, node_id='leader')
+    follower = LeaseManager(lease_file, node_id='follower')
+    assert leader.acquire('lead', TTL)
+    # Renewals reset the follower's timer, whatever the holder's wall clock says
+    assert not follower.acquire('lead', TTL)
+    time.sleep(TTL / 2)
+    assert leader.acquire('lead', TTL)
+    assert not follower.acquire('lead', TTL)
+    time.sleep(TTL + 0.1)
+    assert follower.acquire('lead', TTL)
+    assert follower.token('lead') > leader.token('lead')
+    assert not leader.acquire('lead', TTL)
+
+
+def test_release_hands_over_immediately(tmp_path):
+    lease_file = tmp_path / "leases.db"
+    first = LeaseManager(lease_file, node_id='first')
+    second = LeaseManager(lease_file, node_id='second')
+    assert first.acquire('lead', TTL)
+    first.release('lead')
+    assert second.acquire('lead', TTL)
+
+
+def test_fencing_token_holds_for_a_term_and_changes_with_the_leader(tmp_path):
+    lease_file = tmp_path / "leases.db"
+    first = LeaderElector(LeaseManager(lease_file, node_id='first'), ttl=TTL)
+    second = LeaderElector(LeaseManager(lease_file, node_id='second'), ttl=TTL)
+    first._try_acquire()
+    token = first.fencing_token()
+    assert token is not None
+    # Renewals bump the lease version but stay in the same term
+    first._try_acquire()
+    assert first.fencing_token() == token
+    second._try_acquire()
+    assert second.fencing_token() is None
+
+    time.sleep(TTL + 0.1)
+    assert first.fencing_token() is None  # Lapsed without renewing
+    second._try_acquire()
+    assert second.fencing_token() > token
+    first._try_acquire()
+    assert first.fencing_token() is None
+
+
+def test_killed_leader_is_replaced_by_exactly_one_node_within_the_ttl(tmp_path):
+    lease_file = tmp_path / "leases.db"
+    ticks_file = tmp_path / "ticks.log"
+    context = multiprocessing.get_context('spawn')
+    # Wall clocks hours apart must not let anyone take over early
+    skews = {'node-0': 0.0, 'node-1': 3600.0, 'node-2': -3600.0}
+    processes = {
+        node_id: context.Process(
+            target=contend,
+            args=(str(lease_file), TTL),
+            kwargs={'node_id': node_id, 'ticks_file': str(ticks_file),
+                    'clock_skew': skew, 'renew_interval': RENEW_INTERVAL},
+            daemon=True
+        )
+        for node_id, skew in skews.items()
+    }
+    try:
+        for process in processes.values():
+            process.start()
+
+        ticks = wait_for(lambda: read_ticks(ticks_file), timeout=20)
+        assert ticks, "no node became leader"
+        time.sleep(1.5)
+        leaders = {node_id for _, node_id in read_ticks(ticks_file)}
+        assert len(leaders) == 1
+        leader = leaders.pop()
+
+        processes[leader].kill()
+        processes[leader].join()
+        killed_at = time.monotonic()
+
+        def successor_ticks():
+            return [tick for tick in read_ticks(ticks_file) if tick[1] != leader]
+        assert wait_for(successor_ticks, timeout=TTL * 5), "no node took over"
+        time.sleep(1.0)
+    finally:
+        for process in processes.values():
+            process.kill()
+            process.join()
+
+    ticks = read_ticks(ticks_file)
+    last_leader_tick = max(moment for moment, node_id in ticks if node_id == leader)
+    successor_ticks = [(moment, node_id) for moment, node_id in ticks if node_id != leader]
+    # Exactly one node at a time: the successor only starts after the old leader's last tick...
+    assert successor_ticks[0][0] > last_leader_tick
+    # ...and it is the only node ticking from then on
+    assert len({node_id for _, node_id in successor_ticks}) == 1
+    # Takeover within the TTL, plus one renewal interval for the follower to poll
+    assert successor_ticks[0][0] - killed_at < TTL + RENEW_INTERVAL + 0.5
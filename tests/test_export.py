@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from export import iter_history, iter_rows
+
+NAMES = ['गोलभेडा ठूलो (नेपाली)', 'आलु रातो', 'Tomato Big(Nepali)', 'च्याउ (कन्य)']
+
+
+def make_history(count):
+    start = datetime(2026, 10, 19, 8, 0)
+    return [
+        {
+            'scrape_timestamp': (start + timedelta(hours=i)).isoformat(),
+            'source': 'nepalipatro',
+            'vegetables_count': len(NAMES),
+            'vegetables_price_data': [
+                {'vegetable_id': j + 1, 'vegetable_name': name,
+                 'min_price': 10.0 * i, 'max_price': 10.0 * i + 5, 'average_price': 10.0 * i + 2.5}
+                for j, name in enumerate(NAMES)
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 4096])
+def test_iter_history_reads_multibyte_text_across_chunk_boundaries(tmp_path, chunk_size):
+    history = make_history(5)
+    path = tmp_path / "history.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2, ensure_ascii=False)
+    assert list(iter_history(path, chunk_size=chunk_size)) == history
+
+
+def test_iter_history_of_an_empty_array(tmp_path):
+    path = tmp_path / "history.json"
+    path.write_text("[]", encoding='utf-8')
+    assert list(iter_history(path, chunk_size=1)) == []
+
+
+def test_iter_history_rejects_a_truncated_file(tmp_path):
+    path = tmp_path / "history.json"
+    path.write_text(json.dumps(make_history(2), ensure_ascii=False)[:-40], encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iter_history(path, chunk_size=16))
+
+
+def test_aware_bounds_are_compared_in_local_time():
+    history = make_history(4)  # 08:00 to 11:00 local
+    local = datetime(2026, 10, 19, 9, 0).astimezone()
+    start = local.astimezone(timezone(timedelta(hours=-3)))  # Same instant, another zone
+    rows = list(iter_rows(history, start=start, end=datetime(2026, 10, 19, 11, 0)))
+    assert sorted({row['scrape_timestamp'] for row in rows}) == [
+        '2026-10-19T09:00:00', '2026-10-19T10:00:00',
+    ]
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+import scraper
+from scraper import append_history_entry
+
+ENTRIES = [
+    {'scrape_timestamp': '2026-10-19T09:00:00', 'vegetables_price_data': [{'vegetable_name': 'गोलभेडा ठूलो', 'average_price': 45}]},
+    {'scrape_timestamp': '2026-10-19T15:00:00', 'vegetables_price_data': []},
+    {'scrape_timestamp': '2026-10-20T09:00:00', 'total_vegetables_found': 0},
+]
+
+
+def dumped(entries):
+    return json.dumps(entries, indent=2, ensure_ascii=False)
+
+
+def test_append_to_a_missing_file(tmp_path):
+    path = tmp_path / "history.json"
+    append_history_entry(path, ENTRIES[0])
+    assert path.read_text(encoding='utf-8') == dumped(ENTRIES[:1])
+
+
+def test_append_to_an_empty_array(tmp_path):
+    path = tmp_path / "history.json"
+    path.write_text("[]\n", encoding='utf-8')
+    append_history_entry(path, ENTRIES[0])
+    assert path.read_text(encoding='utf-8') == dumped(ENTRIES[:1])
+
+
+@pytest.mark.parametrize('tail_size', [4096, 8])
+def test_append_to_a_non_empty_file(tmp_path, tail_size):
+    path = tmp_path / "history.json"
+    path.write_text(dumped(ENTRIES[:1]) + "\n", encoding='utf-8')
+    for entry in ENTRIES[1:]:
+        append_history_entry(path, entry, tail_size=tail_size)
+    assert path.read_text(encoding='utf-8') == dumped(ENTRIES)
+    assert json.loads(path.read_text(encoding='utf-8')) == ENTRIES
+
+
+def test_file_that_is_not_an_array_is_left_alone(tmp_path):
+    path = tmp_path / "history.json"
+    path.write_text('{"not": "an array"}', encoding='utf-8')
+    with pytest.raises(ValueError):
+        append_history_entry(path, ENTRIES[0])
+    assert path.read_text(encoding='utf-8') == '{"not": "an array"}'
+
+
+class FailingFile:
+    """Writes half of the first chunk it is given, then fails like a full disk"""
+
+    def __init__(self, f):
+        self.f = f
+        self.failed = False
+
+    def write(self, data):
+        if not self.failed:
+            self.failed = True
+            self.f.write(data[:len(data) // 2])
+            raise OSError(28, "No space left on device")
+        return self.f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.f.close()
+
+
+def test_failed_write_restores_the_original_bytes(tmp_path, monkeypatch):
+    path = tmp_path / "history.json"
+    path.write_text(dumped(ENTRIES[:2]) + "\n", encoding='utf-8')
+    original = path.read_bytes()
+
+    monkeypatch.setattr(scraper, 'open', lambda *args, **kwargs: FailingFile(open(*args, **kwargs)), raising=False)
+    with pytest.raises(OSError):
+        append_history_entry(path, ENTRIES[2])
+    assert path.read_bytes() == original
+
+    # The file is still a valid array that later appends extend
+    monkeypatch.undo()
+    append_history_entry(path, ENTRIES[2])
+    assert json.loads(path.read_text(encoding='utf-8')) == ENTRIES
@@ -0,0 +1,55 @@
+import numpy as np
+
+import price_matrix
+from price_matrix import PriceMatrix
+
+
+def test_grows_and_widens_and_reads_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_matrix, 'ROW_CHUNK', 4)
+    monkeypatch.setattr(price_matrix, 'INITIAL_COLUMNS', 2)
+    matrix = PriceMatrix('testsource', matrix_dir=tmp_path / "matrix")
+
+    expected = []
+    for row in range(10):
+        # One more vegetable every other row, so columns outgrow 2 and then 4
+        vegetable_ids = range(1, row // 2 + 2)
+        values = {vegetable_id: float(row * 100 + vegetable_id) for vegetable_id in vegetable_ids}
+        if row == 7:
+            del values[1]  # Not listed in this snapshot
+        matrix.append_row(f"2026-10-19T{row:02d}:00:00", values, {i: f"veg{i}" for i in values})
+        expected.append(values)
+
+    view = matrix.read()
+    index = matrix.load_index()
+    assert len(view) == 10
+    assert index['row_capacity'] == 12
+    assert index['column_capacity'] == 8
+    assert sorted(path.name for path in (tmp_path / "matrix").glob("prices_*.f64")) == ['prices_8.f64']
+    assert view.vegetable_ids == [1, 2, 3, 4, 5]
+    assert view.vegetable_names == [f"veg{i}" for i in range(1, 6)]
+    assert view.timestamps[3] == np.datetime64('2026-10-19T03:00:00')
+
+    for row, values in enumerate(expected):
+        for vegetable_id in view.vegetable_ids:
+            price = view.prices[row, view.columns[vegetable_id]]
+            if vegetable_id in values:
+                assert price == values[vegetable_id]
+            else:
+                assert np.isnan(price)
+
+    assert np.isnan(view.column(1)[7])
+    assert list(view.between('2026-10-19T02:00:00', '2026-10-19T04:00:00').column(2)) == [202.0, 302.0]
+
+
+def test_append_entry_reads_the_field(tmp_path):
+    matrix = PriceMatrix('testsource', matrix_dir=tmp_path / "matrix", field='max_price')
+    matrix.append_entry({
+        'scrape_timestamp': '2026-10-19T09:00:00',
+        'vegetables_price_data': [
+            {'vegetable_id': 7, 'vegetable_name': 'Tomato Big', 'min_price': 40, 'max_price': 50, 'average_price': 45},
+            {'vegetable_id': None, 'vegetable_name': 'Unknown', 'max_price': 10},
+        ],
+    })
+    view = matrix.read()
+    assert view.vegetable_ids == [7]
+    assert list(view.column(7)) == [50.0]
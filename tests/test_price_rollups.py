@@ -0,0 +1,81 @@
+import sqlite3
+
+import config
+from price_rollups import PriceRollups
+
+
+def snapshot(timestamp, low, high, average, source='nepalipatro'):
+    return {
+        'scrape_timestamp': timestamp,
+        'source': source,
+        'vegetables_price_data': [
+            {'vegetable_id': 1, 'vegetable_name': 'Tomato Big',
+             'min_price': low, 'max_price': high, 'average_price': average},
+        ],
+    }
+
+
+def rollup(rollups, period):
+    return {(row['source'], row['bucket']): row for row in rollups.query(period, vegetable_id=1)}
+
+
+def test_snapshots_fold_into_day_week_and_month(tmp_path):
+    rollups = PriceRollups(tmp_path / "rollups.db")
+    rollups.add_entry(snapshot('2026-10-31T09:00:00', 40, 60, 50))
+    rollups.add_entry(snapshot('2026-10-31T15:00:00', 30, 50, 40))
+    rollups.add_entry(snapshot('2026-11-01T09:00:00', 70, 90, 80))  # Same ISO week, next month
+    rollups.add_entry(snapshot('2026-10-31T12:00:00', 10, 20, 15, source='kalimati'))
+
+    day = rollup(rollups, 'day')[('nepalipatro', '2026-10-31')]
+    assert (day['min'], day['max'], day['mean'], day['count']) == (30, 60, 45, 2)
+    assert (day['first'], day['first_at'], day['last'], day['last_at']) == (
+        50, '2026-10-31T09:00:00', 40, '2026-10-31T15:00:00')
+
+    week = rollup(rollups, 'week')[('nepalipatro', '2026-W44')]
+    assert (week['min'], week['max'], week['count'], week['last']) == (30, 90, 3, 80)
+
+    months = rollup(rollups, 'month')
+    assert months[('nepalipatro', '2026-10')]['count'] == 2
+    assert months[('nepalipatro', '2026-11')]['count'] == 1
+    assert months[('kalimati', '2026-10')]['mean'] == 15
+
+
+def test_saving_a_snapshot_again_does_not_count_it_twice(tmp_path):
+    rollups = PriceRollups(tmp_path / "rollups.db")
+    first = snapshot('2026-10-19T09:00:00', 40, 60, 50)
+    second = snapshot('2026-10-19T15:00:00', 30, 70, 40)
+    for entry in (first, second, second, first):
+        rollups.add_entry(entry)
+    for period, bucket in (('day', '2026-10-19'), ('week', '2026-W43'), ('month', '2026-10')):
+        row = rollup(rollups, period)[('nepalipatro', bucket)]
+        assert (row['min'], row['max'], row['mean'], row['count']) == (30, 70, 45, 2)
+        assert (row['first'], row['last']) == (50, 40)
+
+
+def test_table_without_source_is_migrated(tmp_path):
+    path = tmp_path / "rollups.db"
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+        CREATE TABLE rollups (
+            period TEXT NOT NULL, bucket TEXT NOT NULL, vegetable_id INTEGER NOT NULL,
+            min REAL NOT NULL, max REAL NOT NULL, sum REAL NOT NULL, count INTEGER NOT NULL,
+            first REAL NOT NULL, first_at TEXT NOT NULL, last REAL NOT NULL, last_at TEXT NOT NULL,
+            PRIMARY KEY (period, vegetable_id, bucket)
+        ) WITHOUT ROWID;
+        INSERT INTO rollups VALUES
+            ('day', '2026-10-19', 1, 40, 60, 100, 2, 50, '2026-10-19T09:00:00', 50, '2026-10-19T12:00:00');
+    """)
+    conn.close()
+
+    rollups = PriceRollups(path)
+    row = rollup(rollups, 'day')[(config.SOURCE, '2026-10-19')]
+    assert (row['mean'], row['count']) == (50, 2)
+
+    # Migrated rows keep aggregating under the default source
+    rollups.add_entry(snapshot('2026-10-19T15:00:00', 20, 30, 25, source=config.SOURCE))
+    row = rollup(rollups, 'day')[(config.SOURCE, '2026-10-19')]
+    assert (row['min'], row['count'], row['last']) == (20, 3, 25)
+    rollups.close()
+
+    # Opening it again leaves the migrated table alone
+    assert len(PriceRollups(path).query('day')) == 1
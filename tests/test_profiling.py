@@ -0,0 +1,52 @@
+import config
+import profiling
+from profiling import RunProfiler
+
+
+def configure(monkeypatch, tmp_path, **settings):
+    monkeypatch.setattr(config, 'PROFILE_DIR', tmp_path / "profiles")
+    monkeypatch.setattr(config, 'PROFILE_CONTROL_FILE', tmp_path / "profiling_control.json")
+    profiling.save_settings(settings)
+
+
+def saved_profiles(tmp_path, name):
+    return sorted(path.name for path in (tmp_path / "profiles").glob(f"*_{name}.prof"))
+
+
+def test_nested_runs_follow_the_outer_decision(monkeypatch, tmp_path):
+    configure(monkeypatch, tmp_path, enabled=True, every_n=5, threshold=None)
+    job, inner = RunProfiler('job'), RunProfiler('inner')
+    for run in range(1, 21):
+        with job.profile(f"run{run:02d}"):
+            with inner.profile(f"run{run:02d}"):
+                pass
+    assert saved_profiles(tmp_path, 'job') == ['run05_job.prof', 'run10_job.prof',
+                                               'run15_job.prof', 'run20_job.prof']
+    assert saved_profiles(tmp_path, 'inner') == []
+    assert inner.runs == 0
+
+
+def test_decision_made_elsewhere_is_followed(monkeypatch, tmp_path):
+    configure(monkeypatch, tmp_path, enabled=True, every_n=3, threshold=None)
+    parent = RunProfiler('parent')
+    for run in range(1, 7):
+        # A fresh worker each time, as after recycling; only the parent counts
+        with RunProfiler('worker').profile_as(f"run{run}", parent.decide()):
+            pass
+    assert saved_profiles(tmp_path, 'worker') == ['run3_worker.prof', 'run6_worker.prof']
+
+
+def test_malformed_settings_fall_back(monkeypatch, tmp_path, caplog):
+    monkeypatch.setenv('SCRAPER_PROFILE_EVERY', 'often')
+    monkeypatch.setenv('SCRAPER_PROFILE_THRESHOLD', 'slow')
+    profiling.env_settings.cache_clear()
+    try:
+        configure(monkeypatch, tmp_path, enabled=True, every_n=-1, threshold='2')
+        settings = profiling.load_settings()
+    finally:
+        profiling.env_settings.cache_clear()
+    assert settings['every_n'] == config.PROFILE_EVERY_N
+    assert settings['threshold'] == config.PROFILE_THRESHOLD
+    assert settings['enabled'] is True
+    assert 'SCRAPER_PROFILE_EVERY' in caplog.text
+    assert 'every_n=-1' in caplog.text
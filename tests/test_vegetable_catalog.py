@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from vegetable_catalog import VegetableCatalog, normalize_name
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = VegetableCatalog(tmp_path / "catalog.db")
+    yield catalog
+    catalog.close()
+
+
+@pytest.mark.parametrize('names', [
+    ['Tomato Big(Nepali)', 'गोलभेडा ठूलो(नेपाली)', 'टमाटर ठूलो', 'Tomato Big'],
+    ['Cauli Local', 'Cauli(Local)', 'काउली स्थानिय'],
+    ['Garlic Dry Chinese', 'लसुन सुकेको चाइनिज'],
+    ['Onion Dry (Indian)', 'प्याज सुकेको (भारतीय)'],
+    ['Cow pea(Long)', 'बोडी(तने)'],
+])
+def test_english_and_nepali_names_share_an_id(catalog, names):
+    ids = {catalog.get_id(name) for name in names}
+    assert len(ids) == 1
+    assert catalog.get_name(ids.pop()) == names[0]
+
+
+def test_grades_other_than_the_default_stay_apart(catalog):
+    assert catalog.get_id('Tomato Small(Local)') != catalog.get_id('Tomato Small(Tunnel)')
+    assert catalog.get_id('Garlic Dry Nepali') != catalog.get_id('Garlic Dry Chinese')
+
+
+def test_units_are_not_part_of_the_key():
+    assert normalize_name('Potato Red /kg').canonical_key == normalize_name('आलु रातो').canonical_key
+
+
+def test_keys_from_older_rules_are_migrated(tmp_path):
+    path = tmp_path / "catalog.db"
+    VegetableCatalog(path).close()
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO vegetables (canonical_key, name) VALUES ('tomato big|nepali', 'Tomato Big(Nepali)')")
+        conn.execute("INSERT INTO vegetables (canonical_key, name) VALUES ('cauli', 'Cauli(Local)')")
+        conn.execute("INSERT INTO vegetables (canonical_key, name) VALUES ('cauli local', 'Cauli Local')")
+        conn.execute("INSERT INTO aliases VALUES ('Cauli Local', 3)")
+
+    catalog = VegetableCatalog(path)
+    try:
+        assert catalog.get_id('गोलभेडा ठूलो(नेपाली)') == 1
+        assert catalog.get_id('Cauli Local') == 2
+    finally:
+        catalog.close()
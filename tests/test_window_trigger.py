@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from window_trigger import WindowedIntervalTrigger
+
+TIMEZONE = pytz.timezone('Asia/Kathmandu')
+
+
+def fire_times(trigger, start, count):
+    """The first `count` fire times at or after `start`, as naive local times"""
+    now = TIMEZONE.localize(start)
+    times = []
+    previous = None
+    for _ in range(count):
+        previous = trigger.get_next_fire_time(previous, now)
+        times.append(previous.replace(tzinfo=None))
+        now = previous
+    return times
+
+
+def trigger(start_time, end_time, **interval):
+    return WindowedIntervalTrigger(timedelta(**interval), start_time, end_time, TIMEZONE)
+
+
+def test_interval_not_dividing_an_hour_keeps_its_spacing():
+    times = fire_times(trigger('08:00', '10:00', minutes=45), datetime(2026, 1, 5, 7, 0), 4)
+    assert times == [
+        datetime(2026, 1, 5, 8, 0),
+        datetime(2026, 1, 5, 8, 45),
+        datetime(2026, 1, 5, 9, 30),
+        datetime(2026, 1, 6, 8, 0),
+    ]
+
+
+def test_interval_longer_than_an_hour():
+    times = fire_times(trigger('08:00', '12:00', minutes=90), datetime(2026, 1, 5, 7, 0), 4)
+    assert times == [
+        datetime(2026, 1, 5, 8, 0),
+        datetime(2026, 1, 5, 9, 30),
+        datetime(2026, 1, 5, 11, 0),
+        datetime(2026, 1, 6, 8, 0),
+    ]
+
+
+def test_overnight_window():
+    times = fire_times(trigger('22:00', '06:00', hours=3), datetime(2026, 1, 5, 12, 0), 4)
+    assert times == [
+        datetime(2026, 1, 5, 22, 0),
+        datetime(2026, 1, 6, 1, 0),
+        datetime(2026, 1, 6, 4, 0),
+        datetime(2026, 1, 6, 22, 0),
+    ]
+
+
+def test_overnight_window_entered_after_midnight():
+    times = fire_times(trigger('22:00', '06:00', hours=3), datetime(2026, 1, 6, 2, 0), 2)
+    assert times == [datetime(2026, 1, 6, 4, 0), datetime(2026, 1, 6, 22, 0)]
+
+
+def test_hours_and_minutes_combine():
+    times = fire_times(trigger('08:00', '12:00', hours=1, minutes=30), datetime(2026, 1, 5, 7, 0), 3)
+    assert times == [
+        datetime(2026, 1, 5, 8, 0),
+        datetime(2026, 1, 5, 9, 30),
+        datetime(2026, 1, 5, 11, 0),
+    ]
+
+
+def test_window_starting_mid_hour_never_fires_before_start():
+    times = fire_times(trigger('08:30', '09:30', minutes=15), datetime(2026, 1, 5, 7, 0), 6)
+    assert times == [
+        datetime(2026, 1, 5, 8, 30),
+        datetime(2026, 1, 5, 8, 45),
+        datetime(2026, 1, 5, 9, 0),
+        datetime(2026, 1, 5, 9, 15),
+        datetime(2026, 1, 5, 9, 30),
+        datetime(2026, 1, 6, 8, 30),
+    ]
+
+
+def test_resumes_on_the_window_grid_after_a_gap():
+    now = TIMEZONE.localize(datetime(2026, 1, 5, 9, 10))
+    next_time = trigger('08:00', '10:00', minutes=45).get_next_fire_time(None, now)
+    assert next_time.replace(tzinfo=None) == datetime(2026, 1, 5, 9, 30)
+
+
+@pytest.mark.parametrize('start_time, end_time, interval', [
+    ('08:00', '18:00', {'minutes': 0}),
+    ('08:00', '08:00', {'hours': 1}),
+])
+def test_rejects_unusable_configs(start_time, end_time, interval):
+    with pytest.raises(ValueError):
+        trigger(start_time, end_time, **interval)
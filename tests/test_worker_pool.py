@@ -0,0 +1,72 @@
+import time
+
+import psutil
+import pytest
+
+from scripts.soak_test import start_fixture_server
+from worker_pool import ScrapeTimeoutError, ScrapeWorkerPool
+
+
+@pytest.fixture
+def worker_env(tmp_path, monkeypatch):
+    """Point spawned workers at temporary directories and the stub driver"""
+    monkeypatch.setenv('SCRAPER_DATA_DIR', str(tmp_path / "data"))
+    monkeypatch.setenv('SCRAPER_LOGS_DIR', str(tmp_path / "logs"))
+    monkeypatch.setenv('SCRAPER_PAGE_SETTLE_TIME', '0')
+    monkeypatch.setenv('SCRAPER_DRIVER_PROVIDER', 'scripts.soak_test:StubDriverProvider')
+    return monkeypatch
+
+
+@pytest.fixture
+def fixture_url():
+    server = start_fixture_server()
+    yield f"http://127.0.0.1:{server.server_address[1]}/vegetables"
+    server.shutdown()
+
+
+def is_gone(pid):
+    try:
+        return psutil.Process(pid).status() == psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return True
+
+
+def test_worker_is_recycled_after_max_jobs(worker_env, fixture_url):
+    pool = ScrapeWorkerPool(job_timeout=60, max_jobs_per_worker=2)
+    pids = []
+    processes = []
+    try:
+        for _ in range(5):
+            data, timings = pool.run_scrape(url=fixture_url, source='nepalipatro')
+            assert data and 'extract' in timings
+            pids.append(pool.process.pid)
+            if pool.process not in processes:
+                processes.append(pool.process)
+    finally:
+        pool.shutdown()
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+    assert len(set(pids)) == 3
+    assert not any(process.is_alive() for process in processes)
+
+
+def test_worker_past_its_deadline_is_killed_with_its_children_and_replaced(worker_env, fixture_url, tmp_path):
+    pid_file = tmp_path / "browser.pid"
+    worker_env.setenv('STUB_BROWSER_PID_FILE', str(pid_file))
+    worker_env.setenv('SCRAPER_DRIVER_PROVIDER', 'worker_stubs:HangingProvider')
+    pool = ScrapeWorkerPool(job_timeout=8, max_jobs_per_worker=10)
+    try:
+        started = time.monotonic()
+        with pytest.raises(ScrapeTimeoutError):
+            pool.run_scrape(url=fixture_url, source='nepalipatro')
+        assert time.monotonic() - started < 20
+        assert pool.process is None
+        browser_pid = int(pid_file.read_text())
+        assert is_gone(browser_pid)
+
+        # The next scrape gets a fresh worker
+        worker_env.setenv('SCRAPER_DRIVER_PROVIDER', 'scripts.soak_test:StubDriverProvider')
+        data, _ = pool.run_scrape(url=fixture_url, source='nepalipatro')
+        assert data
+        assert pool.process.is_alive()
+    finally:
+        pool.shutdown()
@@ -0,0 +1,21 @@
+"""Driver providers for worker pool tests, loaded in workers through SCRAPER_DRIVER_PROVIDER"""
+
+import os
+import subprocess
+import sys
+import time
+
+
+class HangingProvider:
+    """Starts a stand-in browser process, records its PID, then never returns a driver"""
+
+    name = 'hanging stub'
+
+    def acquire(self, chrome_options, profile=None):
+        browser = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(120)'])
+        with open(os.environ['STUB_BROWSER_PID_FILE'], 'w') as f:
+            f.write(str(browser.pid))
+        time.sleep(120)
+
+    def release(self, driver):
+        pass
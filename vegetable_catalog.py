@@ -0,0 +1,301 @@
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+import config
+
+NormalizedName = namedtuple('NormalizedName', ['canonical_key', 'name', 'unit', 'grade'])
+
+# Nepali names mapped to the English names used on the English page. Both the
+# site's own spellings and common variants are listed.
+NAME_ALIASES = {
+    'गोलभेडा ठूलो': 'tomato big',
+    'गोलभेडा सानो': 'tomato small',
+    'टमाटर ठूलो': 'tomato big',
+    'टमाटर सानो': 'tomato small',
+    'आलु रातो': 'potato red',
+    'आलु सेतो': 'potato white',
+    'प्याज सुकेको': 'onion dry',
+    'प्याज हरियो': 'onion green',
+    'गाजर': 'carrot',
+    'बन्दा': 'cabbage',
+    'काउली': 'cauli',
+    'मूला रातो': 'raddish red',
+    'मूला सेतो': 'raddish white',
+    'भन्टा लाम्चो': 'brinjal long',
+    'भन्टा डल्लो': 'brinjal round',
+    'बोडी': 'cow pea',
+    'मटरकोशा': 'green peas',
+    'घिउ सिमी': 'french bean',
+    'भटमासकोशा': 'soyabean green',
+    'करेला': 'bitter gourd',
+    'तितो करेला': 'bitter gourd',
+    'लौका': 'bottle gourd',
+    'परवर': 'pointed gourd',
+    'चिचिण्डो': 'snake gourd',
+    'घिरौला': 'smooth gourd',
+    'झिगुनी': 'sponge gourd',
+    'फर्सी': 'pumpkin',
+    'फर्सी पाकेको': 'pumpkin',
+    'फर्सी हरियो': 'squash',
+    'सलगम': 'turnip',
+    'भिण्डी': 'okara',
+    'सखरखण्ड': 'sweet potato',
+    'पिंडालू': 'arum',
+    'इस्कुस': 'christophine',
+    'काँक्रो': 'cucumber',
+    'अदुवा': 'ginger',
+    'लसुन सुकेको': 'garlic dry',
+    'लसुन हरियो': 'garlic green',
+    'खुर्सानी सुकेको': 'chilli dry',
+    'खुर्सानी हरियो': 'chilli green',
+    'भेडे खुर्सानी': 'capsicum',
+    'हरियो धनिया': 'coriander green',
+    'छ्यापी सुकेको': 'clive dry',
+    'छ्यापी हरियो': 'clive green',
+    'रायो साग': 'brd leaf mustard',
+    'तोरी साग': 'mustard leaf',
+    'तोरीको साग': 'mustard leaf',
+    'पालुङ्गो साग': 'spinach leaf',
+    'पालुगो साग': 'spinach leaf',
+    'चमसूर साग': 'cress leaf',
+    'मेथी साग': 'fenugreek leaf',
+    'च्याउ': 'mushroom',
+    'कुरीलो': 'asparagus',
+    'न्यूरो': 'neuro',
+    'ब्रोकाउली': 'brocauli',
+    'चुकुन्दर': 'sugarbeet',
+    'सजिवन': 'drumstick',
+    'सेलरी': 'celery',
+    'पुदिना': 'mint',
+    'इमली': 'tamarind',
+    'तामा': 'bamboo shoot',
+    'तोफु': 'tofu',
+    'गुन्दुक': 'gundruk',
+}
+
+GRADE_ALIASES = {
+    'नेपाली': 'nepali',
+    'भारतीय': 'indian',
+    'चिनियाँ': 'chinese',
+    'चाइनिज': 'chinese',
+    'तराई': 'terai',
+    'लोकल': 'local',
+    'स्थानीय': 'local',
+    'स्थानिय': 'local',
+    'टनेल': 'tunnel',
+    'तने': 'long',
+    'लाम्चो': 'long',
+    'कन्य': 'kanya',
+    'कन्या': 'kanya',
+}
+
+# Grades the site leaves off as often as it writes them: "Cauli Local" and
+# "काउली स्थानिय" are the same produce as a plain "Cauli"
+DEFAULT_GRADES = {'nepali', 'local'}
+
+# Origin grades may also trail the name without parentheses, as in "Garlic Dry Chinese"
+ORIGIN_GRADES = {'nepali', 'local', 'indian', 'chinese', 'terai'}
+
+UNIT_ALIASES = {
+    'kg': 'kg',
+    'kgs': 'kg',
+    'केजी': 'kg',
+    'के.जी.': 'kg',
+    'के.जी': 'kg',
+    'दर्जन': 'dozen',
+    'dozen': 'dozen',
+    'doz': 'dozen',
+    'गोटा': 'piece',
+    'piece': 'piece',
+    'pcs': 'piece',
+    'मुठा': 'bundle',
+    'bundle': 'bundle',
+}
+
+_QUALIFIER_PATTERN = re.compile(r'\(([^)]*)\)')
+_UNIT_SUFFIX_PATTERN = re.compile(r'(?:/|\bper\s+|प्रति\s*)(\S+)$', re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def normalize_name(raw_name):
+    """Normalize a scraped vegetable name into its canonical key, unit and grade"""
+    text = unicodedata.normalize('NFC', raw_name)
+    text = ' '.join(text.split())
+    name = text
+
+    unit = None
+    grade = None
+
+    # Trailing unit such as "/kg" or "per Kg"
+    unit_match = _UNIT_SUFFIX_PATTERN.search(text)
+    if unit_match and unit_match.group(1).casefold() in UNIT_ALIASES:
+        unit = UNIT_ALIASES[unit_match.group(1).casefold()]
+        text = text[:unit_match.start()].strip()
+
+    # Parenthesized qualifiers are either a unit or a grade
+    for qualifier in _QUALIFIER_PATTERN.findall(text):
+        qualifier = ' '.join(qualifier.split()).casefold()
+        if qualifier in UNIT_ALIASES:
+            unit = UNIT_ALIASES[qualifier]
+        elif qualifier:
+            grade = GRADE_ALIASES.get(qualifier, qualifier)
+    words = _QUALIFIER_PATTERN.sub(' ', text).casefold().split()
+    if grade is None and len(words) > 1 and GRADE_ALIASES.get(words[-1], words[-1]) in ORIGIN_GRADES:
+        last = words.pop()
+        grade = GRADE_ALIASES.get(last, last)
+    if grade in DEFAULT_GRADES:
+        grade = None
+    base_key = ' '.join(words)
+    base_key = NAME_ALIASES.get(base_key, base_key)
+    canonical_key = f"{base_key}|{grade}" if grade else base_key
+    return NormalizedName(canonical_key, name, unit, grade)
+
+
+class VegetableCatalog:
+    """Persistent mapping from raw scraped names to canonical integer vegetable IDs"""
+
+    def __init__(self, path=None):
+        self.path = path or config.DATA_DIR / "vegetable_catalog.db"
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS vegetables (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                canonical_key TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL,
+                unit TEXT,
+                grade TEXT
+            );
+            CREATE TABLE IF NOT EXISTS aliases (
+                raw_name TEXT PRIMARY KEY,
+                vegetable_id INTEGER NOT NULL REFERENCES vegetables(id)
+            );
+        """)
+        self.ids_by_key = {}
+        self.names_by_id = {}
+        for id_, key, name in self.conn.execute("SELECT id, canonical_key, name FROM vegetables ORDER BY id"):
+            self.ids_by_key[key] = id_
+            self.names_by_id[id_] = name
+        self.rekey()
+        self.ids_by_raw_name = dict(self.conn.execute("SELECT raw_name, vegetable_id FROM aliases"))
+
+    def rekey(self):
+        """Bring canonical keys stored under older normalization rules up to date
+
+        A vegetable whose new key already belongs to another one is merged into
+        it: its aliases move over, so later scrapes record a single ID. Records
+        already saved keep the ID they were saved with.
+        """
+        with self.lock, self.conn:
+            for vegetable_id, name in list(self.names_by_id.items()):
+                normalized = normalize_name(name)
+                owner = self.ids_by_key.get(normalized.canonical_key)
+                if owner == vegetable_id:
+                    continue
+                if owner is None:
+                    self.conn.execute(
+                        "UPDATE vegetables SET canonical_key = ?, grade = ? WHERE id = ?",
+                        (normalized.canonical_key, normalized.grade, vegetable_id)
+                    )
+                    self.ids_by_key = {key: id_ for key, id_ in self.ids_by_key.items() if id_ != vegetable_id}
+                    self.ids_by_key[normalized.canonical_key] = vegetable_id
+                else:
+                    self.conn.execute(
+                        "UPDATE aliases SET vegetable_id = ? WHERE vegetable_id = ?", (owner, vegetable_id)
+                    )
+
+    def get_id(self, raw_name):
+        """Return the vegetable ID for a raw name, registering it if it is new"""
+        vegetable_id = self.ids_by_raw_name.get(raw_name)
+        if vegetable_id is not None:
+            return vegetable_id
+
+        normalized = normalize_name(raw_name)
+        with self.lock:
+            vegetable_id = self.ids_by_key.get(normalized.canonical_key)
+            with self.conn:
+                if vegetable_id is None:
+                    # Another process may have registered the same key meanwhile
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO vegetables (canonical_key, name, unit, grade) VALUES (?, ?, ?, ?)",
+                        (normalized.canonical_key, normalized.name, normalized.unit, normalized.grade)
+                    )
+                    vegetable_id, name = self.conn.execute(
+                        "SELECT id, name FROM vegetables WHERE canonical_key = ?", (normalized.canonical_key,)
+                    ).fetchone()
+                    self.ids_by_key[normalized.canonical_key] = vegetable_id
+                    self.names_by_id[vegetable_id] = name
+                elif normalized.unit:
+                    self.conn.execute(
+                        "UPDATE vegetables SET unit = ? WHERE id = ? AND unit IS NULL",
+                        (normalized.unit, vegetable_id)
+                    )
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO aliases (raw_name, vegetable_id) VALUES (?, ?)",
+                    (raw_name, vegetable_id)
+                )
+            self.ids_by_raw_name[raw_name] = vegetable_id
+        return vegetable_id
+
+    def add_alias(self, raw_name, vegetable_id):
+        """Map a raw name to an existing vegetable ID, overriding normalization"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO aliases (raw_name, vegetable_id) VALUES (?, ?)",
+                (raw_name, vegetable_id)
+            )
+            self.ids_by_raw_name[raw_name] = vegetable_id
+
+    def get_vegetable(self, vegetable_id):
+        """Return the catalog entry for a vegetable ID, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id, canonical_key, name, unit, grade FROM vegetables WHERE id = ?", (vegetable_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('id', 'canonical_key', 'name', 'unit', 'grade'), row))
+
+    def get_name(self, vegetable_id):
+        """Display name of a vegetable: the first spelling it was registered under"""
+        name = self.names_by_id.get(vegetable_id)
+        if name is None:
+            vegetable = self.get_vegetable(vegetable_id)
+            if vegetable is None:
+                return None
+            name = self.names_by_id[vegetable_id] = vegetable['name']
+        return name
+
+    def find_id(self, name):
+        """Look up the ID for a raw or canonical name without registering it"""
+        vegetable_id = self.ids_by_raw_name.get(name)
+        if vegetable_id is not None:
+            return vegetable_id
+
+        canonical_key = normalize_name(name).canonical_key
+        vegetable_id = self.ids_by_key.get(canonical_key)
+        if vegetable_id is None:
+            # May have been registered by another process since we loaded
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT id FROM vegetables WHERE canonical_key = ?", (canonical_key,)
+                ).fetchone()
+            if row:
+                vegetable_id = self.ids_by_key[canonical_key] = row[0]
+        return vegetable_id
+
+    def close(self):
+        self.conn.close()
+
+
+def with_vegetable_ids(entries, catalog):
+    """Yield history entries, giving records saved before the catalog existed an ID"""
+    for entry in entries:
+        for record in entry.get('vegetables_price_data', []):
+            if 'vegetable_name' in record and record.get('vegetable_id') is None:
+                record['vegetable_id'] = catalog.get_id(record['vegetable_name'])
+        yield entry
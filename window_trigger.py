@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from apscheduler.triggers.base import BaseTrigger
+
+from adaptive_schedule import parse_time
+
+
+class WindowedIntervalTrigger(BaseTrigger):
+    """APScheduler trigger repeating an interval only inside a daily time window
+
+    Fire times restart from start_time each day and run while they are no later
+    than end_time, so the interval does not need to divide an hour or the window.
+    A window whose end_time is before its start_time runs overnight.
+    """
+
+    def __init__(self, interval, start_time, end_time, timezone):
+        if interval <= timedelta(0):
+            raise ValueError(f"Interval must be positive, got {interval}")
+        start_time, end_time = parse_time(start_time), parse_time(end_time)
+        if start_time == end_time:
+            raise ValueError(f"Window start and end are both {start_time:%H:%M}")
+        self.interval = interval
+        self.start_time = start_time
+        self.end_time = end_time
+        self.timezone = timezone
+
+    def localize(self, moment):
+        localize = getattr(self.timezone, 'localize', None)
+        return localize(moment) if localize else moment.replace(tzinfo=self.timezone)
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        earliest = now
+        if previous_fire_time is not None:
+            earliest = max(now, previous_fire_time + timedelta(microseconds=1))
+        local = earliest.astimezone(self.timezone).replace(tzinfo=None)
+
+        # Yesterday's window may still be open overnight; tomorrow's always follows
+        for days in (-1, 0, 1):
+            day = local.date() + timedelta(days=days)
+            start = datetime.combine(day, self.start_time)
+            end = datetime.combine(day, self.end_time)
+            if end <= start:
+                end += timedelta(days=1)
+            if local > end:
+                continue
+            if local <= start:
+                return self.localize(start)
+            steps = -(-(local - start) // self.interval)
+            candidate = start + steps * self.interval
+            if candidate <= end:
+                return self.localize(candidate)
+        return None
+
+    def __str__(self):
+        return f"every {self.interval} between {self.start_time:%H:%M} and {self.end_time:%H:%M}"
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__} (interval={self.interval!r}, "
+                f"start_time='{self.start_time:%H:%M}', end_time='{self.end_time:%H:%M}', "
+                f"timezone='{self.timezone}')>")
@@ -0,0 +1,175 @@
+import logging
+import multiprocessing
+import threading
+import time
+
+import psutil
+
+from driver_providers import delete_remote_session, get_driver_provider
+from logging_setup import configure_worker_pipe_logging, get_run_id, open_worker_log_channel, set_run_id
+from profiling import RunProfiler
+
+
+class ScrapeTimeoutError(Exception):
+    """Raised when a scrape worker exceeds its wall-clock timeout"""
+
+
+class ScrapeWorkerError(Exception):
+    """Raised when a scrape worker fails or exits unexpectedly"""
+
+    def __init__(self, message, stage_timings=None):
+        super().__init__(message)
+        self.stage_timings = stage_timings or {}
+
+
+def _worker_main(conn, max_jobs, log_conn):
+    """Worker process entry point: serve scrape requests until recycled"""
+    configure_worker_pipe_logging(log_conn)
+    from scraper import NepaliPatroVegetableScraper
+
+    profiler = RunProfiler('worker')
+    provider = get_driver_provider()
+    if hasattr(provider, 'session_listener'):
+        # Tell the parent about remote sessions so it can end them if it kills us
+        provider.session_listener = lambda url, session_id: conn.send(('session', url, session_id))
+    jobs_done = 0
+    while jobs_done < max_jobs:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        set_run_id(request.get('run_id'))
+        scraper = NepaliPatroVegetableScraper(url=request.get('url'), source=request.get('source'))
+        try:
+            # The parent counts runs across worker recycles and decides
+            with profiler.profile_as(request.get('run_id'), request.get('profile')):
+                data = scraper.scrape()
+            conn.send(('ok', data, scraper.stage_timings))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}", scraper.stage_timings))
+        jobs_done += 1
+
+    conn.close()
+
+
+class ScrapeWorkerPool:
+    """Runs scrapes in a recycled worker subprocess with a hard timeout"""
+
+    def __init__(self, job_timeout=300, max_jobs_per_worker=10):
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.context = multiprocessing.get_context('spawn')
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        self.log_thread = None
+        self.jobs_done = 0
+        self.logger = logging.getLogger('ScrapeWorkerPool')
+
+    def _spawn(self):
+        """Start a fresh worker process"""
+        parent_conn, child_conn = self.context.Pipe()
+        log_conn, self.log_thread = open_worker_log_channel(self.context)
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn, self.max_jobs_per_worker, log_conn),
+            name='scrape-worker',
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        log_conn.close()
+        self.conn = parent_conn
+        self.jobs_done = 0
+        self.logger.info(f"Started scrape worker (PID: {self.process.pid})")
+
+    def _kill(self, sessions=()):
+        """Kill the worker and any browser processes it started, and end its remote sessions"""
+        if self.process is None:
+            return
+        try:
+            parent = psutil.Process(self.process.pid)
+            for child in parent.children(recursive=True):
+                try:
+                    child.kill()
+                except psutil.NoSuchProcess:
+                    continue
+        except psutil.NoSuchProcess:
+            pass
+        self.process.kill()
+        self.process.join(timeout=10)
+        self._close()
+        # The worker never got to quit these; without this they hold their slots until the node times them out
+        for url, session_id in sessions:
+            delete_remote_session(url, session_id)
+
+    def _retire(self):
+        """Ask the worker to exit cleanly, killing it if it does not"""
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=10)
+        if self.process.is_alive():
+            self._kill()
+        else:
+            self._close()
+
+    def _close(self):
+        if self.conn is not None:
+            self.conn.close()
+        if self.log_thread is not None:
+            # The worker is gone, so its log pipe is at EOF once drained
+            self.log_thread.join(timeout=5)
+        self.process = None
+        self.conn = None
+        self.log_thread = None
+
+    def run_scrape(self, url=None, source=None, profile=None):
+        """Run one scrape in a worker; return the scraped price data and stage timings
+
+        `profile` is a RunProfiler.decide() decision for the worker to profile by.
+        """
+        with self.lock:
+            if (self.process is None or not self.process.is_alive()
+                    or self.jobs_done >= self.max_jobs_per_worker):
+                self._retire()
+                self._spawn()
+
+            self.conn.send({'run_id': get_run_id(), 'url': url, 'source': source, 'profile': profile})
+            self.jobs_done += 1
+
+            # Remote browser sessions the worker opened for this scrape
+            sessions = []
+            deadline = time.monotonic() + self.job_timeout
+            while True:
+                if not self.conn.poll(max(0, deadline - time.monotonic())):
+                    self.logger.error(f"Scrape worker exceeded {self.job_timeout}s timeout, killing it")
+                    self._kill(sessions)
+                    raise ScrapeTimeoutError(f"Scrape timed out after {self.job_timeout} seconds")
+
+                try:
+                    message = self.conn.recv()
+                except (EOFError, OSError):
+                    exitcode = self.process.exitcode if self.process else None
+                    self._kill(sessions)
+                    raise ScrapeWorkerError(f"Scrape worker exited unexpectedly (exit code: {exitcode})")
+                if message[0] != 'session':
+                    break
+                sessions.append(message[1:])
+            status, payload, stage_timings = message
+
+        if status != 'ok':
+            raise ScrapeWorkerError(payload, stage_timings)
+        return payload, stage_timings
+
+    def shutdown(self):
+        """Stop the worker process"""
+        with self.lock:
+            self._retire()